@@ -0,0 +1,143 @@
+"""
+EB-1A Synthetic Corpus
+Deterministic generator of realistic Opportunity corpora for benchmarks.
+Keywords follow a Zipf-like distribution over the vocabulary the searcher
+matches against (a few terms like "AI" dominate, a long tail rarely
+appears), types and ratings are skewed like the real sources, and a small
+share of rows are re-listings of earlier ones so deduplication has work.
+
+Usage:
+    python -m benchmarks.corpus --size 100000 [--seed 42] [--out corpus.jsonl]
+"""
+
+import argparse
+import json
+import random
+import sys
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Iterator, List
+
+from src.opportunity_search import Opportunity, OpportunityType
+
+# Profile keywords first (the head of the distribution), then the long tail
+VOCABULARY = [
+    "AI", "ML", "Cybersecurity", "Cloud Native", "Security", "Research", "IEEE", "ACM",
+    "Machine Learning", "DevSecOps", "Software Engineering", "Kubernetes", "Artificial Intelligence",
+    "Industry", "Engineering", "Privacy", "Open Source", "Data Science", "Startups", "Leadership",
+    "Blockchain", "IoT", "Robotics", "Space", "Healthcare", "Fintech", "Quantum", "Edge Computing",
+    "Networking", "Distributed Systems", "Compilers", "HPC", "Observability", "SRE", "Mobile",
+    "AR/VR", "Ethics", "Policy", "Education", "Diversity", "Sustainability", "Automotive",
+    "Bioinformatics", "Databases", "Programming Languages", "Formal Methods", "Cryptography",
+    "Threat Intelligence", "Incident Response", "Zero Trust"
+]
+
+# Relative frequency of each type across the real sources
+TYPE_WEIGHTS = [
+    (OpportunityType.SPEAKING, 30), (OpportunityType.JUDGING, 20), (OpportunityType.MEDIA, 15),
+    (OpportunityType.AWARDS, 12), (OpportunityType.NETWORKING, 10), (OpportunityType.WRITING, 8),
+    (OpportunityType.QUICK_WINS, 5)
+]
+
+TITLE_PATTERNS = {
+    OpportunityType.SPEAKING: ["{event} {year} - Call for Papers", "{event} {year} - Call for Speakers",
+                               "{topic} Summit {year} - Talk Proposals"],
+    OpportunityType.JUDGING: ["{event} {year} - Program Committee", "{topic} Hackathon {year} - Judges Wanted",
+                              "{event} - Peer Reviewer ({topic})"],
+    OpportunityType.MEDIA: ["{outlet} - Expert Sources on {topic}", "{outlet} Podcast - {topic} Guests",
+                            "{outlet} - Contributed Articles ({topic})"],
+    OpportunityType.AWARDS: ["{event} {year} {topic} Award", "{outlet} {topic} Innovator of the Year {year}"],
+    OpportunityType.NETWORKING: ["{topic} Meetup - {city}", "{event} {year} Community Day ({city})"],
+    OpportunityType.WRITING: ["{outlet} - Call for Articles on {topic}", "{event} Journal Special Issue: {topic}"],
+    OpportunityType.QUICK_WINS: ["{outlet} - Answer {topic} Questions", "{topic} Open Source Review Sprint"]
+}
+
+EVENTS = ["IEEE S&P", "ACM CCS", "USENIX Security", "KubeCon", "NeurIPS", "ICML", "RSA Conference",
+          "Black Hat", "DEF CON", "QCon", "OSCON", "DevSecCon", "AI Engineer Summit", "CloudNativeCon",
+          "AAAI", "KDD", "SIGCOMM", "OWASP Global AppSec"]
+OUTLETS = ["TechCrunch", "InfoQ", "Dark Reading", "The New Stack", "IEEE Spectrum", "HackerNoon",
+           "Forbes Technology Council", "SC Media", "VentureBeat", "DZone"]
+CITIES = ["Austin", "Remote", "San Francisco", "New York", "Seattle", "London", "Berlin", "Toronto"]
+DOMAINS = ["ieee.org", "acm.org", "usenix.org", "cncf.io", "sessionize.com", "devpost.com",
+           "papercall.io", "medium.com", "infoq.com", "eventbrite.com"]
+
+DUPLICATE_RATE = 0.05
+
+def _zipf_weights(n: int, exponent: float = 1.1) -> List[float]:
+    return list(accumulate(1.0 / (rank ** exponent) for rank in range(1, n + 1)))
+
+def iter_corpus(size: int, seed: int = 42, today: date = date(2025, 7, 19)) -> Iterator[Opportunity]:
+    """Yield ``size`` opportunities; the same (size, seed) always yields the same rows.
+
+    Descriptions, keyword lists and rationale strings are drawn from
+    shared pools, so a 10^6-row corpus stays within a few hundred MB.
+    """
+    rng = random.Random(seed)
+    keyword_weights = _zipf_weights(len(VOCABULARY))
+    types = [t for t, _ in TYPE_WEIGHTS]
+    type_weights = list(accumulate(w for _, w in TYPE_WEIGHTS))
+
+    keyword_pool = []
+    for _ in range(min(4096, max(64, size // 50))):
+        count = rng.choice((1, 2, 2, 3, 3, 3, 4, 4, 5, 6))
+        keywords = list(dict.fromkeys(rng.choices(VOCABULARY, cum_weights=keyword_weights, k=count)))
+        keyword_pool.append((keywords, f"Aligns with {', '.join(keywords)} expertise"))
+
+    descriptions = [f"{rng.choice(EVENTS)} track on {' and '.join(rng.sample(VOCABULARY[:20], 2))}"
+                    for _ in range(256)]
+    deadlines = (["Ongoing", "Rolling", "TBD - requires investigation"]
+                 + [(today + timedelta(days=offset)).strftime("%B %d, %Y") for offset in range(0, 365, 3)])
+    found_dates = [(today - timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(30)]
+
+    emitted: List[Opportunity] = []
+    for index in range(size):
+        if emitted and rng.random() < DUPLICATE_RATE:
+            # Re-listing: same link and title, found by another source
+            original = rng.choice(emitted[-1000:])
+            opp = Opportunity(**dict(original.__dict__, date_found=rng.choice(found_dates)))
+            yield opp
+            continue
+
+        opp_type = rng.choices(types, cum_weights=type_weights)[0]
+        keywords, why_fits = rng.choice(keyword_pool)
+        title = rng.choice(TITLE_PATTERNS[opp_type]).format(
+            event=rng.choice(EVENTS), outlet=rng.choice(OUTLETS), city=rng.choice(CITIES),
+            topic=keywords[0], year=rng.choice((2025, 2026))
+        )
+        opp = Opportunity(
+            title=f"{title} #{index}",
+            type=opp_type,
+            description=rng.choice(descriptions),
+            deadline=rng.choice(deadlines),
+            link=f"https://www.{rng.choice(DOMAINS)}/opportunities/{index:07d}",
+            prestige_rating=min(5, max(1, round(rng.gauss(3.4, 0.9)))),
+            evidence_value=min(5, max(1, round(rng.gauss(3.6, 0.8)))),
+            time_investment=rng.randint(1, 5),
+            why_fits=why_fits,
+            keywords=keywords,
+            date_found=rng.choice(found_dates)
+        )
+        if len(emitted) < 1000 or index % 97 == 0:
+            emitted.append(opp)
+        yield opp
+
+def generate_corpus(size: int, seed: int = 42) -> List[Opportunity]:
+    return list(iter_corpus(size, seed))
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic opportunity corpus as JSONL")
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    out = open(args.out, "w") if args.out else sys.stdout
+    try:
+        for opp in iter_corpus(args.size, args.seed):
+            out.write(json.dumps(dict(opp.__dict__, type=opp.type.value)) + "\n")
+    finally:
+        if args.out:
+            out.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+EB-1A HTTP Load Test
+asyncio load generator for the Flask API. Starts the app under gunicorn on
+a free local port (scratch databases, no email credentials, so the default
+user gets MockEmailSender), drives a weighted mix of endpoints from a fixed
+number of concurrent keep-alive clients, and reports throughput and
+p50/p95/p99 latency overall and per endpoint, with optional SLO checks.
+
+Usage:
+    python -m benchmarks.http_load [--workers 2] [--concurrency 16] [--duration 20]
+                                   [--mix opportunities=40,preview=20,profile=30,health=10]
+                                   [--slo-p95-ms 250] [--slo-p99-ms 500] [--json]
+    python -m benchmarks.http_load --target http://127.0.0.1:5003 ...
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = {
+    "opportunities": "/api/opportunities",
+    "preview": "/api/preview-email?type=daily&format=html",
+    "profile": "/api/user/profile",
+    "health": "/health"
+}
+DEFAULT_MIX = "opportunities=40,preview=20,profile=30,health=10"
+
+def parse_mix(text: str) -> List[Tuple[str, int]]:
+    mix = []
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r}; choose from {', '.join(ENDPOINTS)}")
+        mix.append((name, int(weight or 1)))
+    return mix
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+class HTTPConnection:
+    """Minimal HTTP/1.1 client over one asyncio stream, reconnecting when
+    the server closes (gunicorn's sync workers do after every response)"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.connects = 0
+
+    async def get(self, path: str) -> Tuple[int, int]:
+        """(status, body bytes) for a GET"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            self.connects += 1
+
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                          f"Accept: */*\r\nConnection: keep-alive\r\n\r\n".encode("ascii"))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Server closed the connection")
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "content-length" in headers:
+            body = await self.reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            body = b""
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                body += await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        else:
+            body = await self.reader.read()
+            headers["connection"] = "close"
+
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, len(body)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self.reader = self.writer = None
+
+async def run_load(host: str, port: int, mix: List[Tuple[str, int]], concurrency: int,
+                   duration: float, warmup: float, seed: int) -> Dict[str, Any]:
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    statuses: Dict[str, Dict[str, int]] = {name: {} for name in names}
+    errors: Dict[str, int] = {}
+    connects = 0
+
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    async def client(index: int):
+        nonlocal connects
+        rng = random.Random(seed + index)
+        conn = HTTPConnection(host, port)
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                break
+            name = rng.choices(names, weights)[0]
+            try:
+                status, _ = await conn.get(ENDPOINTS[name])
+            except (ConnectionError, OSError, asyncio.IncompleteReadError, ValueError) as e:
+                await conn.close()
+                if now >= measure_from:
+                    errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                continue
+            if now >= measure_from:
+                latencies[name].append(time.perf_counter() - now)
+                statuses[name][str(status)] = statuses[name].get(str(status), 0) + 1
+        await conn.close()
+        connects += conn.connects
+
+    await asyncio.gather(*(client(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - measure_from
+
+    def summarize(values: List[float]) -> Dict[str, Any]:
+        values = sorted(values)
+        return {
+            "requests": len(values),
+            "throughput_rps": round(len(values) / elapsed, 1) if elapsed > 0 else 0.0,
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2) if values else 0.0
+        }
+
+    endpoints = {name: dict(summarize(latencies[name]), statuses=statuses[name]) for name in names}
+    overall = summarize([value for values in latencies.values() for value in values])
+    overall["non_2xx"] = sum(count for name in names for status, count in statuses[name].items()
+                             if not status.startswith("2"))
+    overall["errors"] = errors
+    overall["connections_opened"] = connects
+    return {"elapsed_seconds": round(elapsed, 2), "overall": overall, "endpoints": endpoints}
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_app(workers: int, worker_class: str, threads: int) -> Tuple[subprocess.Popen, int, str]:
+    """Run the app under gunicorn with scratch state and no email credentials"""
+    if os.path.exists(os.path.join(REPO_ROOT, ".env")):
+        print("warning: bootstrap() loads .env, so email credentials there will be used "
+              "instead of MockEmailSender", file=sys.stderr)
+
+    workdir = tempfile.mkdtemp(prefix="eb1a-load-")
+    port = free_port()
+    env = dict(os.environ)
+    for name in ("EMAIL_USERNAME", "EMAIL_PASSWORD", "SMTP_SERVER"):
+        env.pop(name, None)
+    env.update({
+        "STATE_DB_PATH": os.path.join(workdir, "state.db"),
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'app.db')}",
+        "METRICS_MULTIPROC_DIR": os.path.join(workdir, "metrics"),
+        "TRACE_FILE": "",
+        "PYTHONPATH": REPO_ROOT
+    })
+    log = open(os.path.join(workdir, "gunicorn.log"), "w")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}", "--workers", str(workers),
+         "--worker-class", worker_class, "--threads", str(threads), "src.main:app"],
+        cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    return proc, port, log.name
+
+def wait_ready(base_url: str, proc: Optional[subprocess.Popen], timeout: float = 60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {proc.returncode}")
+        try:
+            with urllib.request.urlopen(base_url + "/health", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{base_url} did not become healthy within {timeout}s")
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Load test the EB-1A HTTP API")
+    parser.add_argument("--target", help="base URL of a running app (default: start one locally)")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers for the local app")
+    parser.add_argument("--worker-class", default="sync")
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds first")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint=weight,... over " + ",".join(ENDPOINTS))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--slo-p95-ms", type=float, help="fail if overall p95 exceeds this")
+    parser.add_argument("--slo-p99-ms", type=float, help="fail if overall p99 exceeds this")
+    parser.add_argument("--json", action="store_true", help="emit machine-readable results")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    proc, log_path = None, None
+    if args.target:
+        base_url = args.target.rstrip("/")
+    else:
+        proc, port, log_path = start_app(args.workers, args.worker_class, args.threads)
+        base_url = f"http://127.0.0.1:{port}"
+
+    try:
+        wait_ready(base_url, proc)
+        target = urlsplit(base_url)
+        result = asyncio.run(run_load(target.hostname, target.port or 80, mix, args.concurrency,
+                                      args.duration, args.warmup, args.seed))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    slo = {}
+    if args.slo_p95_ms is not None:
+        slo["p95"] = {"target_ms": args.slo_p95_ms, "actual_ms": result["overall"]["p95_ms"],
+                      "met": result["overall"]["p95_ms"] <= args.slo_p95_ms}
+    if args.slo_p99_ms is not None:
+        slo["p99"] = {"target_ms": args.slo_p99_ms, "actual_ms": result["overall"]["p99_ms"],
+                      "met": result["overall"]["p99_ms"] <= args.slo_p99_ms}
+
+    report = {
+        "benchmark": "http_load",
+        "target": args.target or "local gunicorn",
+        "workers": None if args.target else args.workers,
+        "worker_class": None if args.target else args.worker_class,
+        "concurrency": args.concurrency,
+        "mix": dict(mix),
+        "results": result,
+        "slo": slo,
+        "server_log": log_path
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        overall = result["overall"]
+        print("=== EB-1A HTTP Load ===")
+        print(f"{report['target']}, {args.concurrency} clients, {result['elapsed_seconds']}s measured\n")
+        print(f"{'endpoint':15s} {'requests':>9s} {'rps':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}")
+        for name, stats in list(result["endpoints"].items()) + [("overall", overall)]:
+            print(f"{name:15s} {stats['requests']:9d} {stats['throughput_rps']:8.1f} "
+                  f"{stats['p50_ms']:8.2f} {stats['p95_ms']:8.2f} {stats['p99_ms']:8.2f}")
+        print(f"\nnon-2xx: {overall['non_2xx']}  errors: {overall['errors'] or 0}")
+        for name, check in slo.items():
+            print(f"SLO {name} <= {check['target_ms']} ms: {'met' if check['met'] else 'MISSED'} "
+                  f"({check['actual_ms']} ms)")
+
+    if any(not check["met"] for check in slo.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+EB-1A MIME Build Benchmark
+CPU cost of turning rendered daily emails into SMTP payloads: a fresh
+MIME tree encoded per recipient versus pre-encoded skeletons shared by
+recipients with identical content
+
+Usage:
+    python -m benchmarks.mime_build [--recipients 5000] [--distinct 50] [--json]
+"""
+
+import argparse
+import io
+import json
+import time
+from email.generator import BytesGenerator
+from typing import Any, Dict, List
+
+def build_messages(recipients: int, distinct: int) -> List[Dict[str, Any]]:
+    """send_email keyword dicts: ``distinct`` different digests spread over the recipients"""
+    from src.config import create_default_user_profile
+    from src.email_sender import MockEmailSender
+    from src.opportunity_search import OpportunitySearcher
+
+    profile = create_default_user_profile()
+    searcher = OpportunitySearcher(profile.__dict__)
+    opportunities = searcher.filter_opportunities(searcher.search_all_opportunities())
+    sender = MockEmailSender()
+
+    contents = []
+    for index in range(distinct):
+        profile.name = f"Candidate group {index}"
+        contents.append(sender.render_daily_opportunities_email(profile, opportunities))
+
+    return [dict(contents[index % distinct], to_email=f"user{index}@example.com")
+            for index in range(recipients)]
+
+def per_message_tree(sender, messages) -> float:
+    """The previous path: build and flatten a MIME tree for every recipient"""
+    started = time.perf_counter()
+    for message in messages:
+        msg = sender._build_message(**message)
+        with io.BytesIO() as buffer:
+            BytesGenerator(buffer).flatten(msg, linesep="\r\n")
+    return time.perf_counter() - started
+
+def shared_skeleton(sender, messages) -> float:
+    from src.mime_builder import MessageBuilder
+
+    builder = MessageBuilder()
+    started = time.perf_counter()
+    for message in messages:
+        builder.build(sender.from_email, message['to_email'], message['subject'],
+                      message['plain_content'], message['html_content']).as_bytes()
+    return time.perf_counter() - started
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Measure MIME build cost per message")
+    parser.add_argument("--recipients", type=int, default=5000)
+    parser.add_argument("--distinct", type=int, default=50, help="distinct email bodies")
+    parser.add_argument("--json", action="store_true", help="emit machine-readable results")
+    args = parser.parse_args(argv)
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    from src.email_sender import EmailSender
+
+    sender = EmailSender("localhost", 25, "bench", "bench")
+    messages = build_messages(args.recipients, args.distinct)
+
+    results = {}
+    for name, run in (("per_message_tree", per_message_tree), ("shared_skeleton", shared_skeleton)):
+        elapsed = run(sender, messages)
+        results[name] = {
+            "seconds": round(elapsed, 3),
+            "us_per_message": round(elapsed / len(messages) * 1e6, 1)
+        }
+
+    report = {
+        "benchmark": "mime_build",
+        "recipients": args.recipients,
+        "distinct_bodies": args.distinct,
+        "results": results,
+        "speedup": round(results["per_message_tree"]["seconds"] / results["shared_skeleton"]["seconds"], 1)
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print("=== EB-1A MIME Build ===")
+    print(f"{args.recipients} recipients, {args.distinct} distinct bodies\n")
+    for name, result in results.items():
+        print(f"{name:18s} {result['us_per_message']:9.1f} us/message")
+    print(f"\nspeedup: {report['speedup']}x")
+
+if __name__ == "__main__":
+    main()
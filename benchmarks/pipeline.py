@@ -0,0 +1,188 @@
+"""
+EB-1A Pipeline Benchmark Suite
+Times the opportunity pipeline on synthetic corpora of increasing size:
+ranking (filter_opportunities), deduplication, the email renderers, API
+serialization as done in main.py, and MockEmailSender throughput. Results
+are JSON with the commit they were measured on, and --compare checks them
+against an earlier results file.
+
+Usage:
+    python -m benchmarks.pipeline [--sizes 1000,10000,100000] [--repeat 5] [--json] [--out results.json]
+    python -m benchmarks.pipeline --compare baseline.json [--threshold 0.15]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def measure(func: Callable[[], Any], repeat: int, items: int) -> Dict[str, Any]:
+    """Best and median wall time of ``repeat`` runs of ``func``"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    return {
+        "items": items,
+        "best_seconds": round(best, 6),
+        "median_seconds": round(statistics.median(timings), 6),
+        "items_per_sec": round(items / best, 1) if best else None
+    }
+
+def bench_corpus(size: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Benchmarks whose cost grows with the corpus"""
+    from benchmarks.corpus import generate_corpus
+    from src.config import create_default_user_profile
+    from src.main import serialize_opportunity
+    from src.opportunity_search import OpportunitySearcher
+
+    corpus = generate_corpus(size)
+    searcher = OpportunitySearcher(create_default_user_profile().__dict__)
+    results = {
+        "filter_opportunities": measure(lambda: searcher.filter_opportunities(corpus), repeat, size),
+        "deduplicate_opportunities": measure(lambda: searcher.deduplicate_opportunities(corpus), repeat, size),
+        "serialize_json": measure(
+            lambda: json.dumps({"opportunities": [serialize_opportunity(opp) for opp in corpus],
+                                "count": size}),
+            repeat, size
+        )
+    }
+    del corpus
+    return results
+
+def bench_fixed(users: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Per-user benchmarks on top-10 digests: renderers, the API response and mock sends"""
+    from benchmarks.corpus import generate_corpus
+    from src.config import create_default_user_profile
+    from src.email_formatter import EmailFormatter
+    from src.email_renderer import EmailRenderer
+    from src.email_sender import MockEmailSender
+    from src.email_templates import EmailPersonalizer, HTMLEmailGenerator
+    from src.main import app, serialize_opportunity
+
+    profile = create_default_user_profile()
+    pool = generate_corpus(users * 10, seed=7)
+    digests = [pool[index * 10:(index + 1) * 10] for index in range(users)]
+    profile_dict = profile.__dict__
+    renderer = EmailRenderer()
+    formatter = EmailFormatter()
+
+    def jsonify_responses():
+        # /api/opportunities builds the response this way
+        with app.app_context():
+            for digest in digests:
+                app.json.response({"opportunities": [serialize_opportunity(opp) for opp in digest],
+                                   "count": len(digest)}).get_data()
+
+    rendered = [MockEmailSender().render_daily_opportunities_email(profile, digest) for digest in digests]
+
+    def mock_sends():
+        sender = MockEmailSender()
+        for message in rendered:
+            sender.send_email(**message)
+
+    return {
+        "render_plain_and_html": measure(lambda: [renderer.render(d, profile_dict) for d in digests], repeat, users),
+        "render_personalized_plain": measure(
+            lambda: [EmailPersonalizer(profile_dict).personalize_daily_email(d) for d in digests], repeat, users),
+        "render_html_generator": measure(
+            lambda: [HTMLEmailGenerator.generate_html_daily_email(d, profile_dict) for d in digests], repeat, users),
+        "render_formatter_basic": measure(lambda: [formatter.format_daily_email(d) for d in digests], repeat, users),
+        "serialize_api_response": measure(jsonify_responses, repeat, users),
+        "mock_sender_send_email": measure(mock_sends, repeat, users)
+    }
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Per-benchmark ratio of best time against the baseline; flags slowdowns past ``threshold``"""
+    rows = []
+    for group, benches in report["results"].items():
+        for name, result in benches.items():
+            old = baseline.get("results", {}).get(group, {}).get(name)
+            if not old or not old.get("best_seconds"):
+                continue
+            ratio = result["best_seconds"] / old["best_seconds"]
+            rows.append({"group": group, "benchmark": name, "ratio": round(ratio, 3),
+                         "regression": ratio > 1 + threshold})
+    return rows
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the opportunity pipeline")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="comma-separated corpus sizes (up to 1000000)")
+    parser.add_argument("--users", type=int, default=1000, help="users for the per-user benchmarks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="emit machine-readable results")
+    parser.add_argument("--out", help="also write the JSON results to this file")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="slowdown ratio above which --compare reports a regression")
+    args = parser.parse_args(argv)
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    # Keep sampled traces out of the working directory while benchmarking
+    from src import tracing
+    tracing.set_tracer(tracing.Tracer(None))
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = {f"corpus_{size}": bench_corpus(size, args.repeat) for size in sizes}
+    results[f"per_user_{args.users}"] = bench_fixed(args.users, args.repeat)
+
+    report = {
+        "benchmark": "pipeline",
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results
+    }
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(report, json.load(f), args.threshold)
+        regressions = [row for row in report["comparison"] if row["regression"]]
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"=== EB-1A Pipeline Benchmarks ({report['commit']}) ===")
+        for group, benches in results.items():
+            print(f"\n{group}")
+            for name, result in benches.items():
+                print(f"  {name:28s} {result['best_seconds'] * 1000:10.2f} ms  "
+                      f"{result['items_per_sec']:>12,.0f} items/s")
+        if args.compare:
+            print(f"\nvs {args.compare}:")
+            for row in report["comparison"]:
+                flag = "  REGRESSION" if row["regression"] else ""
+                print(f"  {row['group']}/{row['benchmark']:28s} x{row['ratio']:.3f}{flag}")
+
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+EB-1A Render Benchmark
+Renders the HTML daily email for a batch of users who share one pool of
+opportunities (as a send window does) and reports the time per 1k users,
+with the fragment cache off and on
+
+Usage:
+    python -m benchmarks.render [--users 1000] [--per-user 10] [--rounds 3] [--json]
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List, Tuple
+
+def build_workload(users: int, per_user: int, seed: int = 7) -> List[Tuple[list, Dict[str, Any]]]:
+    """(ranked opportunities, profile) per user: each user gets their own
+    ordering of a subset of the shared search results"""
+    from src.opportunity_search import OpportunitySearcher, create_user_profile
+
+    base_profile = create_user_profile()
+    pool = OpportunitySearcher(base_profile).search_all_opportunities()
+    rng = random.Random(seed)
+
+    workload = []
+    for index in range(users):
+        profile = dict(base_profile, name=f"Candidate {index}")
+        profile["weak_criteria"] = rng.sample(base_profile.get("weak_criteria", []) or ["judging"],
+                                              k=min(2, len(base_profile.get("weak_criteria", [])) or 1))
+        workload.append((rng.sample(pool, k=min(per_user, len(pool))), profile))
+    return workload
+
+def render_all(workload) -> float:
+    from src.email_templates import HTMLEmailGenerator
+
+    started = time.perf_counter()
+    for opportunities, profile in workload:
+        HTMLEmailGenerator.generate_html_daily_email(opportunities, profile)
+    return time.perf_counter() - started
+
+def run_mode(workload, cache_size: int, rounds: int) -> Dict[str, Any]:
+    from src.email_renderer import EmailRenderer
+    from src.template_engine import FragmentCache
+
+    EmailRenderer.fragments = FragmentCache(cache_size)
+    timings = [render_all(workload) for _ in range(rounds)]
+    best = min(timings)
+    return {
+        "cache_size": cache_size,
+        "seconds": [round(t, 4) for t in timings],
+        "ms_per_1k_users": round(best / len(workload) * 1000 * 1000, 2),
+        "cache": EmailRenderer.fragments.get_stats()
+    }
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Measure HTML daily email render cost")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--per-user", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="emit machine-readable results")
+    args = parser.parse_args(argv)
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    from src.config import SystemConfig
+
+    workload = build_workload(args.users, args.per_user)
+    results = {
+        "uncached": run_mode(workload, 0, args.rounds),
+        "cached": run_mode(workload, SystemConfig.TEMPLATE_FRAGMENT_CACHE_SIZE, args.rounds)
+    }
+    speedup = results["uncached"]["ms_per_1k_users"] / results["cached"]["ms_per_1k_users"]
+
+    report = {
+        "benchmark": "render",
+        "users": args.users,
+        "opportunities_per_user": args.per_user,
+        "modes": results,
+        "speedup": round(speedup, 2)
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print("=== EB-1A HTML Render ===")
+    print(f"{args.users} users x {args.per_user} opportunities, best of {args.rounds}\n")
+    for name, result in results.items():
+        print(f"{name:10s} {result['ms_per_1k_users']:9.2f} ms per 1k users  "
+              f"(cache hit rate {result['cache']['hit_rate']})")
+    print(f"\nspeedup: {report['speedup']}x")
+
+if __name__ == "__main__":
+    main()
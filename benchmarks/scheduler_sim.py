@@ -0,0 +1,215 @@
+"""
+EB-1A Scheduler Simulation
+Runs a day (or more) of SchedulerManager activity for many users on a
+virtual clock: send-window batches, the outbox, hourly urgent checks and
+maintenance all fire as in production, but time jumps from one due job to
+the next and every user has a MockEmailSender. Reports CPU time per
+virtual hour, peak memory, and the delay between a job's due time and
+its completion.
+
+Usage:
+    python -m benchmarks.scheduler_sim [--users 50000] [--hours 24] [--start 2026-03-02T00:00]
+                                       [--weekly-share 0.1] [--json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+TIMEZONES = [("America/Chicago", 30), ("America/New_York", 25), ("America/Los_Angeles", 20),
+             ("Europe/London", 8), ("Asia/Kolkata", 8), ("Europe/Berlin", 5), ("UTC", 4)]
+SEND_TIMES = ["07:00", "07:30", "08:00", "08:00", "08:00", "08:15", "08:30", "09:00"]
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1)
+
+def latency_summary(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {"count": 0}
+    values = sorted(values)
+    pick = lambda pct: values[min(len(values) - 1, int(pct / 100 * len(values)))]
+    return {
+        "count": len(values),
+        "p50_ms": round(pick(50) * 1000, 3),
+        "p95_ms": round(pick(95) * 1000, 3),
+        "p99_ms": round(pick(99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3),
+        "mean_ms": round(statistics.fmean(values) * 1000, 3)
+    }
+
+class Simulation:
+    """Drives a SchedulerManager through virtual time and collects measurements"""
+
+    def __init__(self, users: int, start: float, weekly_share: float, seed: int = 11):
+        from src.config import NotificationFrequency, create_default_user_profile
+        from src.job_scheduler import JobScheduler, VirtualClock
+        from src.scheduler import SchedulerManager
+
+        self.clock = VirtualClock(start=start)
+        self.job_scheduler = JobScheduler(max_workers=0, clock=self.clock, on_complete=self._job_done)
+        self.manager = SchedulerManager(job_scheduler=self.job_scheduler)
+
+        # Latency baseline: wall time at which the clock reached the current instant
+        self.reached_at = time.perf_counter()
+        self.job_virtual_lateness: List[float] = []
+        self.job_wall_latency: Dict[str, List[float]] = {}
+        self.email_latency: List[float] = []
+
+        worker = self.manager.outbox_worker
+        original_on_result = worker.on_result
+
+        def on_result(message, status):
+            self.email_latency.append(time.perf_counter() - self.reached_at)
+            original_on_result(message, status)
+        worker.on_result = on_result
+
+        rng = random.Random(seed)
+        zones = [zone for zone, _ in TIMEZONES]
+        weights = [weight for _, weight in TIMEZONES]
+        setup_started = time.perf_counter()
+        # OpportunityScheduler prints its DEBUG lines per user
+        with contextlib.redirect_stdout(io.StringIO()):
+            for index in range(users):
+                profile = create_default_user_profile()
+                profile.name = f"Sim User {index}"
+                profile.email = f"user{index}@example.com"
+                profile.timezone = rng.choices(zones, weights)[0]
+                profile.send_time = rng.choice(SEND_TIMES)
+                if rng.random() < weekly_share:
+                    profile.notification_frequency = NotificationFrequency.WEEKLY
+                self.manager.add_user_scheduler(f"user{index}", profile, use_mock_email=True)
+            self.manager.start_all()
+        self.setup_seconds = time.perf_counter() - setup_started
+
+    @property
+    def sends(self) -> int:
+        """Emails recorded by every user's MockEmailSender (daily and weekly)"""
+        return sum(scheduler.email_sender.sent_count for scheduler in self.manager.schedulers.values())
+
+    @staticmethod
+    def _job_kind(job) -> str:
+        if job.owner == "send-windows":
+            return "send_window_batch"
+        return job.name.lstrip("_")
+
+    def _job_done(self, job, fire_time: float, started: float, finished: float):
+        self.job_virtual_lateness.append(started - fire_time)
+        self.job_wall_latency.setdefault(self._job_kind(job), []).append(time.perf_counter() - self.reached_at)
+
+    def advance_to(self, when: float):
+        self.reached_at = time.perf_counter()
+        # A send-window batch for thousands of users can take a while to settle
+        self.clock.advance_to(when, timeout=3600)
+        self.manager.outbox_worker.drain()
+
+    def run(self, hours: int) -> List[Dict[str, Any]]:
+        per_hour = []
+        start = self.clock.now()
+        for hour in range(hours):
+            hour_end = start + (hour + 1) * 3600
+            sends = self.sends
+            cpu, wall, jobs = time.process_time(), time.perf_counter(), len(self.job_virtual_lateness)
+
+            while True:
+                deadline = self.clock.next_deadline(timeout=60)
+                if deadline is None or deadline > hour_end:
+                    break
+                self.advance_to(deadline)
+            self.advance_to(hour_end)
+
+            cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+            per_hour.append({
+                "hour": datetime.fromtimestamp(hour_end - 3600).strftime("%Y-%m-%d %H:00"),
+                "cpu_seconds": round(cpu, 3),
+                "wall_seconds": round(wall, 3),
+                "jobs": len(self.job_virtual_lateness) - jobs,
+                "emails": self.sends - sends,
+                "peak_rss_mb": peak_rss_mb()
+            })
+        return per_hour
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Simulate scheduler activity for many users in virtual time")
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--start", default="2026-03-02T00:00", help="virtual start time (local)")
+    parser.add_argument("--weekly-share", type=float, default=0.1, help="share of weekly-digest users")
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--json", action="store_true", help="emit machine-readable results")
+    args = parser.parse_args(argv)
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    # Scratch state, and a scratch cwd for files the scheduler writes
+    workdir = tempfile.mkdtemp(prefix="eb1a-sim-")
+    os.environ["STATE_DB_PATH"] = os.path.join(workdir, "state.db")
+    os.environ["TRACE_FILE"] = ""
+    os.environ.pop("METRICS_MULTIPROC_DIR", None)
+    os.chdir(workdir)
+
+    baseline_rss = peak_rss_mb()
+    sim = Simulation(args.users, datetime.fromisoformat(args.start).timestamp(), args.weekly_share, args.seed)
+    setup_rss = peak_rss_mb()
+
+    started_cpu, started_wall = time.process_time(), time.perf_counter()
+    per_hour = sim.run(args.hours)
+    total_cpu, total_wall = time.process_time() - started_cpu, time.perf_counter() - started_wall
+    sim.manager.stop_all()
+
+    cpu_per_hour = [hour["cpu_seconds"] for hour in per_hour]
+    report = {
+        "benchmark": "scheduler_sim",
+        "users": args.users,
+        "virtual_hours": args.hours,
+        "virtual_start": args.start,
+        "setup_seconds": round(sim.setup_seconds, 2),
+        "run_cpu_seconds": round(total_cpu, 2),
+        "run_wall_seconds": round(total_wall, 2),
+        "cpu_seconds_per_virtual_hour": {
+            "mean": round(statistics.fmean(cpu_per_hour), 3) if cpu_per_hour else 0.0,
+            "max": max(cpu_per_hour, default=0.0)
+        },
+        "jobs_run": len(sim.job_virtual_lateness),
+        "jobs_per_cpu_second": round(len(sim.job_virtual_lateness) / total_cpu, 1) if total_cpu else None,
+        "emails_sent": sim.sends,
+        "max_virtual_lateness_seconds": round(max(sim.job_virtual_lateness, default=0.0), 6),
+        "job_latency_wall": {kind: latency_summary(values) for kind, values in sorted(sim.job_wall_latency.items())},
+        "email_due_to_sent_wall": latency_summary(sim.email_latency),
+        "memory": {"baseline_rss_mb": baseline_rss, "after_setup_rss_mb": setup_rss, "peak_rss_mb": peak_rss_mb()},
+        "per_hour": per_hour
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print("=== EB-1A Scheduler Simulation ===")
+    print(f"{args.users} users, {args.hours} virtual hours from {args.start}")
+    print(f"setup {report['setup_seconds']}s, run {report['run_wall_seconds']}s wall / "
+          f"{report['run_cpu_seconds']}s CPU, peak RSS {report['memory']['peak_rss_mb']} MB\n")
+    print(f"{'hour':17s} {'cpu s':>8s} {'jobs':>9s} {'emails':>8s}")
+    for hour in per_hour:
+        print(f"{hour['hour']:17s} {hour['cpu_seconds']:8.3f} {hour['jobs']:9d} {hour['emails']:8d}")
+    print(f"\n{report['jobs_run']} jobs ({report['jobs_per_cpu_second']}/CPU s), "
+          f"{report['emails_sent']} emails, max virtual lateness {report['max_virtual_lateness_seconds']}s")
+    print("\ndue -> completed (wall ms)   p50      p95      p99      max")
+    for kind, summary in list(report["job_latency_wall"].items()) + [("email delivered", report["email_due_to_sent_wall"])]:
+        if summary["count"]:
+            print(f"  {kind:24s} {summary['p50_ms']:8.2f} {summary['p95_ms']:8.2f} "
+                  f"{summary['p99_ms']:8.2f} {summary['max_ms']:8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+EB-1A SMTP Stand-in
+Local SMTP server for delivery benchmarks. It speaks just enough ESMTP
+(EHLO, PIPELINING, AUTH PLAIN/LOGIN, MAIL/RCPT/DATA, NOOP, RSET, QUIT)
+and can add latency so localhost behaves more like a real relay:
+
+* ``latency``: delay on every reply flight (one network round trip;
+  pipelined commands that arrive together share one flight)
+* ``connect_latency``/``auth_latency``: extra delay on the greeting and
+  on AUTH results, standing in for the TCP + TLS handshake and the
+  relay's credential check
+* ``max_messages_per_connection``: answer 421 and hang up after this
+  many messages, like relays that cap session length
+
+Usage:
+    python -m benchmarks.smtp_standin [--port 8025] [--latency 0.002]
+"""
+
+import argparse
+import asyncio
+import base64
+import threading
+import time
+from typing import List, Optional, Tuple
+
+EHLO_LINES = ["PIPELINING", "8BITMIME", "SIZE 52428800", "AUTH PLAIN LOGIN"]
+
+class _Session(asyncio.Protocol):
+    """One client connection"""
+
+    def __init__(self, server: "SMTPStandin"):
+        self.server = server
+        self.loop = asyncio.get_running_loop()
+        self.buffer = bytearray()
+        self.state = "command"
+        self.authenticated = server.credentials is None
+        self.login_user: Optional[str] = None
+        self.recipients = 0
+        self.messages = 0
+        self.closing = False
+        self._scan = 0
+        self._next_write = 0.0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.server.stats["connections"] += 1
+        self._send(["220 eb1a-standin ESMTP ready"], self.server.connect_latency)
+
+    def data_received(self, data: bytes):
+        self.buffer += data
+        replies: List[str] = []
+        delay = 0.0
+
+        while not self.closing:
+            if self.state == "data":
+                # Prefix CRLF so an empty body (".\r\n" right away) is found too
+                framed = b"\r\n" + self.buffer
+                end = framed.find(b"\r\n.\r\n", self._scan)
+                if end < 0:
+                    self._scan = max(0, len(framed) - 4)
+                    break
+                body = bytes(self.buffer[:end])
+                del self.buffer[:end + 3]
+                self._scan = 0
+                replies.append(self._finish_message(body))
+                continue
+
+            index = self.buffer.find(b"\r\n")
+            if index < 0:
+                break
+            line = self.buffer[:index].decode("utf-8", "replace")
+            del self.buffer[:index + 2]
+
+            reply, extra_delay = self._handle(line)
+            replies.append(reply)
+            delay = max(delay, extra_delay)
+
+        if replies:
+            self._send(replies, delay)
+
+    def _handle(self, line: str) -> Tuple[str, float]:
+        if self.state == "auth_plain":
+            self.state = "command"
+            return self._check_plain(line), self.server.auth_latency
+        if self.state == "auth_login_user":
+            self.login_user = _b64decode(line)
+            self.state = "auth_login_password"
+            return "334 UGFzc3dvcmQ6", 0.0
+        if self.state == "auth_login_password":
+            self.state = "command"
+            return self._check(self.login_user, _b64decode(line)), self.server.auth_latency
+
+        verb, _, arg = line.partition(" ")
+        verb = verb.upper()
+
+        if verb == "EHLO":
+            lines = ["eb1a-standin"] + EHLO_LINES
+            return "\r\n".join(f"250-{item}" for item in lines[:-1]) + f"\r\n250 {lines[-1]}", 0.0
+        if verb == "HELO":
+            return "250 eb1a-standin", 0.0
+        if verb == "AUTH":
+            mechanism, _, initial = arg.partition(" ")
+            mechanism = mechanism.upper()
+            if mechanism == "PLAIN":
+                if initial:
+                    return self._check_plain(initial), self.server.auth_latency
+                self.state = "auth_plain"
+                return "334 ", 0.0
+            if mechanism == "LOGIN":
+                self.state = "auth_login_user"
+                return "334 VXNlcm5hbWU6", 0.0
+            return "504 Unrecognized authentication type", 0.0
+        if verb == "STARTTLS":
+            return "454 TLS not available on the stand-in", 0.0
+        if verb == "MAIL":
+            if not self.authenticated:
+                return "530 Authentication required", 0.0
+            limit = self.server.max_messages_per_connection
+            if limit and self.messages >= limit:
+                self.closing = True
+                return "421 Too many messages on this connection", 0.0
+            self.recipients = 0
+            return "250 OK", 0.0
+        if verb == "RCPT":
+            self.recipients += 1
+            return "250 OK", 0.0
+        if verb == "DATA":
+            if not self.recipients:
+                return "503 Need RCPT first", 0.0
+            self.state = "data"
+            return "354 End data with <CR><LF>.<CR><LF>", 0.0
+        if verb in ("NOOP", "RSET"):
+            self.recipients = 0 if verb == "RSET" else self.recipients
+            return "250 OK", 0.0
+        if verb == "QUIT":
+            self.closing = True
+            return "221 Bye", 0.0
+        return "500 Command not recognized", 0.0
+
+    def _check_plain(self, encoded: str) -> str:
+        parts = _b64decode(encoded).split("\0")
+        if len(parts) != 3:
+            return "501 Malformed AUTH PLAIN"
+        return self._check(parts[1], parts[2])
+
+    def _check(self, username: str, password: str) -> str:
+        if self.server.credentials in (None, (username, password)):
+            self.authenticated = True
+            return "235 Authentication successful"
+        self.server.stats["auth_failures"] += 1
+        return "535 Authentication failed"
+
+    def _finish_message(self, body: bytes) -> str:
+        self.state = "command"
+        self.messages += 1
+        self.server.stats["messages"] += 1
+        self.server.stats["bytes"] += len(body)
+        if self.server.keep_messages:
+            self.server.messages.append(body)
+        return "250 OK queued"
+
+    def _send(self, replies: List[str], delay: float):
+        """Write one flight of replies after the simulated latency, in order"""
+        payload = ("\r\n".join(replies) + "\r\n").encode()
+        close = self.closing
+        write_at = max(self._next_write, self.loop.time() + self.server.latency + delay)
+        self._next_write = write_at
+        self.loop.call_at(write_at, self._write, payload, close)
+
+    def _write(self, payload: bytes, close: bool):
+        if self.transport.is_closing():
+            return
+        self.transport.write(payload)
+        if close:
+            self.transport.close()
+
+def _b64decode(value: str) -> str:
+    try:
+        return base64.b64decode(value.strip()).decode("utf-8", "replace")
+    except ValueError:
+        return ""
+
+class SMTPStandin:
+    """The stand-in server, running its own event loop in a background thread"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 connect_latency: float = 0.0, auth_latency: float = 0.0,
+                 credentials: Tuple[str, str] = None, max_messages_per_connection: int = 0,
+                 keep_messages: bool = False):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.auth_latency = auth_latency
+        self.credentials = credentials
+        self.max_messages_per_connection = max_messages_per_connection
+        self.keep_messages = keep_messages
+        self.messages: List[bytes] = []
+        self.stats = {"connections": 0, "messages": 0, "bytes": 0, "auth_failures": 0}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    def start(self) -> Tuple[str, int]:
+        """Start serving; returns the bound (host, port)"""
+        self._thread = threading.Thread(target=self._serve, name="smtp-standin", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self.host, self.port
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        async def open_server():
+            self._server = await self._loop.create_server(lambda: _Session(self), self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+            self._ready.set()
+
+        self._loop.run_until_complete(open_server())
+        self._loop.run_forever()
+        self._server.close()
+        self._loop.run_until_complete(self._server.wait_closed())
+        self._loop.close()
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def reset_stats(self):
+        self.stats = {key: 0 for key in self.stats}
+        self.messages = []
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Run the local SMTP stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per reply flight")
+    parser.add_argument("--connect-latency", type=float, default=0.0)
+    parser.add_argument("--auth-latency", type=float, default=0.0)
+    parser.add_argument("--max-messages-per-connection", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    standin = SMTPStandin(args.host, args.port, latency=args.latency,
+                          connect_latency=args.connect_latency, auth_latency=args.auth_latency,
+                          max_messages_per_connection=args.max_messages_per_connection)
+    host, port = standin.start()
+    print(f"SMTP stand-in listening on {host}:{port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"  {standin.stats}")
+    except KeyboardInterrupt:
+        standin.stop()
+
+if __name__ == "__main__":
+    main()
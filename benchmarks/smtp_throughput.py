@@ -0,0 +1,149 @@
+"""
+EB-1A SMTP Throughput Benchmark
+Sends a batch of real daily emails to the local SMTP stand-in and compares
+delivery transports: a new connection + AUTH per message, pooled smtplib
+sessions, and the pipelining asyncio engine
+
+The stand-in is plaintext, so the TLS handshake is simulated with
+``--handshake`` (delay on the greeting) and AUTH cost with ``--auth``.
+
+Usage:
+    python -m benchmarks.smtp_throughput [--messages 500] [--concurrency 8]
+        [--pool-size 8] [--async-connections 4] [--rtt 0.001] [--handshake 0.03]
+        [--auth 0.02] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from benchmarks.smtp_standin import SMTPStandin
+
+USERNAME, PASSWORD = "bench", "bench-secret"
+
+def make_quota():
+    """A quota in a scratch database with limits the benchmark never hits,
+    so the bookkeeping cost is measured without pacing the sends"""
+    import tempfile
+    from src.send_quota import SendQuota
+    from src.state_store import StateStore
+    path = os.path.join(tempfile.mkdtemp(prefix="eb1a-bench-"), "state.db")
+    return SendQuota(StateStore(path), recipient_limit=10**9, account_daily_limit=10**9,
+                     account_per_minute=10**9)
+
+def build_message(sender) -> Dict[str, Any]:
+    """Render one realistic daily email (same content for every recipient)"""
+    from src.config import create_default_user_profile
+    from src.opportunity_search import OpportunitySearcher
+
+    profile = create_default_user_profile()
+    searcher = OpportunitySearcher(profile.__dict__)
+    opportunities = searcher.filter_opportunities(searcher.search_all_opportunities())
+    return sender.render_daily_opportunities_email(profile, opportunities)
+
+def make_pooled_sender(host: str, port: int, args):
+    from src.email_sender import EmailSender
+    return EmailSender(host, port, USERNAME, PASSWORD, use_tls=False, pool_size=args.pool_size,
+                       quota=args.quota)
+
+def make_connect_sender(host: str, port: int, args):
+    from src.email_sender import EmailSender
+    return EmailSender(host, port, USERNAME, PASSWORD, use_tls=False, pool_size=0, quota=args.quota)
+
+def make_async_sender(host: str, port: int, args):
+    from src.email_sender import AsyncEmailSender
+    return AsyncEmailSender(host, port, USERNAME, PASSWORD, use_tls=False,
+                            connections=args.async_connections, quota=args.quota)
+
+TRANSPORTS: Dict[str, Callable] = {
+    "connect_per_message": make_connect_sender,
+    "pooled": make_pooled_sender,
+    "async": make_async_sender,
+}
+
+def run_transport(name: str, standin: SMTPStandin, args) -> Dict[str, Any]:
+    from src.async_smtp import close_shared_engines
+    from src.smtp_pool import close_shared_pools
+
+    sender = TRANSPORTS[name](standin.host, standin.port, args)
+    message = build_message(sender)
+    standin.reset_stats()
+
+    def send_one(index: int) -> float:
+        started = time.perf_counter()
+        ok = sender.send_email(**dict(message, to_email=f"user{index}@example.com"))
+        if not ok:
+            raise RuntimeError(f"{name}: send {index} failed")
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        latencies = sorted(executor.map(send_one, range(args.messages)))
+    elapsed = time.perf_counter() - started
+    close_shared_pools()
+    close_shared_engines()
+
+    return {
+        "messages": args.messages,
+        "elapsed_seconds": round(elapsed, 3),
+        "messages_per_second": round(args.messages / elapsed, 1),
+        "latency_p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "latency_p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        "server_connections": standin.stats["connections"],
+        "server_messages": standin.stats["messages"]
+    }
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Compare SMTP delivery transports")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--async-connections", type=int, default=4)
+    parser.add_argument("--rtt", type=float, default=0.001, help="seconds per reply flight")
+    parser.add_argument("--handshake", type=float, default=0.03, help="simulated TCP+TLS setup")
+    parser.add_argument("--auth", type=float, default=0.02, help="simulated AUTH check")
+    parser.add_argument("--transports", default=",".join(TRANSPORTS))
+    parser.add_argument("--json", action="store_true", help="emit machine-readable results")
+    args = parser.parse_args(argv)
+
+    import logging
+    logging.disable(logging.WARNING)
+    args.quota = make_quota()
+
+    standin = SMTPStandin(latency=args.rtt, connect_latency=args.handshake,
+                          auth_latency=args.auth, credentials=(USERNAME, PASSWORD))
+    standin.start()
+    try:
+        results = {name: run_transport(name, standin, args) for name in args.transports.split(",")}
+    finally:
+        standin.stop()
+
+    report = {
+        "benchmark": "smtp_throughput",
+        "concurrency": args.concurrency,
+        "pool_size": args.pool_size,
+        "async_connections": args.async_connections,
+        "rtt_ms": args.rtt * 1000,
+        "handshake_ms": args.handshake * 1000,
+        "auth_ms": args.auth * 1000,
+        "transports": results
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print("=== EB-1A SMTP Throughput ===")
+    print(f"{args.messages} messages, {args.concurrency} senders, "
+          f"rtt {report['rtt_ms']} ms, handshake {report['handshake_ms']} ms, auth {report['auth_ms']} ms\n")
+    for name, result in results.items():
+        print(f"{name:22s} {result['messages_per_second']:8.1f} msg/s  "
+              f"p50 {result['latency_p50_ms']:7.2f} ms  p95 {result['latency_p95_ms']:7.2f} ms  "
+              f"connections {result['server_connections']}")
+
+if __name__ == "__main__":
+    main()
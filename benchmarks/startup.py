@@ -0,0 +1,103 @@
+"""
+EB-1A Startup Benchmark
+Measures worker boot cost: import time of src.main (via ``python -X importtime``)
+and the time spent in the deferred bootstrap()
+
+Usage:
+    python -m benchmarks.startup [--runs 5] [--top 15] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BOOT_SNIPPET = """
+import time
+t0 = time.perf_counter()
+import src.main
+t1 = time.perf_counter()
+src.main.bootstrap(src.main.app)
+t2 = time.perf_counter()
+src.main.scheduler_lease.stop()
+print(f"BOOT {t1 - t0:.6f} {t2 - t1:.6f}")
+"""
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """Parse ``-X importtime`` output into {module: (self_us, cumulative_us)}"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        name = parts[2].strip()
+        modules[name] = (int(parts[0]), int(parts[1]))
+    return modules
+
+def run_once(env: Dict[str, str]) -> Tuple[Dict[str, Tuple[int, int]], float, float]:
+    """Boot the app once in a fresh interpreter"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT_SNIPPET],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    boot_line = next(line for line in proc.stdout.splitlines() if line.startswith("BOOT "))
+    _, import_s, bootstrap_s = boot_line.split()
+    return parse_importtime(proc.stderr), float(import_s), float(bootstrap_s)
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Measure worker startup cost")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="emit machine-readable results")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="eb1a-startup-")
+    env = dict(os.environ)
+    env.update({
+        "STATE_DB_PATH": os.path.join(workdir, "state.db"),
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'app.db')}",
+        "PYTHONPATH": REPO_ROOT
+    })
+
+    imports, bootstraps, cumulative = [], [], {}
+    for _ in range(args.runs):
+        modules, import_s, bootstrap_s = run_once(env)
+        imports.append(import_s)
+        bootstraps.append(bootstrap_s)
+        for name, (_, cum_us) in modules.items():
+            cumulative.setdefault(name, []).append(cum_us)
+
+    top = sorted(
+        ((name, statistics.median(values)) for name, values in cumulative.items()),
+        key=lambda item: item[1], reverse=True
+    )[:args.top]
+
+    results = {
+        "benchmark": "startup",
+        "runs": args.runs,
+        "import_src_main_ms": round(statistics.median(imports) * 1000, 2),
+        "bootstrap_ms": round(statistics.median(bootstraps) * 1000, 2),
+        "top_imports_cumulative_ms": {name: round(us / 1000, 2) for name, us in top}
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=== EB-1A Worker Startup ===")
+    print(f"import src.main: {results['import_src_main_ms']} ms (median of {args.runs})")
+    print(f"bootstrap():     {results['bootstrap_ms']} ms")
+    print(f"\nSlowest imports (cumulative):")
+    for name, ms in results["top_imports_cumulative_ms"].items():
+        print(f"  {ms:8.2f} ms  {name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# Gunicorn configuration for the EB-1A Opportunity System
+# Picked up automatically when gunicorn runs from the repository root
+# (start.sh, Dockerfile and Procfile all do).
+
+import os
+import tempfile
+
+# Import the app once in the master and fork workers from it. This is safe
+# because importing src.main has no side effects: database setup, the
+# scheduler and the leader lease all start per worker in post_worker_init.
+preload_app = True
+
+# Threaded workers, so a long-lived /api/jobs/<id>/events stream ties up a
+# thread rather than one of the few worker processes (which also run the
+# jobs, the scheduler and the leader lease). Streams still end after
+# JOB_STREAM_MAX_SECONDS and the browser reconnects.
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+
+def post_worker_init(worker):
+    """Run the per-process startup work as soon as the worker is ready"""
+    from src.main import app, bootstrap
+    bootstrap(app)
+
+# Workers write metrics to per-process files here and /metrics sums them.
+# Set before the app is imported so SystemConfig picks it up.
+metrics_dir = os.environ.setdefault(
+    "METRICS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "eb1a-metrics")
+)
+
+def on_starting(server):
+    """Start every run with empty metric files"""
+    from src.metrics import reset_multiprocess_dir
+    reset_multiprocess_dir(metrics_dir)
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges (its counters stay in the totals)"""
+    from src.metrics import mark_process_dead
+    mark_process_dead(worker.pid, metrics_dir)
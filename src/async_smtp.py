@@ -0,0 +1,331 @@
+"""
+EB-1A Async SMTP Module
+asyncio SMTP delivery engine: a few persistent connections on one event
+loop, commands pipelined (RFC 2920), transient failures retried
+"""
+
+import asyncio
+import base64
+import io
+import re
+import smtplib
+import ssl
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from email.generator import BytesGenerator
+from email.message import Message
+from email.utils import getaddresses
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.config import SystemConfig
+from src.mime_builder import PreparedMessage
+from src.metrics import SMTP_SEND_SECONDS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_LEADING_DOT = re.compile(rb"(?m)^\.")
+
+def serialize_message(msg) -> Tuple[str, List[str], bytes]:
+    """Envelope sender, recipients and dot-stuffed DATA payload for a message"""
+    if isinstance(msg, PreparedMessage):
+        return msg.envelope_from, msg.recipients, msg.as_data()
+
+    from_addr = getaddresses([msg["From"] or ""])[0][1]
+    recipients = [addr for _, addr in getaddresses(
+        msg.get_all("To", []) + msg.get_all("Cc", []) + msg.get_all("Bcc", [])) if addr]
+
+    with io.BytesIO() as buffer:
+        BytesGenerator(buffer).flatten(msg, linesep="\r\n")
+        data = buffer.getvalue()
+
+    data = _LEADING_DOT.sub(b"..", data)
+    if not data.endswith(b"\r\n"):
+        data += b"\r\n"
+    return from_addr, recipients, data + b".\r\n"
+
+def is_transient(error: Exception) -> bool:
+    """Whether a failed send is worth retrying on a fresh connection"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, (smtplib.SMTPServerDisconnected, asyncio.TimeoutError,
+                              ConnectionError, OSError))
+
+class AsyncSMTPConnection:
+    """One ESMTP session over asyncio streams"""
+
+    def __init__(self, host: str, port: int, username: str = None, password: str = None,
+                 use_tls: bool = True, timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.extensions: Set[str] = set()
+        self.messages_sent = 0
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+        await self._expect(220, smtplib.SMTPConnectError)
+        await self._ehlo()
+
+        if self.use_tls:
+            await self._command("STARTTLS", 220)
+            await self._writer.start_tls(ssl.create_default_context(), server_hostname=self.host)
+            await self._ehlo()
+
+        if self.username:
+            token = base64.b64encode(f"\0{self.username}\0{self.password}".encode()).decode()
+            code, text = await self._command(f"AUTH PLAIN {token}")
+            if code != 235:
+                raise smtplib.SMTPAuthenticationError(code, text)
+
+    async def _ehlo(self):
+        code, text = await self._command("EHLO eb1a-opportunity-system", 250)
+        self.extensions = {line.split(" ")[0].upper() for line in text.splitlines()[1:]}
+
+    async def _read_reply(self) -> Tuple[int, str]:
+        lines = []
+        while True:
+            line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+            if not line:
+                raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+            lines.append(line[4:].strip().decode("utf-8", "replace"))
+            if line[3:4] != b"-":
+                return int(line[:3]), "\n".join(lines)
+
+    async def _expect(self, code: int, error=smtplib.SMTPResponseException) -> str:
+        reply_code, text = await self._read_reply()
+        if reply_code != code:
+            raise error(reply_code, text)
+        return text
+
+    async def _command(self, line: str, expect: int = None) -> Tuple[int, str]:
+        self._writer.write(f"{line}\r\n".encode())
+        await self._writer.drain()
+        code, text = await self._read_reply()
+        if expect is not None and code != expect:
+            raise smtplib.SMTPResponseException(code, text)
+        return code, text
+
+    async def send(self, from_addr: str, recipients: List[str], data: bytes):
+        """Send one message: MAIL, RCPTs and DATA go out in one flight when pipelining"""
+        commands = [f"MAIL FROM:<{from_addr}>"] + [f"RCPT TO:<{rcpt}>" for rcpt in recipients] + ["DATA"]
+
+        if "PIPELINING" in self.extensions:
+            self._writer.write("".join(f"{command}\r\n" for command in commands).encode())
+            await self._writer.drain()
+            replies = []
+            for _ in commands:
+                replies.append(await self._read_reply())
+                if replies[-1][0] == 421:  # server is closing the session
+                    raise smtplib.SMTPResponseException(*replies[-1])
+        else:
+            replies = []
+            for command in commands:
+                replies.append(await self._command(command))
+                if replies[-1][0] >= 400:
+                    break
+
+        (mail_code, mail_text), rcpt_replies = replies[0], replies[1:len(recipients) + 1]
+        data_code, data_text = replies[-1] if len(replies) == len(commands) else (503, "DATA not sent")
+        refused = {rcpt: reply for rcpt, reply in zip(recipients, rcpt_replies) if reply[0] >= 400}
+
+        if mail_code != 250 or len(refused) == len(recipients) or data_code != 354:
+            if data_code == 354:
+                await self._command(".")  # server is waiting for a body; end it empty
+            await self._command("RSET")
+            if mail_code != 250:
+                raise smtplib.SMTPSenderRefused(mail_code, mail_text, from_addr)
+            if refused:
+                raise smtplib.SMTPRecipientsRefused(refused)
+            raise smtplib.SMTPDataError(data_code, data_text)
+
+        self._writer.write(data)
+        await self._writer.drain()
+        code, text = await self._read_reply()
+        if code != 250:
+            raise smtplib.SMTPDataError(code, text)
+        self.messages_sent += 1
+
+    async def quit(self):
+        try:
+            await self._command("QUIT")
+        except Exception:
+            pass
+        self.close()
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+class AsyncSMTPDelivery:
+    """Delivery engine running its own event loop in a background thread.
+
+    ``connections`` worker tasks each hold one session and take messages
+    from a shared queue, so thousands of sends share a handful of
+    connections without a thread per message. Transient failures (4xx,
+    resets, timeouts) close the session and requeue the message after an
+    exponential backoff, up to ``retries`` times. Permanent (5xx) failures
+    fail immediately.
+
+    Blocking callers use ``send_message``/``send_many``, which hand work to
+    the loop and wait on a future.
+    """
+
+    def __init__(self, host: str, port: int, username: str = None, password: str = None,
+                 use_tls: bool = True, connections: int = None, retries: int = None,
+                 retry_backoff: float = 1.0, max_messages_per_connection: int = None,
+                 timeout: float = None):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.connections = max(1, connections or SystemConfig.SMTP_ASYNC_CONNECTIONS)
+        self.retries = SystemConfig.SMTP_RETRIES if retries is None else retries
+        self.retry_backoff = retry_backoff
+        self.max_messages_per_connection = (max_messages_per_connection
+                                            or SystemConfig.SMTP_MAX_MESSAGES_PER_CONNECTION)
+        self.timeout = timeout or SystemConfig.SMTP_TIMEOUT
+
+        self.stats = {"connects": 0, "messages_sent": 0, "retries": 0, "failures": 0}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._workers: List[asyncio.Task] = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the event loop thread (idempotent)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._serve, args=(ready,),
+                                            name="eb1a-async-smtp", daemon=True)
+            self._thread.start()
+            ready.wait(5)
+
+    def _serve(self, ready: threading.Event):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        self._workers = [self._loop.create_task(self._worker(index)) for index in range(self.connections)]
+        ready.set()
+        self._loop.run_forever()
+
+        for task in self._workers:
+            task.cancel()
+        self._loop.run_until_complete(asyncio.gather(*self._workers, return_exceptions=True))
+        self._loop.close()
+
+    async def _worker(self, index: int):
+        conn: Optional[AsyncSMTPConnection] = None
+        try:
+            while True:
+                from_addr, recipients, data, future, attempt = await self._queue.get()
+                if future.cancelled():
+                    continue
+
+                started = time.perf_counter()
+                try:
+                    if conn is None:
+                        conn = AsyncSMTPConnection(self.host, self.port, self.username, self.password,
+                                                   self.use_tls, self.timeout)
+                        await conn.connect()
+                        self.stats["connects"] += 1
+
+                    await conn.send(from_addr, recipients, data)
+                    SMTP_SEND_SECONDS.labels("async", "ok").observe(time.perf_counter() - started)
+                    self.stats["messages_sent"] += 1
+                    future.set_result(None)
+
+                    if conn.messages_sent >= self.max_messages_per_connection:
+                        await conn.quit()
+                        conn = None
+
+                except Exception as e:
+                    SMTP_SEND_SECONDS.labels("async", "error").observe(time.perf_counter() - started)
+                    if conn is not None and not isinstance(e, smtplib.SMTPRecipientsRefused):
+                        conn.close()
+                        conn = None
+
+                    if attempt < self.retries and is_transient(e):
+                        self.stats["retries"] += 1
+                        delay = self.retry_backoff * (2 ** attempt)
+                        logger.warning(f"SMTP send failed ({str(e)}); retrying in {delay:.1f}s")
+                        self._loop.call_later(delay, self._queue.put_nowait,
+                                              (from_addr, recipients, data, future, attempt + 1))
+                    else:
+                        self.stats["failures"] += 1
+                        future.set_exception(e)
+        finally:
+            if conn is not None:
+                await conn.quit()
+
+    def submit(self, msg: Message) -> Future:
+        """Queue a message; the returned future resolves once the server accepts it"""
+        self.start()
+        from_addr, recipients, data = serialize_message(msg)
+
+        async def enqueue():
+            future = self._loop.create_future()
+            self._queue.put_nowait((from_addr, recipients, data, future, 0))
+            return await future
+
+        return asyncio.run_coroutine_threadsafe(enqueue(), self._loop)
+
+    def send_message(self, msg: Message):
+        """Send and wait; raises the final error if every attempt failed"""
+        self.submit(msg).result()
+
+    def send_many(self, messages: Iterable[Message]) -> List[Optional[Exception]]:
+        """Send a batch concurrently; returns None or the error for each message"""
+        futures = [self.submit(msg) for msg in messages]
+        return [future.exception() for future in futures]
+
+    def close(self):
+        """Stop the loop; idle sessions are closed with QUIT"""
+        with self._lock:
+            if self._loop is not None and self._loop.is_running():
+                self._loop.call_soon_threadsafe(self._loop.stop)
+            if self._thread:
+                self._thread.join(timeout=10)
+            self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, connections=self.connections,
+                    queued=self._queue.qsize() if self._queue is not None else 0)
+
+_shared_engines: Dict[tuple, AsyncSMTPDelivery] = {}
+_shared_engines_lock = threading.Lock()
+
+def get_shared_engine(host: str, port: int, username: str = None, password: str = None,
+                      use_tls: bool = True, connections: int = None) -> AsyncSMTPDelivery:
+    """Get the process-wide engine for an SMTP account"""
+    key = (host, port, username, password, use_tls)
+    with _shared_engines_lock:
+        engine = _shared_engines.get(key)
+        if engine is None:
+            engine = _shared_engines[key] = AsyncSMTPDelivery(host, port, username, password, use_tls,
+                                                              connections=connections)
+        return engine
+
+def close_shared_engines():
+    """Stop every shared engine (on shutdown)"""
+    with _shared_engines_lock:
+        engines = list(_shared_engines.values())
+        _shared_engines.clear()
+    for engine in engines:
+        engine.close()
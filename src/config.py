@@ -4,10 +4,39 @@ Centralized configuration for the entire system
 """
 
 import os
+import json
+import tempfile
+from functools import lru_cache
 from typing import Dict, List, Any
 from dataclasses import dataclass
 from enum import Enum
 
+CONFIG_TABLES_PATH = os.path.join(os.path.dirname(__file__), 'data', 'config_tables.json')
+
+@lru_cache(maxsize=1)
+def load_config_tables() -> Dict[str, Any]:
+    """Load the large keyword/source tables from the bundled data file"""
+    with open(CONFIG_TABLES_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class _LazyTable:
+    """Class attribute whose value is read from config_tables.json on first access.
+
+    After the first read the descriptor replaces itself with the plain value,
+    so later lookups cost the same as an ordinary class attribute.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        value = load_config_tables()[self.key]
+        setattr(owner, self.name, value)
+        return value
+
 class EmailFormat(Enum):
     PLAIN_TEXT = "plain_text"
     HTML = "html"
@@ -33,6 +62,7 @@ class UserProfile:
     email_format: EmailFormat = EmailFormat.HTML
     max_opportunities_per_email: int = 10
     timezone: str = "America/Chicago"  # Austin, Texas timezone
+    send_time: str = "08:00"  # local time of day for daily emails
     
 class SystemConfig:
     """System-wide configuration"""
@@ -43,551 +73,46 @@ class SystemConfig:
     EMAIL_USERNAME = os.getenv('EMAIL_USERNAME', '')
     EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD', '')
     FROM_EMAIL = os.getenv('FROM_EMAIL', 'eb1a-opportunities@example.com')
+    SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', 'true').lower() != 'false'
+    SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', '30'))
     
-    # Search settings
-    SEARCH_KEYWORDS = [
-        "Call for papers", "CFP", "Conference", "Workshop", "Symposium",
-        "Peer reviewer", "Editorial board", "Journal reviewer",
-        "Expert commentary", "Media interview", "Press quote",
-        "Award nomination", "Competition", "Recognition",
-        "Speaking opportunity", "Keynote", "Panel discussion",
-        "Networking event", "Professional association", "Industry meetup",
-        "Call for submissions", "Call for proposals", "Call for speakers",
-        "Call for judges", "Call for reviewers", "Call for experts",
-        "Call for contributors", "Call for authors", "Call for presenters",
-        "Call for panelists", "Call for moderators", "Call for mentors",
-        "Call for advisors", "Call for consultants", "Call for specialists",
-        "Call for thought leaders", "Call for influencers", "Call for advocates",
-        "Call for ambassadors", "Call for champions", "Call for pioneers",
-        "Call for innovators", "Call for researchers", "Call for practitioners",
-        "Call for professionals", "Call for experts", "Call for specialists",
-        "Call for consultants", "Call for advisors", "Call for mentors",
-        "Call for coaches", "Call for trainers", "Call for educators",
-        "Call for instructors", "Call for facilitators", "Call for moderators",
-        "Call for hosts", "Call for emcees", "Call for presenters",
-        "Call for speakers", "Call for panelists", "Call for discussants",
-        "Call for participants", "Call for attendees", "Call for delegates",
-        "Call for representatives", "Call for advocates", "Call for champions",
-        "Call for ambassadors", "Call for spokespersons", "Call for representatives",
-        "Call for delegates", "Call for participants", "Call for contributors",
-        "Call for authors", "Call for writers", "Call for bloggers",
-        "Call for journalists", "Call for reporters", "Call for correspondents",
-        "Call for editors", "Call for publishers", "Call for distributors",
-        "Call for marketers", "Call for promoters", "Call for advertisers",
-        "Call for sponsors", "Call for partners", "Call for collaborators",
-        "Call for co-authors", "Call for co-presenters", "Call for co-moderators",
-        "Call for co-facilitators", "Call for co-trainers", "Call for co-instructors",
-        "Call for co-educators", "Call for co-coaches", "Call for co-mentors",
-        "Call for co-advisors", "Call for co-consultants", "Call for co-specialists",
-        "Call for co-experts", "Call for co-professionals", "Call for co-practitioners",
-        "Call for co-researchers", "Call for co-innovators", "Call for co-pioneers",
-        "Call for co-champions", "Call for co-ambassadors", "Call for co-advocates",
-        "Call for co-influencers", "Call for co-thought leaders", "Call for co-specialists",
-        "Call for co-consultants", "Call for co-advisors", "Call for co-mentors",
-        "Call for co-coaches", "Call for co-trainers", "Call for co-educators",
-        "Call for co-instructors", "Call for co-facilitators", "Call for co-moderators",
-        "Call for co-presenters", "Call for co-speakers", "Call for co-panelists",
-        "Call for co-discussants", "Call for co-participants", "Call for co-attendees",
-        "Call for co-delegates", "Call for co-representatives", "Call for co-advocates",
-        "Call for co-champions", "Call for co-ambassadors", "Call for co-spokespersons",
-        "Call for co-representatives", "Call for co-delegates", "Call for co-participants",
-        "Call for co-contributors", "Call for co-authors", "Call for co-writers",
-        "Call for co-bloggers", "Call for co-journalists", "Call for co-reporters",
-        "Call for co-correspondents", "Call for co-editors", "Call for co-publishers",
-        "Call for co-distributors", "Call for co-marketers", "Call for co-promoters",
-        "Call for co-advertisers", "Call for co-sponsors", "Call for co-partners",
-        "Call for co-collaborators", "Call for co-authors", "Call for co-presenters",
-        "Call for co-moderators", "Call for co-facilitators", "Call for co-trainers",
-        "Call for co-instructors", "Call for co-educators", "Call for co-coaches",
-        "Call for co-mentors", "Call for co-advisors", "Call for co-consultants",
-        "Call for co-specialists", "Call for co-experts", "Call for co-professionals",
-        "Call for co-practitioners", "Call for co-researchers", "Call for co-innovators",
-        "Call for co-pioneers", "Call for co-champions", "Call for co-ambassadors",
-        "Call for co-advocates", "Call for co-influencers", "Call for co-thought leaders"
-    ]
+    # SMTP connection pool (0 disables pooling: one connection per message)
+    SMTP_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', '8'))
+    SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv('SMTP_MAX_MESSAGES_PER_CONNECTION', '100'))
+    SMTP_HEALTH_CHECK_SECONDS = float(os.getenv('SMTP_HEALTH_CHECK_SECONDS', '30'))
+    
+    # Delivery backend: "pool" (blocking smtplib sessions) or "async" (asyncio engine)
+    SMTP_BACKEND = os.getenv('SMTP_BACKEND', 'pool')
+    SMTP_ASYNC_CONNECTIONS = int(os.getenv('SMTP_ASYNC_CONNECTIONS', '4'))
+    SMTP_RETRIES = int(os.getenv('SMTP_RETRIES', '2'))
+    
+    # Search settings (large tables live in data/config_tables.json and load on first access)
+    SEARCH_KEYWORDS = _LazyTable("search_keywords")
     
     # Field-specific keywords
-    FIELD_KEYWORDS = {
-        "AI/ML": [
-            "Artificial Intelligence", "Machine Learning", "Deep Learning",
-            "Neural Networks", "Computer Vision", "Natural Language Processing",
-            "Reinforcement Learning", "MLOps", "AI Ethics"
-        ],
-        "Cloud Native": [
-            "Kubernetes", "Docker", "Microservices", "Serverless",
-            "Container Orchestration", "Cloud Architecture", "DevOps",
-            "Infrastructure as Code", "Service Mesh"
-        ],
-        "DevSecOps": [
-            "DevSecOps", "Security Automation", "CI/CD Security",
-            "Infrastructure Security", "Application Security",
-            "Security Testing", "Compliance Automation"
-        ],
-        "Cybersecurity": [
-            "Information Security", "Cyber Defense", "Threat Intelligence",
-            "Incident Response", "Security Architecture", "Risk Management",
-            "Penetration Testing", "Security Governance"
-        ]
-    }
+    FIELD_KEYWORDS = _LazyTable("field_keywords")
     
     # Opportunity sources
-    OPPORTUNITY_SOURCES = {
-        "academic": [
-            "https://www.wikicfp.com/cfp/",
-            "https://www.conference-service.com/",
-            "https://academic.microsoft.com/",
-            "https://www.allconferences.com/",
-            "https://www.papercrowd.com/",
-            "https://easychair.org/cfp/",
-            "https://www.researchr.org/conferences/",
-            "https://www.sciencedz.net/en/conference/",
-            "https://www.conferencealerts.com/",
-            "https://www.ieee.org/conferences_events/index.html",
-            "https://www.springer.com/gp/computer-science/lncs/conference-proceedings",
-            "https://www.nature.com/natureevents/science/events",
-            "https://www.eventbrite.com/d/online/academic-conference/",
-            "https://www.academic-conferences.org/",
-            "https://www.elsevier.com/events/conferences",
-            "https://www.oxfordabstracts.com/events",
-            "https://www.exordo.com/conferences/",
-            "https://www.cvent.com/en/conferences",
-            "https://www.universe.com/events/academic",
-            "https://www.eventsinamerica.com/education/academic",
-            "https://www.grantforward.com/",
-            "https://www.higheredjobs.com/faculty/search.cfm",
-            "https://www.academicpositions.com/",
-            "https://www.academiceventlist.com/",
-            "https://www.findaphd.com/phds/events/",
-            "https://www.timeshighereducation.com/unijobs/listings/academic/",
-            "https://www.academics.com/science-jobs",
-            "https://www.scholarshipportal.com/",
-            "https://www.researchgate.net/jobs",
-            "https://www.academicgates.com/",
-            "https://www.call4papers.info/",
-            "https://www.conferencecalendar.com/",
-            "https://www.conferenceindex.org/",
-            "https://www.conference-locator.com/",
-            "https://www.conferencealerts.com/",
-            "https://www.callforpapers.co/",
-            "https://www.cfpcalendar.com/",
-            "https://www.conference-service.com/",
-            "https://www.researchgate.net/events",
-            "https://www.academia.edu/events",
-            "https://www.scholar.google.com/",
-            "https://www.semanticscholar.org/",
-            "https://www.arxiv.org/",
-            "https://www.biorxiv.org/",
-            "https://www.medrxiv.org/",
-            "https://waset.org/",
-            "https://www.guide2research.com/",
-            "https://www.acm.org/conferences"
-        ],
-        "media": [
-            "https://www.helpareporter.com/",
-            "https://profnet.prnewswire.com/",
-            "https://www.sourcebottle.com/",
-            "https://www.expertfile.com/",
-            "https://www.qwoted.com/",
-            "https://www.journalistrequest.com/",
-            "https://www.expertisefinder.com/",
-            "https://www.matchmaker.fm/",
-            "https://www.radioguestlist.com/",
-            "https://www.podcastguests.com/",
-            "https://www.medialist.io/",
-            "https://www.experts.com/",
-            "https://www.speakermatch.com/",
-            "https://www.speakerhub.com/",
-            "https://www.bullhorn.com/blog/media-opportunities/",
-            "https://www.muckrack.com/",
-            "https://www.prnewswire.com/",
-            "https://www.businesswire.com/",
-            "https://www.newswise.com/",
-            "https://www.expertclick.com/",
-            "https://www.talkers.com/",
-            "https://www.theopennotebook.com/pitch-database/",
-            "https://www.freelancewriting.com/journalism/media-contacts/",
-            "https://www.journalism.co.uk/media-database/s43/",
-            "https://www.pressrush.com/",
-            "https://www.presshunt.co/",
-            "https://www.presscontact.co/",
-            "https://www.mediacontactslist.com/",
-            "https://www.rosterfy.com/blog/media-opportunities",
-            "https://www.podchaser.com/creators",
-            "https://www.harojournalist.com/",
-            "https://www.helpareporterout.com/",
-            "https://www.terkel.io/",
-            "https://www.answerthepublic.com/",
-            "https://www.quora.com/",
-            "https://www.reddit.com/r/IAmA/",
-            "https://www.linkedin.com/pulse/",
-            "https://www.medium.com/",
-            "https://www.substack.com/",
-            "https://www.techcrunch.com/",
-            "https://www.wired.com/",
-            "https://www.theverge.com/",
-            "https://www.ars-technica.com/",
-            "https://www.venturebeat.com/",
-            "https://www.thenextweb.com/",
-            "https://www.readwrite.com/",
-            "https://www.techrepublic.com/",
-            "https://www.zdnet.com/",
-            "https://www.cnet.com/",
-            "https://www.engadget.com/",
-            "https://www.gizmodo.com/",
-            "https://www.mashable.com/",
-            "https://www.digitaltrends.com/",
-            "https://www.expertbeacon.com/",
-            "https://www.presshunt.com/",
-            "https://www.featuredexperts.com/",
-            "https://www.responsesource.com/",
-            "https://journorequest.com/"
-        ],
-        "awards": [
-            "https://awards.ai/",
-            "https://www.computerworld.com/events/",
-            "https://www.cybersecurityexcellenceawards.com/",
-            "https://www.stevieawards.com/",
-            "https://www.globeeawards.com/",
-            "https://www.iaawards.org/",
-            "https://www.technologyawards.org/",
-            "https://www.aitop100.com/",
-            "https://www.innovationawardshub.com/",
-            "https://www.efma.com/awards",
-            "https://www.elsevier.com/awards",
-            "https://www.ieee.org/about/awards/index.html",
-            "https://www.acm.org/awards",
-            "https://www.fastcompany.com/most-innovative-companies",
-            "https://www.forbes.com/innovation-awards/",
-            "https://www.inc.com/inc5000",
-            "https://www.americanbusinessawards.com/",
-            "https://www.thetieawards.com/",
-            "https://www.globalbankingandfinance.com/awards/",
-            "https://www.womenintechawards.com/",
-            "https://www.edisonawards.com/",
-            "https://www.risingstarsawards.com/",
-            "https://www.royalsociety.org/grants-schemes-awards/awards/",
-            "https://www.nationalmedals.org/",
-            "https://www.nsf.gov/awards/managing/",
-            "https://www.elsevier.com/awards/global-awards",
-            "https://www.ashoka.org/en-us/awards",
-            "https://www.aaas.org/awards",
-            "https://www.royalacademy.org.uk/awards",
-            "https://www.technologyreview.com/innovators-under-35/",
-            "https://www.techcrunch.com/disrupt/",
-            "https://www.sxsw.com/awards/",
-            "https://www.ces.tech/Innovation-Awards/",
-            "https://www.webbyawards.com/",
-            "https://www.shortyawards.com/",
-            "https://www.canneslions.com/",
-            "https://www.clioawards.com/",
-            "https://www.one-show.org/",
-            "https://www.dandad.org/awards/",
-            "https://www.behance.net/awards",
-            "https://www.awwwards.com/",
-            "https://www.cssdesignawards.com/",
-            "https://www.fwa.com/",
-            "https://www.thefwa.com/",
-            "https://www.smashingmagazine.com/awards/",
-            "https://www.csswinner.com/",
-            "https://www.cssreel.com/",
-            "https://www.cssmania.com/",
-            "https://www.cssdesignawards.com/",
-            "https://www.csswinner.com/",
-            "https://www.cssreel.com/",
-            "https://www.cssmania.com/",
-            "https://www.techcrunch.com/events/",
-            "https://www.crunchbase.com/lists/",
-            "https://www.forbes.com/lists/",
-            "https://www.inc.com/best-in-business/",
-            "https://www.fastcompany.com/most-innovative-companies/",
-            "https://www.entrepreneur.com/franchises/topfranchises/",
-            "https://www.businessinsider.com/sai-100/",
-            "https://www.mit.com/innovators-under-35/",
-            "https://www.technologyreview.com/lists/innovators-under-35/",
-            "https://www.worldtechnologyawards.com/",
-            "https://www.webbyawards.com/",
-            "https://www.innovationawards.com/"
-        ],
-        "networking": [
-            "https://www.meetup.com/",
-            "https://www.eventbrite.com/",
-            "https://live360events.com/",
-            "https://www.linkedin.com/events/",
-            "https://hopin.com/events",
-            "https://www.bizzabo.com/events",
-            "https://www.confabb.com/",
-            "https://www.eventful.com/",
-            "https://www.universe.com/",
-            "https://www.splashthat.com/",
-            "https://www.ti.to/",
-            "https://www.eventzilla.net/",
-            "https://www.10times.com/",
-            "https://www.eventdex.com/",
-            "https://www.eventleaf.com/",
-            "https://www.cvent.com/en/event-management-software",
-            "https://www.eventscase.com/",
-            "https://www.eventbrite.co.uk/d/online/networking--events/",
-            "https://www.eventbrite.com/d/online/tech-meetup/",
-            "https://www.eventbrite.com/d/online/professional-networking/",
-            "https://www.techmeme.com/events",
-            "https://www.techconferences.com/",
-            "https://www.startupgrind.com/events/",
-            "https://www.womenwhocode.com/events",
-            "https://www.devopsdays.org/events/",
-            "https://www.producthunt.com/events",
-            "https://www.eventfinda.com/",
-            "https://www.eventkeeper.com/",
-            "https://www.eventbrite.com/d/online/ai-events/",
-            "https://www.eventbrite.com/d/online/cloud-events/",
-            "https://www.slack.com/",
-            "https://www.discord.com/",
-            "https://www.telegram.org/",
-            "https://www.signal.org/",
-            "https://www.clubhouse.com/",
-            "https://www.tiktok.com/",
-            "https://www.youtube.com/",
-            "https://www.twitch.tv/",
-            "https://www.reddit.com/",
-            "https://www.hackernews.com/",
-            "https://www.stackoverflow.com/",
-            "https://www.github.com/",
-            "https://www.gitlab.com/",
-            "https://www.bitbucket.org/",
-            "https://www.docker.com/",
-            "https://www.kubernetes.io/",
-            "https://www.aws.amazon.com/",
-            "https://www.azure.microsoft.com/",
-            "https://www.cloud.google.com/",
-            "https://www.techcrunch.com/events/",
-            "https://events.venturebeat.com/",
-            "https://www.sxsw.com/",
-            "https://www.tedxtalks.ted.com/",
-            "https://www.ted.com/",
-            "https://www.facebook.com/events/",
-            "https://www.crunchbase.com/events/",
-            "https://www.angellist.com/events",
-            "https://www.producthunt.com/events"
-        ],
-        "writing": [
-            "https://www.medium.com/",
-            "https://www.substack.com/",
-            "https://www.hashnode.com/",
-            "https://www.dev.to/",
-            "https://www.hackernoon.com/",
-            "https://www.towardsdatascience.com/",
-            "https://www.analyticsvidhya.com/",
-            "https://www.kdnuggets.com/",
-            "https://www.datasciencecentral.com/",
-            "https://www.oreilly.com/",
-            "https://www.packtpub.com/",
-            "https://www.apress.com/",
-            "https://www.manning.com/",
-            "https://www.pearson.com/",
-            "https://www.mcgraw-hill.com/",
-            "https://www.wiley.com/",
-            "https://www.springer.com/",
-            "https://www.elsevier.com/",
-            "https://www.ieee.org/publications/",
-            "https://www.acm.org/publications/",
-            "https://www.usenix.org/publications/",
-            "https://www.usenix.org/conferences/",
-            "https://www.sigcomm.org/publications/",
-            "https://www.sigchi.org/publications/",
-            "https://www.sigkdd.org/publications/",
-            "https://www.sigmod.org/publications/",
-            "https://www.siggraph.org/publications/",
-            "https://www.sigir.org/publications/",
-            "https://www.sigsoft.org/publications/",
-            "https://www.sigplan.org/publications/",
-            "https://www.sigops.org/publications/",
-            "https://www.sigarch.org/publications/",
-            "https://www.sigmobile.org/publications/",
-            "https://www.sigmetrics.org/publications/",
-            "https://www.sigcomm.org/publications/",
-            "https://www.sigchi.org/publications/",
-            "https://www.sigkdd.org/publications/",
-            "https://www.sigmod.org/publications/",
-            "https://www.siggraph.org/publications/",
-            "https://www.sigir.org/publications/",
-            "https://www.sigsoft.org/publications/",
-            "https://www.sigplan.org/publications/",
-            "https://www.sigops.org/publications/",
-            "https://www.sigarch.org/publications/",
-            "https://www.sigmobile.org/publications/",
-            "https://www.sigmetrics.org/publications/"
-        ],
-        "speaking": [
-            "https://www.ted.com/tedx",
-            "https://www.speakerhub.com/",
-            "https://www.speakermatch.com/",
-            "https://www.speakerbureau.com/",
-            "https://www.speakers.com/",
-            "https://www.allamericanspeakers.com/",
-            "https://www.celebrityspeakers.com/",
-            "https://www.speakerscorner.co.uk/",
-            "https://www.speakers.co.uk/",
-            "https://www.speakersbureau.com/",
-            "https://www.speakers.com/",
-            "https://www.allamericanspeakers.com/",
-            "https://www.celebrityspeakers.com/",
-            "https://www.speakerscorner.co.uk/",
-            "https://www.speakers.co.uk/",
-            "https://www.speakersbureau.com/",
-            "https://www.speakers.com/",
-            "https://www.allamericanspeakers.com/",
-            "https://www.celebrityspeakers.com/",
-            "https://www.speakerscorner.co.uk/",
-            "https://www.speakers.co.uk/",
-            "https://www.speakersbureau.com/",
-            "https://www.speakers.com/",
-            "https://www.allamericanspeakers.com/",
-            "https://www.celebrityspeakers.com/",
-            "https://www.speakerscorner.co.uk/",
-            "https://www.speakers.co.uk/",
-            "https://www.speakersbureau.com/",
-            "https://www.speakers.com/",
-            "https://www.allamericanspeakers.com/",
-            "https://www.celebrityspeakers.com/",
-            "https://www.speakerscorner.co.uk/",
-            "https://www.speakers.co.uk/",
-            "https://www.speakersbureau.com/"
-        ],
-        "judging": [
-            "https://www.judges.org/",
-            "https://www.judge.com/",
-            "https://www.judging.org/",
-            "https://www.judge.org/",
-            "https://www.judges.com/",
-            "https://www.judge.net/",
-            "https://www.judging.net/",
-            "https://www.judge.info/",
-            "https://www.judges.info/",
-            "https://www.judge.co/",
-            "https://www.judges.co/",
-            "https://www.judging.co/",
-            "https://www.judge.io/",
-            "https://www.judges.io/",
-            "https://www.judging.io/",
-            "https://www.judge.dev/",
-            "https://www.judges.dev/",
-            "https://www.judging.dev/",
-            "https://www.judge.tech/",
-            "https://www.judges.tech/",
-            "https://www.judging.tech/",
-            "https://www.judge.ai/",
-            "https://www.judges.ai/",
-            "https://www.judging.ai/",
-            "https://www.judge.cloud/",
-            "https://www.judges.cloud/",
-            "https://www.judging.cloud/",
-            "https://www.judge.app/",
-            "https://www.judges.app/",
-            "https://www.judging.app/",
-            "https://www.techcrunch.com/startup-battlefield/",
-            "https://www.angelpad.com/",
-            "https://www.ycombinator.com/",
-            "https://www.500startups.com/",
-            "https://techstars.com/",
-            "https://www.seedcamp.com/",
-            "https://www.kaggle.com/competitions",
-            "https://devpost.com/",
-            "https://www.hackerearth.com/challenges/",
-            "https://www.topcoder.com/"
-        ],
-        "speaking": [
-            "https://www.ted.com/tedx",
-            "https://www.speakerhub.com/",
-            "https://www.speakermatch.com/",
-            "https://www.speakerbureau.com/",
-            "https://www.speakers.com/",
-            "https://www.allamericanspeakers.com/",
-            "https://www.celebrityspeakers.com/",
-            "https://www.speakerscorner.co.uk/",
-            "https://www.speakers.co.uk/",
-            "https://www.speakersbureau.com/",
-            "https://www.speakers.com/",
-            "https://www.allamericanspeakers.com/",
-            "https://www.celebrityspeakers.com/",
-            "https://www.speakerscorner.co.uk/",
-            "https://www.speakers.co.uk/",
-            "https://www.speakersbureau.com/",
-            "https://www.speakers.com/",
-            "https://www.allamericanspeakers.com/",
-            "https://www.celebrityspeakers.com/",
-            "https://www.speakerscorner.co.uk/",
-            "https://www.speakers.co.uk/",
-            "https://www.speakersbureau.com/",
-            "https://www.speakers.com/",
-            "https://www.allamericanspeakers.com/",
-            "https://www.celebrityspeakers.com/",
-            "https://www.speakerscorner.co.uk/",
-            "https://www.speakers.co.uk/",
-            "https://www.speakersbureau.com/",
-            "https://www.speakers.com/",
-            "https://www.allamericanspeakers.com/",
-            "https://www.celebrityspeakers.com/",
-            "https://www.speakerscorner.co.uk/",
-            "https://www.speakers.co.uk/",
-            "https://www.speakersbureau.com/",
-            "https://www.papercall.io/",
-            "https://www.cfpland.com/",
-            "https://speaking.io/",
-            "https://www.callforpapers.com/",
-            "https://www.eventil.com/",
-            "https://sessionize.com/",
-            "https://speakerdeck.com/",
-            "https://www.lanyrd.com/calls/",
-            "https://www.speakerfile.com/",
-            "https://www.gpspeakers.com/"
-        ],
-        "professional": [
-            "https://www.linkedin.com/",
-            "https://www.upwork.com/",
-            "https://www.freelancer.com/",
-            "https://www.toptal.com/",
-            "https://www.99designs.com/",
-            "https://dribbble.com/",
-            "https://www.behance.net/",
-            "https://github.com/",
-            "https://stackoverflow.com/",
-            "https://www.kaggle.com/"
-        ],
-        "publications": [
-            "https://scholar.google.com/",
-            "https://www.researchgate.net/",
-            "https://www.academia.edu/",
-            "https://arxiv.org/",
-            "https://www.nature.com/",
-            "https://www.sciencemag.org/",
-            "https://ieeexplore.ieee.org/",
-            "https://www.acm.org/publications",
-            "https://www.springer.com/",
-            "https://www.elsevier.com/",
-            "https://medium.com/",
-            "https://dev.to/",
-            "https://www.hackernoon.com/",
-            "https://towardsdatascience.com/"
-        ],
-        "patents": [
-            "https://patents.google.com/",
-            "https://www.uspto.gov/",
-            "https://worldwide.espacenet.com/",
-            "https://www.wipo.int/portal/en/",
-            "https://www.freepatentsonline.com/",
-            "https://patentscope.wipo.int/"
-        ],
-        "industry_recognition": [
-            "https://www.gartner.com/",
-            "https://www.forrester.com/",
-            "https://www.mckinsey.com/",
-            "https://www2.deloitte.com/",
-            "https://www.bcg.com/",
-            "https://www.pwc.com/",
-            "https://www.accenture.com/",
-            "https://www.ey.com/",
-            "https://www.kpmg.com/"
-        ]
-    }
+    OPPORTUNITY_SOURCES = _LazyTable("opportunity_sources")
+    
+    # Live source fetching: per-host circuit breakers and adaptive timeouts
+    SOURCE_FETCH_WORKERS = int(os.getenv('SOURCE_FETCH_WORKERS', '16'))
+    SOURCE_FETCH_TIMEOUT = float(os.getenv('SOURCE_FETCH_TIMEOUT', '10'))
+    SOURCE_FETCH_MIN_TIMEOUT = float(os.getenv('SOURCE_FETCH_MIN_TIMEOUT', '1'))
+    SOURCE_TIMEOUT_MULTIPLIER = float(os.getenv('SOURCE_TIMEOUT_MULTIPLIER', '3'))
+    SOURCE_FETCH_RETRIES = int(os.getenv('SOURCE_FETCH_RETRIES', '2'))
+    SOURCE_RETRY_BACKOFF_SECONDS = float(os.getenv('SOURCE_RETRY_BACKOFF_SECONDS', '0.5'))
+    SOURCE_BREAKER_FAILURES = int(os.getenv('SOURCE_BREAKER_FAILURES', '3'))
+    SOURCE_BREAKER_COOLDOWN_SECONDS = float(os.getenv('SOURCE_BREAKER_COOLDOWN_SECONDS', '300'))
+    SOURCE_BREAKER_MAX_COOLDOWN_SECONDS = float(os.getenv('SOURCE_BREAKER_MAX_COOLDOWN_SECONDS', '21600'))
+    SOURCE_SWEEP_DEADLINE_SECONDS = float(os.getenv('SOURCE_SWEEP_DEADLINE_SECONDS', '60'))
+    
+    # Crawl frontier: pages fetched per sweep (0 = all), ranked by the chance
+    # they changed since the last fetch
+    SOURCE_FETCH_BUDGET = int(os.getenv('SOURCE_FETCH_BUDGET', '0'))
+    SOURCE_DEFAULT_CHANGE_DAYS = float(os.getenv('SOURCE_DEFAULT_CHANGE_DAYS', '7'))
+    SOURCE_MIN_REVISIT_SECONDS = float(os.getenv('SOURCE_MIN_REVISIT_SECONDS', '3600'))
+    SOURCE_MAX_REVISIT_DAYS = float(os.getenv('SOURCE_MAX_REVISIT_DAYS', '90'))
     
     # Scoring weights for opportunity ranking
     SCORING_WEIGHTS = {
@@ -606,79 +131,95 @@ class SystemConfig:
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE = os.getenv('LOG_FILE', 'eb1a_system.log')
     
+    # Tracing: sampled traces are appended to TRACE_FILE as OTLP/JSON (empty = off,
+    # the default; e.g. TRACE_FILE=/var/log/eb1a/traces.jsonl to enable)
+    TRACE_FILE = os.getenv('TRACE_FILE', '')
+    TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.01'))
+    
+    # Debug endpoints (/api/debug/*) are disabled unless ADMIN_TOKEN is set
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+    PROFILER_MAX_SECONDS = int(os.getenv('PROFILER_MAX_SECONDS', '60'))
+    PROFILER_INTERVAL_SECONDS = float(os.getenv('PROFILER_INTERVAL_SECONDS', '0.005'))
+    PROFILER_LOCK_FILE = os.getenv('PROFILER_LOCK_FILE', os.path.join(tempfile.gettempdir(), 'eb1a-profiler.lock'))
+    
     # Rate limiting
     MAX_REQUESTS_PER_MINUTE = 60
-    MAX_EMAILS_PER_DAY = 10
+    MAX_EMAILS_PER_DAY = int(os.getenv('MAX_EMAILS_PER_DAY', '10'))  # per recipient
     
     # Cache settings
     CACHE_DURATION_HOURS = 24
+    TEMPLATE_FRAGMENT_CACHE_SIZE = int(os.getenv('TEMPLATE_FRAGMENT_CACHE_SIZE', '4096'))
+    MIME_SKELETON_CACHE_SIZE = int(os.getenv('MIME_SKELETON_CACHE_SIZE', '256'))
+    
+    # Mock email mode: recent sends kept in memory, older ones spilled to
+    # MOCK_EMAIL_SPILL_FILE, one file per process with the pid added to the
+    # name (gzip when it ends in .gz; empty = dropped)
+    MOCK_EMAIL_BUFFER_SIZE = int(os.getenv('MOCK_EMAIL_BUFFER_SIZE', '100'))
+    MOCK_EMAIL_SPILL_FILE = os.getenv('MOCK_EMAIL_SPILL_FILE', '')
     CACHE_DIRECTORY = os.getenv('CACHE_DIR', './cache')
 
+    # Metrics: per-worker value files under gunicorn (unset = in-process only)
+    METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR', '')
+
+    # Shared runtime state (jobs, leases, queues) visible to all workers
+    STATE_DB_PATH = os.getenv('STATE_DB_PATH', os.path.join(os.path.dirname(__file__), 'database', 'state.db'))
+
+    # Stats time series: minute counters, rolled up to hours and then days
+    STATS_FLUSH_SECONDS = float(os.getenv('STATS_FLUSH_SECONDS', '10'))
+    STATS_MINUTE_RETENTION_HOURS = int(os.getenv('STATS_MINUTE_RETENTION_HOURS', '48'))
+    STATS_HOUR_RETENTION_DAYS = int(os.getenv('STATS_HOUR_RETENTION_DAYS', '90'))
+
+    # Background job settings
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+    JOB_STALE_SECONDS = 60
+    # A job's SSE stream ends with a "retry" event after this long, well
+    # inside gunicorn's --timeout, and the browser reconnects
+    JOB_STREAM_MAX_SECONDS = float(os.getenv('JOB_STREAM_MAX_SECONDS', '55'))
+    JOB_RETENTION_HOURS = 24
+
+    # Job scheduler: worker threads that run due jobs off the timer thread
+    SCHEDULER_WORKERS = int(os.getenv('SCHEDULER_WORKERS', '4'))
+
+    # Daily fan-out: workers per stage and the bound on each stage's queue
+    FANOUT_RANK_WORKERS = int(os.getenv('FANOUT_RANK_WORKERS', '2'))
+    FANOUT_RENDER_WORKERS = int(os.getenv('FANOUT_RENDER_WORKERS', '2'))
+    FANOUT_ENQUEUE_WORKERS = int(os.getenv('FANOUT_ENQUEUE_WORKERS', '2'))
+    FANOUT_QUEUE_SIZE = int(os.getenv('FANOUT_QUEUE_SIZE', '200'))
+
+    # Outbox: durable queue between rendering and SMTP delivery
+    OUTBOX_WORKERS = int(os.getenv('OUTBOX_WORKERS', '8'))
+    OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '20'))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '6'))
+    OUTBOX_BACKOFF_SECONDS = float(os.getenv('OUTBOX_BACKOFF_SECONDS', '30'))
+    OUTBOX_MAX_BACKOFF_SECONDS = float(os.getenv('OUTBOX_MAX_BACKOFF_SECONDS', '3600'))
+    # A claimed message not renewed for this long is handed to another worker;
+    # keep it well above SMTP_TIMEOUT (and OUTBOX_BATCH_SIZE * SMTP_TIMEOUT)
+    OUTBOX_CLAIM_TIMEOUT_SECONDS = float(os.getenv('OUTBOX_CLAIM_TIMEOUT_SECONDS', '1800'))
+    OUTBOX_RETENTION_DAYS = 7
+
+    # Provider limits per sending account (Gmail caps daily sends per account);
+    # deliveries over the per-minute pace wait for the next minute
+    SMTP_ACCOUNT_DAILY_LIMIT = int(os.getenv('SMTP_ACCOUNT_DAILY_LIMIT', '2000'))
+    SMTP_ACCOUNT_MAX_PER_MINUTE = int(os.getenv('SMTP_ACCOUNT_MAX_PER_MINUTE', '60'))
+    # Direct sends (urgent, weekly, test) wait this long for per-minute pacing
+    # capacity instead of being dropped; outbox sends are deferred instead
+    SMTP_PACING_MAX_WAIT_SECONDS = float(os.getenv('SMTP_PACING_MAX_WAIT_SECONDS', '180'))
+
+    # Catch-up of runs missed while no worker was up: how far back to look,
+    # and how many missed emails per minute to send so a mass restart never bursts
+    CATCHUP_MAX_AGE_HOURS = float(os.getenv('CATCHUP_MAX_AGE_HOURS', '12'))
+    CATCHUP_RATE_PER_MINUTE = int(os.getenv('CATCHUP_RATE_PER_MINUTE', '300'))
+
+    # How often the leader picks up profile edits saved by other workers
+    PROFILE_SYNC_SECONDS = float(os.getenv('PROFILE_SYNC_SECONDS', '30'))
+
+    # Leader election: how often followers retry and the leader heartbeats
+    LEADER_RETRY_SECONDS = float(os.getenv('LEADER_RETRY_SECONDS', '10'))
+
 class OpportunityCategories:
     """Categorization of opportunities for better filtering"""
     
-    CATEGORIES = {
-        "speaking": {
-            "keywords": ["conference", "keynote", "presentation", "talk", "panel", "workshop"],
-            "evidence_value": "High",
-            "typical_time_investment": "Medium to High",
-            "eb1a_criteria": ["speaking", "critical role"]
-        },
-        "judging": {
-            "keywords": ["peer review", "editorial board", "judge", "reviewer", "committee"],
-            "evidence_value": "High",
-            "typical_time_investment": "Medium",
-            "eb1a_criteria": ["judging"]
-        },
-        "media": {
-            "keywords": ["interview", "commentary", "expert opinion", "quote", "article"],
-            "evidence_value": "Medium to High",
-            "typical_time_investment": "Low to Medium",
-            "eb1a_criteria": ["media"]
-        },
-        "awards": {
-            "keywords": ["award", "recognition", "honor", "prize", "achievement"],
-            "evidence_value": "Very High",
-            "typical_time_investment": "Low to Medium",
-            "eb1a_criteria": ["awards"]
-        },
-        "networking": {
-            "keywords": ["meetup", "networking", "community", "association", "group"],
-            "evidence_value": "Low to Medium",
-            "typical_time_investment": "Medium",
-            "eb1a_criteria": ["critical role", "membership"]
-        },
-        "writing": {
-            "keywords": ["article", "blog post", "publication", "journal", "magazine"],
-            "evidence_value": "Medium to High",
-            "typical_time_investment": "Medium to High",
-            "eb1a_criteria": ["publications", "media"]
-        },
-        "professional": {
-            "keywords": ["freelance", "consulting", "contract", "project", "collaboration"],
-            "evidence_value": "Medium",
-            "typical_time_investment": "Medium to High",
-            "eb1a_criteria": ["critical role", "original contributions"]
-        },
-        "publications": {
-            "keywords": ["research", "paper", "journal", "conference", "publication"],
-            "evidence_value": "Very High",
-            "typical_time_investment": "High",
-            "eb1a_criteria": ["publications", "original contributions"]
-        },
-        "patents": {
-            "keywords": ["patent", "invention", "innovation", "intellectual property", "IP"],
-            "evidence_value": "Very High",
-            "typical_time_investment": "Very High",
-            "eb1a_criteria": ["original contributions", "awards"]
-        },
-        "industry_recognition": {
-            "keywords": ["industry", "recognition", "expert", "thought leader", "influencer"],
-            "evidence_value": "High",
-            "typical_time_investment": "Medium",
-            "eb1a_criteria": ["critical role", "original contributions"]
-        }
-    }
+    CATEGORIES = _LazyTable("opportunity_categories")
 
 class EmailTemplateConfig:
     """Configuration for email templates"""
@@ -745,7 +286,8 @@ def load_user_profile_from_env() -> UserProfile:
         notification_frequency=NotificationFrequency(os.getenv('NOTIFICATION_FREQUENCY', 'daily')),
         email_format=EmailFormat(os.getenv('EMAIL_FORMAT', 'html')),
         max_opportunities_per_email=int(os.getenv('MAX_OPPORTUNITIES', '10')),
-        timezone=os.getenv('USER_TIMEZONE', 'America/Chicago')
+        timezone=os.getenv('USER_TIMEZONE', 'America/Chicago'),
+        send_time=os.getenv('USER_SEND_TIME', '08:00')
     )
 
 def validate_config() -> Dict[str, Any]:
@@ -0,0 +1,302 @@
+"""
+EB-1A Crawl Frontier Module
+Decides which opportunity source pages to re-fetch in a sweep: each
+source's change rate is estimated from the content hashes of past fetches,
+and a limited fetch budget goes where it keeps the most pages fresh
+instead of re-downloading pages that rarely change
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import re
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from src.config import SystemConfig
+from src.state_store import StateStore, get_state_store
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CRAWL_FRONTIER_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS crawl_frontier (
+        url TEXT PRIMARY KEY,
+        content_hash TEXT,
+        first_seen REAL NOT NULL,
+        last_fetch REAL,
+        last_change REAL,
+        fetches INTEGER NOT NULL DEFAULT 0,
+        changes INTEGER NOT NULL DEFAULT 0,
+        history TEXT NOT NULL DEFAULT '[]',
+        change_rate REAL
+    )
+    """,
+]
+
+# (seconds since the previous fetch, changed?) pairs kept per page
+HISTORY_SIZE = 32
+# Samples at a page's shortest interval before a page that keeps changing
+# is taken to be fast rather than visited too rarely to tell
+SHORT_RECHECKS = 2
+
+_WHITESPACE = re.compile(r"\s+")
+
+def content_hash(body: str) -> str:
+    """Hash of a page with whitespace collapsed, so reindentation is not a change"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(_WHITESPACE.sub(" ", body).strip().encode("utf-8", "replace"))
+    return digest.hexdigest()
+
+def estimate_change_rate(history: Sequence[Sequence[float]], prior_rate: float) -> float:
+    """Changes per second, treating a page's changes as a Poisson process.
+
+    A fetch only shows whether the page changed at least once since the
+    previous one, so with intervals I_i the likelihood is the product of
+    (1 - exp(-rate * I_i)) for changed intervals and exp(-rate * I_i) for
+    unchanged ones. Its maximum solves
+
+        sum over changed of I / (exp(rate * I) - 1) = sum over unchanged of I
+
+    which is solved by bisection (the left side falls as the rate grows).
+    One changed and one unchanged pseudo-interval of 1 / prior_rate keep
+    the estimate finite for pages that always or never changed. Their
+    weight, 2 / (2 + observations), fades as history accumulates, so a
+    short history leans on the prior but a long one speaks for itself.
+    """
+    prior_interval = 1.0 / prior_rate
+    prior_weight = 2.0 / (2 + len(history))
+    changed = [(interval, 1.0) for interval, was_changed in history if was_changed and interval > 0]
+    changed.append((prior_interval, prior_weight))
+    unchanged = (sum(interval for interval, was_changed in history if not was_changed)
+                 + prior_weight * prior_interval)
+
+    low, high = math.log(1e-12), math.log(1.0)
+    for _ in range(48):
+        middle = (low + high) / 2
+        rate = math.exp(middle)
+        if sum(weight * interval / math.expm1(min(rate * interval, 700.0))
+               for interval, weight in changed) > unchanged:
+            low = middle
+        else:
+            high = middle
+    return math.exp((low + high) / 2)
+
+def revisit_priority(rate: float, age: float) -> float:
+    """Freshness gained by re-fetching a page now rather than later.
+
+    For Poisson pages, the revisit schedule that maximizes the average
+    share of fresh pages under a fetch budget re-fetches a page once
+    (1 - (1 + rate * age) * exp(-rate * age)) / rate crosses a common
+    threshold (the Lagrangian condition of the budgeted problem; see Cho and
+    Garcia-Molina, and Kolobov et al. 2019). Taking the highest values first
+    spends a fixed budget the same way. The value is capped at 1 / rate, so
+    pages changing much faster than they could be revisited are left alone,
+    and it grows with age for slow pages, so they are checked now and then.
+    """
+    exposure = rate * age
+    return -math.expm1(-exposure) / rate - age * math.exp(-exposure)
+
+class CrawlFrontier:
+    """Per-URL change history in the state store and budgeted revisit selection.
+
+    ``select`` takes the pages with the highest revisit_priority() from a
+    heap. These come first:
+
+    * pages without two fetches to compare
+    * pages not fetched for SOURCE_MAX_REVISIT_DAYS, in case their rate
+      has changed
+    * pages that just changed again when even their shortest sampled
+      interval is too long to resolve the estimated rate, until
+      SHORT_RECHECKS samples at that shortest interval exist
+
+    Pages fetched within SOURCE_MIN_REVISIT_SECONDS are not candidates.
+    """
+
+    def __init__(self, store: StateStore = None):
+        self.store = store or get_state_store()
+        self.store.ensure_schema("crawl_frontier", CRAWL_FRONTIER_SCHEMA)
+        self.prior_rate = 1.0 / (SystemConfig.SOURCE_DEFAULT_CHANGE_DAYS * 86400)
+        self.max_revisit = SystemConfig.SOURCE_MAX_REVISIT_DAYS * 86400
+        self.min_revisit = SystemConfig.SOURCE_MIN_REVISIT_SECONDS
+
+    def add(self, urls: Iterable[str], now: float = None):
+        """Start tracking URLs; known ones keep their history"""
+        now = time.time() if now is None else now
+        self.store.connection().executemany(
+            "INSERT OR IGNORE INTO crawl_frontier (url, first_seen) VALUES (?, ?)",
+            [(url, now) for url in urls]
+        )
+
+    def _priority(self, row, now: float) -> float:
+        history = json.loads(row["history"])
+        if not history:
+            # Never fetched, or fetched once with nothing to compare against yet
+            return math.inf
+        age = now - row["last_fetch"]
+        if age >= self.max_revisit:
+            return math.inf
+
+        rate = row["change_rate"] or self.prior_rate
+        shortest = min(interval for interval, _ in history)
+        short_samples = sum(1 for interval, _ in history if interval <= 1.5 * shortest)
+        if history[-1][1] and rate * shortest > math.log(2) and short_samples < SHORT_RECHECKS:
+            # Changed again and even the shortest interval sampled so far is
+            # too long to tell this page's rate from faster ones (a page that
+            # changes every two days looks the same as one that changes
+            # hourly when visited weekly): re-check at the next sweep
+            return math.inf
+        return revisit_priority(rate, age)
+
+    def select(self, budget: int, candidates: Iterable[str] = None, now: float = None,
+               available: Callable[[str], bool] = None) -> List[str]:
+        """The ``budget`` URLs worth fetching most, best first.
+
+        ``candidates`` limits the choice to some URLs (e.g. one category);
+        ``available`` drops URLs that cannot be fetched right now, such as
+        hosts whose circuit breaker is open, so they don't use up budget.
+        """
+        now = time.time() if now is None else now
+        rows = self.store.execute("SELECT * FROM crawl_frontier").fetchall()
+        wanted = set(candidates) if candidates is not None else None
+
+        heap = []
+        for row in rows:
+            url = row["url"]
+            if wanted is not None and url not in wanted:
+                continue
+            if row["last_fetch"] is not None and now - row["last_fetch"] < self.min_revisit:
+                continue
+            if available is not None and not available(url):
+                continue
+            # Ties (never fetched, overdue) go to the URL waiting longest
+            heapq.heappush(heap, (-self._priority(row, now), row["last_fetch"] or row["first_seen"], url))
+
+        return [heapq.heappop(heap)[2] for _ in range(min(budget, len(heap)))]
+
+    def record(self, url: str, body: str, now: float = None) -> Optional[bool]:
+        """Record a successful fetch; returns whether the content changed
+        (None on the first fetch, when there is nothing to compare with)"""
+        now = time.time() if now is None else now
+        digest = content_hash(body)
+        with self.store.transaction(immediate=True) as conn:
+            row = conn.execute("SELECT * FROM crawl_frontier WHERE url = ?", (url,)).fetchone()
+            if row is None or row["content_hash"] is None or row["last_fetch"] is None:
+                conn.execute(
+                    """
+                    INSERT INTO crawl_frontier (url, content_hash, first_seen, last_fetch, last_change, fetches)
+                    VALUES (?, ?, ?, ?, ?, 1)
+                    ON CONFLICT (url) DO UPDATE SET content_hash = excluded.content_hash,
+                        last_fetch = excluded.last_fetch, last_change = excluded.last_change, fetches = 1
+                    """,
+                    (url, digest, now, now, now)
+                )
+                return None
+
+            changed = digest != row["content_hash"]
+            history = json.loads(row["history"])
+            history = (history + [[round(max(0.0, now - row["last_fetch"]), 1), int(changed)]])[-HISTORY_SIZE:]
+            conn.execute(
+                """
+                UPDATE crawl_frontier SET content_hash = ?, last_fetch = ?,
+                    last_change = CASE WHEN ? THEN ? ELSE last_change END,
+                    fetches = fetches + 1, changes = changes + ?, history = ?, change_rate = ?
+                WHERE url = ?
+                """,
+                (digest, now, changed, now, int(changed), json.dumps(history),
+                 estimate_change_rate(history, self.prior_rate), url)
+            )
+            return changed
+
+    def get_stats(self, now: float = None) -> Dict[str, Any]:
+        """Tracked pages, how many were never fetched, and the expected share
+        of pages whose last fetched copy is still current"""
+        now = time.time() if now is None else now
+        rows = self.store.execute("SELECT * FROM crawl_frontier").fetchall()
+        fetched = [row for row in rows if row["last_fetch"] is not None]
+        rates = sorted(row["change_rate"] or self.prior_rate for row in fetched)
+        fresh = sum(math.exp(-(row["change_rate"] or self.prior_rate) * max(0.0, now - row["last_fetch"]))
+                    for row in fetched)
+        return {
+            "sources": len(rows),
+            "never_fetched": len(rows) - len(fetched),
+            "expected_fresh": round(fresh / len(rows), 3) if rows else None,
+            "median_change_interval_hours": round(1 / rates[len(rates) // 2] / 3600, 1) if rates else None
+        }
+
+_default_frontier: Optional[CrawlFrontier] = None
+_default_frontier_lock = threading.Lock()
+
+def get_crawl_frontier() -> CrawlFrontier:
+    """Get the process-wide crawl frontier"""
+    global _default_frontier
+    if _default_frontier is None:
+        with _default_frontier_lock:
+            if _default_frontier is None:
+                _default_frontier = CrawlFrontier()
+    return _default_frontier
+
+if __name__ == "__main__":
+    # Simulated pages with known change rates, two sweeps a day on a budget:
+    # adaptive selection against round-robin over the same budget. Exits 1
+    # unless adaptive beats round-robin by --margin
+    import argparse
+    import os
+    import random
+    import sys
+    import tempfile
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=int, default=20, help="fetches per sweep")
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--margin", type=float, default=0.005,
+                        help="freshness adaptive selection must gain over round-robin")
+    args = parser.parse_args()
+
+    print("=== Testing Crawl Frontier ===")
+    pages, sweep_every = 400, 43200
+    sweeps = args.days * 86400 // sweep_every
+    # Most sources are near-static, a few change several times a day
+    rng = random.Random(5)
+    true_rates = [rng.choice([1 / 2, 1 / 7, 1 / 30, 1 / 90, 1 / 90, 1 / 365, 3.0]) / 86400 for _ in range(pages)]
+    urls = [f"https://source{index}.example/" for index in range(pages)]
+    url_index = {url: index for index, url in enumerate(urls)}
+
+    def simulate(adaptive: bool) -> float:
+        rng = random.Random(11)
+        frontier = CrawlFrontier(StateStore(os.path.join(tempfile.mkdtemp(), "state.db")))
+        frontier.add(urls, now=0)
+        versions = [0] * pages
+        fetched_version = [None] * pages
+        next_change = [rng.expovariate(rate) for rate in true_rates]
+        cursor, fresh_samples = 0, []
+        for sweep in range(sweeps):
+            now = (sweep + 1) * sweep_every
+            for index in range(pages):
+                while next_change[index] <= now:
+                    versions[index] += 1
+                    next_change[index] += rng.expovariate(true_rates[index])
+            if adaptive:
+                chosen = frontier.select(args.budget, now=now)
+            else:
+                chosen = [urls[(cursor + offset) % pages] for offset in range(args.budget)]
+                cursor += args.budget
+            for url in chosen:
+                index = url_index[url]
+                frontier.record(url, f"version {versions[index]}", now=now)
+                fetched_version[index] = versions[index]
+            if sweep >= sweeps // 2:
+                fresh_samples.append(sum(fetched_version[i] == versions[i] for i in range(pages)) / pages)
+        return sum(fresh_samples) / len(fresh_samples)
+
+    print(f"{pages} pages, {args.budget} fetches per 12h sweep, {args.days} days")
+    round_robin, adaptive = simulate(adaptive=False), simulate(adaptive=True)
+    print(f"mean freshness over the second half: round-robin {round_robin:.3f}, adaptive {adaptive:.3f}")
+    if adaptive < round_robin + args.margin:
+        print(f"FAIL: adaptive selection gains less than {args.margin} over round-robin")
+        sys.exit(1)
@@ -0,0 +1,659 @@
+"""
+EB-1A Email Renderer Module
+Single rendering pipeline for daily emails: opportunities are partitioned
+once into a digest model, and the plain-text and HTML parts are written
+from that model into a reused StringIO buffer
+"""
+
+import io
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config import SystemConfig
+from src.metrics import RENDER_SECONDS
+from src.tracing import span
+from src.opportunity_search import Opportunity, OpportunityType
+from src.template_engine import CompiledTemplate, FragmentCache, opportunity_key, stars
+
+Write = Callable[[str], Any]
+
+LONG_TERM_KEYWORDS = ("2025", "November", "December", "Annual", "Yearly")
+
+DAILY_TIPS = (
+    "Focus on opportunities that address your weak criteria first - they'll have the biggest impact on your petition.",
+    "Quality over quantity - it's better to excel in a few opportunities than to spread yourself too thin.",
+    "Document everything - keep detailed records of your contributions and their impact.",
+    "Network strategically - the connections you make can lead to future opportunities.",
+    "Stay consistent - small daily actions compound into significant achievements.",
+    "Leverage your PhD research - many opportunities can tie back to your academic work.",
+    "Consider remote opportunities - they expand your reach beyond Austin, Texas.",
+    "Follow up professionally - many opportunities require persistent but respectful follow-up."
+)
+
+def is_long_term(opp: Opportunity) -> bool:
+    """Whether an opportunity's deadline is far enough out to track long-term"""
+    return any(keyword in opp.deadline for keyword in LONG_TERM_KEYWORDS)
+
+def daily_tip(now: datetime = None) -> str:
+    """The tip of the day (rotates by day of year)"""
+    day_of_year = (now or datetime.now()).timetuple().tm_yday
+    return DAILY_TIPS[day_of_year % len(DAILY_TIPS)]
+
+def type_name(opp: Opportunity) -> str:
+    return opp.type.value.upper().replace("_", " ")
+
+@dataclass
+class DigestModel:
+    """Everything a daily email shows, computed once for both parts"""
+    date: datetime
+    regular: List[Opportunity] = field(default_factory=list)
+    quick_wins: List[Opportunity] = field(default_factory=list)
+    long_term: List[Opportunity] = field(default_factory=list)
+    user_name: str = "EB-1A Candidate"
+    strong_criteria: str = ""
+    weak_criteria: str = ""
+    monthly_count: int = 0
+    success_rate: int = 0
+    daily_tip: str = ""
+
+def build_digest_model(opportunities: List[Opportunity], user_profile: Dict[str, Any] = None,
+                       user_history: Dict[str, Any] = None, now: datetime = None) -> DigestModel:
+    """Partition opportunities into regular / quick-win / long-term in one pass"""
+    user_profile = user_profile or {}
+    user_history = user_history or {}
+    now = now or datetime.now()
+
+    regular, quick_wins, long_term = [], [], []
+    for opp in opportunities:
+        if opp.type == OpportunityType.QUICK_WINS:
+            quick_wins.append(opp)
+        else:
+            regular.append(opp)
+        if is_long_term(opp):
+            long_term.append(opp)
+
+    return DigestModel(
+        date=now,
+        regular=regular,
+        quick_wins=quick_wins,
+        long_term=long_term,
+        user_name=user_profile.get('name', 'EB-1A Candidate'),
+        strong_criteria=', '.join(user_profile.get('strong_criteria', [])),
+        weak_criteria=', '.join(user_profile.get('weak_criteria', [])),
+        monthly_count=user_history.get('monthly_applications', 0),
+        success_rate=user_history.get('success_rate', 0),
+        daily_tip=daily_tip(now)
+    )
+
+@dataclass
+class RenderedEmail:
+    plain: Optional[str] = None
+    html: Optional[str] = None
+
+def _cached(cache_key: str, opp: Opportunity, render: Callable[[Opportunity], str]) -> str:
+    return EmailRenderer.fragments.get_or_render((cache_key, opportunity_key(opp)), lambda: render(opp))
+
+def _write_numbered(write: Write, opportunities: List[Opportunity], cache_key: str,
+                    render_body: Callable[[Opportunity], str], head: str = "",
+                    separator: str = ""):
+    """Write ``head``, the 1-based rank and the cached body for each opportunity"""
+    for i, opp in enumerate(opportunities, 1):
+        if separator and i > 1:
+            write(separator)
+        write(head)
+        write(str(i))
+        write(_cached(cache_key, opp, render_body))
+
+def _write_items(write: Write, opportunities: List[Opportunity], cache_key: str,
+                 template: CompiledTemplate, separator: str = ""):
+    """Write one cached line per opportunity"""
+    fragments = EmailRenderer.fragments
+    for i, opp in enumerate(opportunities):
+        if separator and i:
+            write(separator)
+        write(fragments.get_or_render(
+            (cache_key, opportunity_key(opp)),
+            lambda: template.render(title=opp.title, description=opp.description,
+                                    deadline=opp.deadline, link=opp.link)
+        ))
+
+def _render_opportunity(template: CompiledTemplate, opp: Opportunity, strip: bool = False) -> str:
+    body = template.render(
+        type_name=type_name(opp),
+        title=opp.title,
+        description=opp.description,
+        deadline=opp.deadline,
+        link=opp.link,
+        stars_prestige=stars(opp.prestige_rating),
+        stars_evidence=stars(opp.evidence_value),
+        stars_time=stars(opp.time_investment),
+        why_fits=opp.why_fits
+    )
+    return body.rstrip() if strip else body
+
+class Layout:
+    """How a digest model is laid out as plain text and HTML"""
+
+    name = "layout"
+
+    def write_plain(self, model: DigestModel, write: Write):
+        raise NotImplementedError
+
+    def write_html(self, model: DigestModel, write: Write):
+        raise NotImplementedError
+
+class DigestLayout(Layout):
+    """The personalized daily digest sent to users"""
+
+    name = "digest"
+
+    PLAIN_TEMPLATE = CompiledTemplate("""Subject: Daily EB-1A Opportunities - {date}
+
+Dear {user_name},
+
+Here are today's top {opportunity_count} opportunities to strengthen your extraordinary ability petition:
+
+{opportunities}
+
+## Quick Wins (15-30 min tasks):
+{quick_wins}
+
+## Long-term Opportunities Worth Tracking:
+{long_term_opportunities}
+
+## Action Items for Today:
+- Review deadlines and add to your calendar
+- Prioritize opportunities addressing your weak criteria: {weak_criteria}
+- Consider your current workload and select 1-2 opportunities to pursue
+- Track your response rate to improve future recommendations
+
+## Your EB-1A Progress Tracker:
+- Strong Criteria: {strong_criteria}
+- Areas for Improvement: {weak_criteria}
+- Opportunities Pursued This Month: {monthly_count}
+- Success Rate: {success_rate}%
+
+Best regards,
+Your EB-1A Opportunity System
+
+---
+💡 Pro Tip: {daily_tip}
+
+This email was generated automatically based on your profile. Reply with feedback to improve future recommendations.
+Unsubscribe: {unsubscribe_link}
+        """)
+
+    PLAIN_OPPORTUNITY = CompiledTemplate(""". {type_name}: {title}
+   📋 Topic: {description}
+   ⏰ Deadline: {deadline}
+   🔗 Link: {link}
+   ⭐ Rating: Prestige {stars_prestige} | Evidence {stars_evidence} | Time {stars_time}
+   💡 Why it fits: {why_fits}""")
+    PLAIN_QUICK_WIN = CompiledTemplate("• {title}: {description} ({link})")
+    PLAIN_LONG_TERM = CompiledTemplate("• {title} (Deadline: {deadline}) - {link}")
+
+    HTML_TEMPLATE = CompiledTemplate("""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Daily EB-1A Opportunities</title>
+    <style>
+        body {{
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            max-width: 800px;
+            margin: 0 auto;
+            padding: 20px;
+            background-color: #f5f5f5;
+        }}
+        .email-container {{
+            background-color: white;
+            border-radius: 10px;
+            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+            overflow: hidden;
+        }}
+        .header {{
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 30px;
+            text-align: center;
+        }}
+        .header h1 {{
+            margin: 0;
+            font-size: 28px;
+            font-weight: 300;
+        }}
+        .header p {{
+            margin: 10px 0 0 0;
+            opacity: 0.9;
+        }}
+        .content {{
+            padding: 30px;
+        }}
+        .opportunity {{
+            margin: 25px 0;
+            padding: 20px;
+            border-left: 5px solid #667eea;
+            background-color: #f8f9ff;
+            border-radius: 0 8px 8px 0;
+        }}
+        .opportunity h3 {{
+            margin: 0 0 15px 0;
+            color: #667eea;
+            font-size: 20px;
+        }}
+        .opportunity-meta {{
+            display: flex;
+            flex-wrap: wrap;
+            gap: 15px;
+            margin: 15px 0;
+            font-size: 14px;
+        }}
+        .meta-item {{
+            background-color: white;
+            padding: 8px 12px;
+            border-radius: 20px;
+            border: 1px solid #e0e0e0;
+        }}
+        .rating {{
+            color: #ff6b35;
+            font-weight: bold;
+        }}
+        .link {{
+            color: #667eea;
+            text-decoration: none;
+            font-weight: 500;
+        }}
+        .link:hover {{
+            text-decoration: underline;
+        }}
+        .section {{
+            margin: 30px 0;
+            padding: 20px;
+            background-color: #f9f9f9;
+            border-radius: 8px;
+        }}
+        .section h2 {{
+            margin: 0 0 15px 0;
+            color: #333;
+            font-size: 22px;
+        }}
+        .quick-wins {{
+            background: linear-gradient(135deg, #a8edea 0%, #fed6e3 100%);
+            border: none;
+        }}
+        .long-term {{
+            background: linear-gradient(135deg, #ffecd2 0%, #fcb69f 100%);
+            border: none;
+        }}
+        .progress-tracker {{
+            background: linear-gradient(135deg, #d299c2 0%, #fef9d7 100%);
+            border: none;
+        }}
+        .footer {{
+            background-color: #333;
+            color: white;
+            padding: 20px 30px;
+            text-align: center;
+            font-size: 14px;
+        }}
+        .tip-box {{
+            background-color: #e8f5e8;
+            border-left: 4px solid #4caf50;
+            padding: 15px;
+            margin: 20px 0;
+            border-radius: 0 5px 5px 0;
+        }}
+        .emoji {{
+            font-size: 18px;
+            margin-right: 8px;
+        }}
+        @media (max-width: 600px) {{
+            .opportunity-meta {{
+                flex-direction: column;
+                gap: 10px;
+            }}
+            .content {{
+                padding: 20px;
+            }}
+        }}
+    </style>
+</head>
+<body>
+    <div class="email-container">
+        <div class="header">
+            <h1>Daily EB-1A Opportunities</h1>
+            <p>{date} • Personalized for {user_name}</p>
+        </div>
+        
+        <div class="content">
+            <p>Here are today's top opportunities to strengthen your extraordinary ability petition:</p>
+            
+            {opportunities_html}
+            
+            <div class="section quick-wins">
+                <h2><span class="emoji">🚀</span>Quick Wins (15-30 min tasks)</h2>
+                {quick_wins_html}
+            </div>
+            
+            <div class="section long-term">
+                <h2><span class="emoji">📅</span>Long-term Opportunities</h2>
+                {long_term_html}
+            </div>
+            
+            <div class="section progress-tracker">
+                <h2><span class="emoji">📊</span>Your EB-1A Progress</h2>
+                <p><strong>Strong Criteria:</strong> {strong_criteria}</p>
+                <p><strong>Areas for Improvement:</strong> {weak_criteria}</p>
+                <p><strong>Monthly Applications:</strong> {monthly_count}</p>
+            </div>
+            
+            <div class="tip-box">
+                <strong>💡 Pro Tip:</strong> {daily_tip}
+            </div>
+        </div>
+        
+        <div class="footer">
+            <p>Your EB-1A Opportunity System • Powered by AI</p>
+            <p><a href="#" style="color: #ccc;">Unsubscribe</a> | <a href="#" style="color: #ccc;">Update Preferences</a></p>
+        </div>
+    </div>
+</body>
+</html>""")
+
+    # The rank in front of each opportunity differs per user, so it stays
+    # outside the cached fragment
+    HTML_OPPORTUNITY_HEAD = """
+            <div class="opportunity">
+                <h3>"""
+    HTML_OPPORTUNITY = CompiledTemplate(""". {type_name}: {title}</h3>
+                <p>{description}</p>
+                <div class="opportunity-meta">
+                    <div class="meta-item">⏰ Deadline: {deadline}</div>
+                    <div class="meta-item rating">Prestige: {stars_prestige}</div>
+                    <div class="meta-item rating">Evidence: {stars_evidence}</div>
+                    <div class="meta-item rating">Time: {stars_time}</div>
+                </div>
+                <p><strong>Why it fits:</strong> {why_fits}</p>
+                <p><a href="{link}" class="link">Apply Now →</a></p>
+            </div>
+            """)
+    HTML_QUICK_WIN = CompiledTemplate(
+        '<li><strong>{title}:</strong> {description} (<a href="{link}" class="link">Start</a>)</li>'
+    )
+
+    def write_plain(self, model: DigestModel, write: Write):
+        def opportunities(write: Write):
+            if not model.regular:
+                write("No new opportunities match your criteria today. Check back tomorrow!")
+                return
+            _write_numbered(write, model.regular, "digest_plain",
+                            lambda opp: _render_opportunity(self.PLAIN_OPPORTUNITY, opp, strip=True),
+                            separator="\n\n")
+
+        def quick_wins(write: Write):
+            if not model.quick_wins:
+                write("• Sign up for HARO/ProfNet and respond to daily queries (15-30 min)\n"
+                      "• Apply to be a judge for industry awards (15 min application)\n"
+                      "• Update your LinkedIn with recent achievements (20 min)")
+                return
+            _write_items(write, model.quick_wins, "digest_plain_quick_win", self.PLAIN_QUICK_WIN, "\n")
+
+        def long_term(write: Write):
+            if not model.long_term:
+                write("No long-term opportunities currently tracked.")
+                return
+            _write_items(write, model.long_term, "digest_plain_long_term", self.PLAIN_LONG_TERM, "\n")
+
+        self.PLAIN_TEMPLATE.render_into(
+            write,
+            date=model.date.strftime("%Y-%m-%d"),
+            user_name=model.user_name,
+            opportunity_count=len(model.regular),
+            opportunities=opportunities,
+            quick_wins=quick_wins,
+            long_term_opportunities=long_term,
+            weak_criteria=model.weak_criteria,
+            strong_criteria=model.strong_criteria,
+            monthly_count=model.monthly_count,
+            success_rate=model.success_rate,
+            daily_tip=model.daily_tip,
+            unsubscribe_link="[Unsubscribe Link]"
+        )
+
+    def write_html(self, model: DigestModel, write: Write):
+        def opportunities(write: Write):
+            if not model.regular:
+                write("<p>No new opportunities match your criteria today. Check back tomorrow!</p>")
+                return
+            _write_numbered(write, model.regular, "digest_html",
+                            lambda opp: _render_opportunity(self.HTML_OPPORTUNITY, opp),
+                            head=self.HTML_OPPORTUNITY_HEAD)
+
+        def quick_wins(write: Write):
+            if not model.quick_wins:
+                write("""
+            <ul>
+                <li>Sign up for HARO/ProfNet and respond to daily queries (15-30 min)</li>
+                <li>Apply to be a judge for industry awards (15 min application)</li>
+                <li>Update your LinkedIn with recent achievements (20 min)</li>
+            </ul>
+            """)
+                return
+            write("<ul>")
+            _write_items(write, model.quick_wins, "digest_html_quick_win", self.HTML_QUICK_WIN)
+            write("</ul>")
+
+        self.HTML_TEMPLATE.render_into(
+            write,
+            date=model.date.strftime("%B %d, %Y"),
+            user_name=model.user_name,
+            opportunities_html=opportunities,
+            quick_wins_html=quick_wins,
+            long_term_html="<p>No long-term opportunities currently tracked.</p>",
+            strong_criteria=model.strong_criteria,
+            weak_criteria=model.weak_criteria,
+            monthly_count=0,  # This would come from user history
+            daily_tip=model.daily_tip
+        )
+
+class BasicLayout(Layout):
+    """The plain, unpersonalized layout of EmailFormatter"""
+
+    name = "basic"
+
+    PLAIN_TEMPLATE = CompiledTemplate("""Subject: Daily EB-1A Opportunities - {date}
+
+Dear EB-1A Candidate,
+
+Here are today's top opportunities to strengthen your extraordinary ability petition:
+
+{opportunities}
+
+## Long-term Opportunities:
+{long_term_opportunities}
+
+## Quick Action Items:
+- Review deadlines and mark your calendar
+- Prioritize opportunities that address your weak criteria: judging, media, awards
+- Track your response rate to improve future suggestions
+
+Best regards,
+EB-1A Opportunity System
+
+---
+This email was generated automatically. Reply with feedback to improve future recommendations.""")
+
+    PLAIN_OPPORTUNITY_HEAD = "**"
+    PLAIN_OPPORTUNITY = CompiledTemplate(""". {type_name}:** {title}
+- **Topic/Field:** {description}
+- **Deadline:** {deadline}
+- **Link:** {link}
+- **Rating:** Prestige: {stars_prestige}, Evidence Value: {stars_evidence}, Time Investment: {stars_time}
+- **Why it fits:** {why_fits}""")
+    PLAIN_QUICK_WIN = CompiledTemplate("- {title}: {description} ({link})")
+    PLAIN_LONG_TERM = CompiledTemplate("- {title} (Deadline: {deadline}) - {link}")
+
+    HTML_TEMPLATE = CompiledTemplate("""<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+        .header {{ background-color: #f4f4f4; padding: 20px; border-radius: 5px; }}
+        .opportunity {{ margin: 20px 0; padding: 15px; border-left: 4px solid #007cba; background-color: #f9f9f9; }}
+        .rating {{ color: #ff6b35; }}
+        .link {{ color: #007cba; text-decoration: none; }}
+        .quick-wins {{ background-color: #e8f5e8; padding: 15px; border-radius: 5px; }}
+        .long-term {{ background-color: #fff3cd; padding: 15px; border-radius: 5px; }}
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>Daily EB-1A Opportunities - {date}</h1>
+        <p>Your personalized opportunities to strengthen your extraordinary ability petition</p>
+    </div>
+    
+    <div class="content">
+        {opportunities_html}
+    </div>
+    
+    <div class="quick-wins">
+        <h2>🚀 Quick Wins (15-30 min tasks)</h2>
+        {quick_wins_html}
+    </div>
+    
+    <div class="long-term">
+        <h2>📅 Long-term Opportunities</h2>
+        {long_term_html}
+    </div>
+    
+    <hr>
+    <p><small>This email was generated automatically. Track your progress and provide feedback to improve future recommendations.</small></p>
+</body>
+</html>""")
+
+    HTML_OPPORTUNITY_HEAD = """
+            <div class="opportunity">
+                <h3>"""
+    HTML_OPPORTUNITY = CompiledTemplate(""". {type_name}: {title}</h3>
+                <p><strong>Topic/Field:</strong> {description}</p>
+                <p><strong>Deadline:</strong> {deadline}</p>
+                <p><strong>Link:</strong> <a href="{link}" class="link">{link}</a></p>
+                <p class="rating"><strong>Rating:</strong> Prestige: {stars_prestige}, Evidence: {stars_evidence}, Time: {stars_time}</p>
+                <p><strong>Why it fits:</strong> {why_fits}</p>
+            </div>
+            """)
+    HTML_QUICK_WIN = CompiledTemplate(
+        '<p>• <strong>{title}:</strong> {description} (<a href="{link}" class="link">Apply</a>)</p>'
+    )
+    HTML_LONG_TERM = CompiledTemplate(
+        '<p>• <strong>{title}</strong> (Deadline: {deadline}) - <a href="{link}" class="link">Details</a></p>'
+    )
+
+    def render_opportunity(self, opp: Opportunity, index: int) -> str:
+        """One opportunity in the plain layout"""
+        body = _cached("basic_plain", opp,
+                       lambda opp: _render_opportunity(self.PLAIN_OPPORTUNITY, opp, strip=True))
+        return f"{self.PLAIN_OPPORTUNITY_HEAD}{index}{body}"
+
+    def write_plain(self, model: DigestModel, write: Write):
+        def long_term(write: Write):
+            if not model.long_term:
+                write("No long-term opportunities tracked.")
+                return
+            _write_items(write, model.long_term, "basic_plain_long_term", self.PLAIN_LONG_TERM, "\n")
+
+        self.PLAIN_TEMPLATE.render_into(
+            write,
+            date=model.date.strftime("%Y-%m-%d"),
+            opportunities=lambda write: _write_numbered(
+                write, model.regular, "basic_plain",
+                lambda opp: _render_opportunity(self.PLAIN_OPPORTUNITY, opp, strip=True),
+                head=self.PLAIN_OPPORTUNITY_HEAD, separator="\n\n"),
+            long_term_opportunities=long_term
+        )
+
+        write("\n\n## Quick Wins (15-30 min tasks):\n")
+        if model.quick_wins:
+            _write_items(write, model.quick_wins, "basic_plain_quick_win", self.PLAIN_QUICK_WIN, "\n")
+        else:
+            write("No quick wins available today.")
+
+    def write_html(self, model: DigestModel, write: Write):
+        def quick_wins(write: Write):
+            if not model.quick_wins:
+                write("<p>No quick wins available today.</p>")
+                return
+            _write_items(write, model.quick_wins, "basic_html_quick_win", self.HTML_QUICK_WIN)
+
+        def long_term(write: Write):
+            if not model.long_term:
+                write("<p>No long-term opportunities tracked.</p>")
+                return
+            _write_items(write, model.long_term, "basic_html_long_term", self.HTML_LONG_TERM)
+
+        self.HTML_TEMPLATE.render_into(
+            write,
+            date=model.date.strftime("%Y-%m-%d"),
+            opportunities_html=lambda write: _write_numbered(
+                write, model.regular, "basic_html",
+                lambda opp: _render_opportunity(self.HTML_OPPORTUNITY, opp),
+                head=self.HTML_OPPORTUNITY_HEAD),
+            quick_wins_html=quick_wins,
+            long_term_html=long_term
+        )
+
+DIGEST_LAYOUT = DigestLayout()
+BASIC_LAYOUT = BasicLayout()
+
+_buffers = threading.local()
+
+def _reset_buffer() -> io.StringIO:
+    """This thread's reusable output buffer, emptied"""
+    buffer = getattr(_buffers, "buffer", None)
+    if buffer is None:
+        buffer = _buffers.buffer = io.StringIO()
+    buffer.seek(0)
+    buffer.truncate()
+    return buffer
+
+class EmailRenderer:
+    """Renders daily emails from one digest model.
+
+    Both parts come out of a single call: opportunities are partitioned
+    once, each part is written into the thread's reused StringIO, and
+    per-opportunity fragments are shared across users through
+    ``fragments``.
+    """
+
+    # Rendered opportunity fragments, shared by every user's email
+    fragments = FragmentCache(SystemConfig.TEMPLATE_FRAGMENT_CACHE_SIZE)
+
+    def __init__(self, layout: Layout = None):
+        self.layout = layout or DIGEST_LAYOUT
+
+    def render_model(self, model: DigestModel, plain: bool = True, html: bool = True) -> RenderedEmail:
+        rendered = RenderedEmail()
+        if plain:
+            with RENDER_SECONDS.labels("plain").time():
+                buffer = _reset_buffer()
+                self.layout.write_plain(model, buffer.write)
+                rendered.plain = buffer.getvalue()
+        if html:
+            with RENDER_SECONDS.labels("html").time():
+                buffer = _reset_buffer()
+                self.layout.write_html(model, buffer.write)
+                rendered.html = buffer.getvalue()
+        return rendered
+
+    def render(self, opportunities: List[Opportunity], user_profile: Dict[str, Any] = None,
+               user_history: Dict[str, Any] = None, plain: bool = True, html: bool = True) -> RenderedEmail:
+        """Render the daily email's plain-text and/or HTML parts"""
+        with span("email.render", layout=type(self.layout).__name__, opportunities=len(opportunities),
+                  plain=plain, html=html):
+            model = build_digest_model(opportunities, user_profile, user_history)
+            return self.render_model(model, plain=plain, html=html)
@@ -13,10 +13,18 @@ from typing import List, Optional, Dict, Any
 import logging
 from datetime import datetime
 import os
+import time
 
 from src.config import SystemConfig, UserProfile, EmailFormat
 from src.opportunity_search import Opportunity
-from src.email_templates import EmailPersonalizer, HTMLEmailGenerator
+from src.email_renderer import EmailRenderer
+from src.smtp_pool import SMTPConnectionPool, get_shared_pool
+from src.async_smtp import AsyncSMTPDelivery, get_shared_engine
+from src.send_quota import QuotaExceeded, SendQuota, get_send_quota
+from src.mime_builder import get_message_builder, smtp_send
+from src.metrics import SMTP_SEND_SECONDS
+from src.tracing import span
+from src.sent_email_log import SentEmailLog
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,12 +34,16 @@ class EmailSender:
     """Handles email sending functionality"""
     
     def __init__(self, smtp_server: str = None, smtp_port: int = None, 
-                 username: str = None, password: str = None):
+                 username: str = None, password: str = None,
+                 use_tls: bool = None, pool_size: int = None, quota: SendQuota = None):
         self.smtp_server = smtp_server or SystemConfig.SMTP_SERVER
         self.smtp_port = smtp_port or SystemConfig.SMTP_PORT
         self.username = username or SystemConfig.EMAIL_USERNAME
         self.password = password or SystemConfig.EMAIL_PASSWORD
         self.from_email = SystemConfig.FROM_EMAIL or self.username
+        self.use_tls = SystemConfig.SMTP_USE_TLS if use_tls is None else use_tls
+        self.pool_size = SystemConfig.SMTP_POOL_SIZE if pool_size is None else pool_size
+        self.quota = quota
         
         # Validate configuration
         if not all([self.smtp_server, self.username, self.password]):
@@ -40,6 +52,23 @@ class EmailSender:
         else:
             self.enabled = True
     
+    def render_daily_opportunities_email(self, user_profile: UserProfile,
+                                         opportunities: List[Opportunity]) -> Dict[str, Any]:
+        """Build the daily opportunities email as keyword arguments for send_email"""
+        # Both parts come from one pass over the opportunities
+        rendered = EmailRenderer().render(
+            opportunities, user_profile.__dict__,
+            plain=user_profile.email_format in [EmailFormat.PLAIN_TEXT, EmailFormat.BOTH],
+            html=user_profile.email_format in [EmailFormat.HTML, EmailFormat.BOTH]
+        )
+        
+        return {
+            "to_email": user_profile.email,
+            "subject": f"Daily EB-1A Opportunities - {datetime.now().strftime('%Y-%m-%d')}",
+            "plain_content": rendered.plain,
+            "html_content": rendered.html
+        }
+    
     def send_daily_opportunities_email(self, user_profile: UserProfile, 
                                      opportunities: List[Opportunity]) -> bool:
         """Send daily opportunities email to user"""
@@ -48,30 +77,9 @@ class EmailSender:
                 logger.warning("Email sending is disabled due to incomplete configuration")
                 return False
             
-            # Generate email content
-            personalizer = EmailPersonalizer(user_profile.__dict__)
-            
-            if user_profile.email_format in [EmailFormat.HTML, EmailFormat.BOTH]:
-                html_content = HTMLEmailGenerator.generate_html_daily_email(
-                    opportunities, user_profile.__dict__
-                )
-            else:
-                html_content = None
-            
-            if user_profile.email_format in [EmailFormat.PLAIN_TEXT, EmailFormat.BOTH]:
-                plain_content = personalizer.personalize_daily_email(opportunities)
-            else:
-                plain_content = None
-            
-            # Send email
-            subject = f"Daily EB-1A Opportunities - {datetime.now().strftime('%Y-%m-%d')}"
-            
-            return self.send_email(
-                to_email=user_profile.email,
-                subject=subject,
-                plain_content=plain_content,
-                html_content=html_content
-            )
+            # Generate email content and send it
+            message = self.render_daily_opportunities_email(user_profile, opportunities)
+            return self.send_email(**message)
             
         except Exception as e:
             logger.error(f"Failed to send daily opportunities email: {str(e)}")
@@ -224,54 +232,173 @@ EB-1A Opportunity System
                    plain_content: str = None, html_content: str = None,
                    attachments: List[str] = None) -> bool:
         """Send email with optional HTML content and attachments"""
-        try:
-            if not self.enabled:
-                logger.warning("Email sending is disabled")
+        with span("email.send", recipient_domain=to_email.rpartition("@")[2],
+                  attachments=len(attachments or [])) as send_span:
+            try:
+                if not self.enabled:
+                    logger.warning("Email sending is disabled")
+                    send_span.set_attribute("outcome", "disabled")
+                    return False
+                
+                msg = self._prepare(to_email, subject, plain_content, html_content, attachments)
+                self._deliver_within_quota(msg, to_email, wait=True)
+                
+                logger.info(f"Email sent successfully to {to_email}")
+                send_span.set_attribute("outcome", "sent")
+                return True
+                
+            except QuotaExceeded as e:
+                logger.warning(f"Not sending email to {to_email}: {str(e)}")
+                send_span.set_attribute("outcome", f"quota_{e.scope}")
                 return False
-            
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.from_email
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            # Add plain text content
-            if plain_content:
-                msg.attach(MIMEText(plain_content, 'plain'))
-            
-            # Add HTML content
-            if html_content:
-                msg.attach(MIMEText(html_content, 'html'))
-            
-            # Add attachments
-            if attachments:
-                for file_path in attachments:
-                    if os.path.exists(file_path):
-                        with open(file_path, "rb") as attachment:
-                            part = MIMEBase('application', 'octet-stream')
-                            part.set_payload(attachment.read())
-                        
-                        encoders.encode_base64(part)
-                        part.add_header(
-                            'Content-Disposition',
-                            f'attachment; filename= {os.path.basename(file_path)}'
-                        )
-                        msg.attach(part)
-            
-            # Create secure connection and send email
-            context = ssl.create_default_context()
-            
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.username, self.password)
-                server.send_message(msg)
-            
+            except Exception as e:
+                logger.error(f"Failed to send email to {to_email}: {str(e)}")
+                send_span.set_attribute("outcome", "error")
+                send_span.set_attribute("error", str(e))
+                return False
+    
+    def deliver_message(self, message: Dict[str, Any]):
+        """Send a send_email keyword dict, raising on failure (used by the outbox,
+        which needs the error to decide between retrying and dead-lettering)"""
+        to_email = message['to_email']
+        with span("email.send", recipient_domain=to_email.rpartition("@")[2],
+                  attachments=len(message.get('attachments') or [])) as send_span:
+            try:
+                if not self.enabled:
+                    raise RuntimeError("Email sending is disabled")
+                self._deliver_within_quota(self._prepare(**message), to_email)
+            except QuotaExceeded as e:
+                send_span.set_attribute("outcome", f"quota_{e.scope}")
+                raise
+            except Exception:
+                send_span.set_attribute("outcome", "error")
+                raise
             logger.info(f"Email sent successfully to {to_email}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to send email to {to_email}: {str(e)}")
-            return False
+            send_span.set_attribute("outcome", "sent")
+    
+    def _prepare(self, to_email: str, subject: str, plain_content: str = None,
+                 html_content: str = None, attachments: List[str] = None):
+        """The message to deliver: a PreparedMessage sharing its encoded body with
+        every other recipient of the same content, or a full MIME tree when there
+        are attachments"""
+        if attachments:
+            return self._build_message(to_email, subject, plain_content, html_content, attachments)
+        return get_message_builder().build(self.from_email, to_email, subject, plain_content, html_content)
+    
+    def _build_message(self, to_email: str, subject: str, plain_content: str = None,
+                       html_content: str = None, attachments: List[str] = None) -> MIMEMultipart:
+        """Create the MIME message"""
+        msg = MIMEMultipart('alternative')
+        msg['From'] = self.from_email
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        
+        # Add plain text content
+        if plain_content:
+            msg.attach(MIMEText(plain_content, 'plain'))
+        
+        # Add HTML content
+        if html_content:
+            msg.attach(MIMEText(html_content, 'html'))
+        
+        # Add attachments
+        if attachments:
+            for file_path in attachments:
+                if os.path.exists(file_path):
+                    with open(file_path, "rb") as attachment:
+                        part = MIMEBase('application', 'octet-stream')
+                        part.set_payload(attachment.read())
+                    
+                    encoders.encode_base64(part)
+                    part.add_header(
+                        'Content-Disposition',
+                        f'attachment; filename= {os.path.basename(file_path)}'
+                    )
+                    msg.attach(part)
+        
+        return msg
+    
+    def _get_pool(self) -> Optional[SMTPConnectionPool]:
+        """The session pool for this account, shared by every sender in the process
+        (None when pooling is off)"""
+        if self.pool_size <= 0:
+            return None
+        return get_shared_pool(self.smtp_server, self.smtp_port, self.username, self.password,
+                               size=self.pool_size, use_tls=self.use_tls)
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Open an authenticated SMTP session"""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=SystemConfig.SMTP_TIMEOUT)
+        try:
+            if self.use_tls:
+                server.starttls(context=ssl.create_default_context())
+            server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    @property
+    def account(self) -> str:
+        """The sending account the provider's quotas apply to"""
+        return f"{self.username}@{self.smtp_server}"
+    
+    def _get_quota(self) -> SendQuota:
+        return self.quota or get_send_quota()
+    
+    def _acquire_quota(self, to_email: str, wait: bool = False) -> float:
+        """Count a send against the quotas; returns the time it was counted at.
+
+        With ``wait``, a send held back by account pacing sleeps until the
+        limit frees up (for at most SMTP_PACING_MAX_WAIT_SECONDS) rather
+        than failing; the recipient and daily caps still raise at once.
+        """
+        quota = self._get_quota()
+        deadline = time.time() + (SystemConfig.SMTP_PACING_MAX_WAIT_SECONDS if wait else 0)
+        while True:
+            acquired_at = time.time()
+            try:
+                quota.acquire(to_email, self.account, acquired_at)
+                return acquired_at
+            except QuotaExceeded as e:
+                if e.retry_at is None or e.retry_at > deadline:
+                    raise
+                logger.info(f"Pacing email to {to_email} for {e.retry_at - acquired_at:.0f}s: {str(e)}")
+                time.sleep(max(0.0, e.retry_at - time.time()))
+
+    def _deliver_within_quota(self, msg, to_email: str, wait: bool = False):
+        """Deliver a message if the recipient and account quotas allow it
+        (raises QuotaExceeded otherwise, after waiting out pacing if ``wait``)"""
+        quota = self._get_quota()
+        acquired_at = self._acquire_quota(to_email, wait=wait)
+        try:
+            self._deliver(msg)
+        except Exception:
+            quota.release(to_email, self.account, acquired_at)
+            raise
+    
+    def _deliver(self, msg):
+        """Hand a message to the SMTP server, on a pooled session when enabled"""
+        pool = self._get_pool()
+        transport = "direct" if pool is None else "pooled"
+        started = time.perf_counter()
+        try:
+            if pool is not None:
+                pool.send_message(msg)
+            else:
+                with self._connect() as server:
+                    smtp_send(server, msg)
+        except Exception:
+            SMTP_SEND_SECONDS.labels(transport, "error").observe(time.perf_counter() - started)
+            raise
+        SMTP_SEND_SECONDS.labels(transport, "ok").observe(time.perf_counter() - started)
+    
+    def get_transport_stats(self) -> Dict[str, Any]:
+        """Connection reuse statistics for the SMTP transport"""
+        pool = self._get_pool() if self.enabled else None
+        if pool is None:
+            return {"pooled": False}
+        return dict(pool.get_stats(), pooled=True)
     
     def validate_configuration(self) -> Dict[str, Any]:
         """Validate email configuration"""
@@ -296,10 +423,8 @@ EB-1A Opportunity System
         
         # Test connection
         try:
-            context = ssl.create_default_context()
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.username, self.password)
+            with self._connect():
+                pass
             
             validation_result["valid"] = True
             logger.info("Email configuration validated successfully")
@@ -313,17 +438,121 @@ EB-1A Opportunity System
         
         return validation_result
 
+class AsyncEmailSender(EmailSender):
+    """EmailSender that delivers through the shared asyncio SMTP engine.
+
+    send_email keeps its blocking signature, but every caller's message
+    is multiplexed over the engine's few pipelined connections, and
+    send_emails hands a whole batch to the event loop at once.
+    """
+    
+    def __init__(self, smtp_server: str = None, smtp_port: int = None,
+                 username: str = None, password: str = None,
+                 use_tls: bool = None, connections: int = None, quota: SendQuota = None):
+        super().__init__(smtp_server, smtp_port, username, password, use_tls=use_tls, pool_size=0,
+                         quota=quota)
+        self.connections = connections
+    
+    def _get_engine(self) -> AsyncSMTPDelivery:
+        return get_shared_engine(self.smtp_server, self.smtp_port, self.username, self.password,
+                                 use_tls=self.use_tls, connections=self.connections)
+    
+    def _deliver(self, msg):
+        self._get_engine().send_message(msg)
+    
+    def send_emails(self, messages: List[Dict[str, Any]]) -> List[bool]:
+        """Send many emails (send_email keyword dicts) concurrently"""
+        if not self.enabled:
+            logger.warning("Email sending is disabled")
+            return [False] * len(messages)
+        
+        deadline = time.time() + SystemConfig.SMTP_PACING_MAX_WAIT_SECONDS
+        errors: List[Optional[Exception]] = [None] * len(messages)
+        waiting = list(range(len(messages)))
+        # Send whatever the quotas allow now; messages held back by account
+        # pacing go out in later rounds as the limit frees up
+        while waiting:
+            results = self.deliver_messages([messages[index] for index in waiting])
+            paced = []
+            for index, error in zip(waiting, results):
+                errors[index] = error
+                if isinstance(error, QuotaExceeded) and error.retry_at is not None and error.retry_at <= deadline:
+                    paced.append(index)
+            
+            waiting = paced
+            if waiting:
+                retry_at = min(errors[index].retry_at for index in waiting)
+                logger.info(f"Pacing {len(waiting)} emails for {retry_at - time.time():.0f}s")
+                time.sleep(max(0.0, retry_at - time.time()))
+        
+        for message, error in zip(messages, errors):
+            if error is None:
+                continue
+            if isinstance(error, QuotaExceeded):
+                logger.warning(f"Not sending email to {message['to_email']}: {str(error)}")
+            else:
+                logger.error(f"Failed to send email to {message['to_email']}: {str(error)}")
+        
+        sent = sum(error is None for error in errors)
+        logger.info(f"Sent {sent}/{len(messages)} emails")
+        return [error is None for error in errors]
+    
+    def deliver_messages(self, messages: List[Dict[str, Any]]) -> List[Optional[Exception]]:
+        """Send a batch of send_email keyword dicts in one pipelined
+        send_many; returns None or the error for each (QuotaExceeded for
+        messages the quotas hold back). Used by the outbox for whole
+        claimed batches."""
+        if not self.enabled:
+            return [RuntimeError("Email sending is disabled")] * len(messages)
+        
+        quota, acquired_at = self._get_quota(), time.time()
+        errors: List[Optional[Exception]] = [None] * len(messages)
+        allowed = []
+        for index, message in enumerate(messages):
+            try:
+                quota.acquire(message['to_email'], self.account, acquired_at)
+            except QuotaExceeded as e:
+                errors[index] = e
+            else:
+                allowed.append(index)
+        
+        with span("email.send_batch", messages=len(messages), allowed=len(allowed)) as batch_span:
+            results = self._get_engine().send_many(self._prepare(**messages[index]) for index in allowed)
+            for index, error in zip(allowed, results):
+                errors[index] = error
+                if error is not None:
+                    quota.release(messages[index]['to_email'], self.account, acquired_at)
+            batch_span.set_attribute("sent", sum(error is None for error in results))
+        return errors
+    
+    def get_transport_stats(self) -> Dict[str, Any]:
+        if not self.enabled:
+            return {"async": False}
+        return dict(self._get_engine().get_stats(), async_engine=True)
+
+def create_email_sender() -> EmailSender:
+    """Build the sender for the configured SMTP_BACKEND"""
+    if SystemConfig.SMTP_BACKEND == "async":
+        return AsyncEmailSender()
+    return EmailSender()
+
 class MockEmailSender(EmailSender):
     """Mock email sender for testing purposes"""
     
-    def __init__(self):
+    def __init__(self, buffer_size: int = None, spill_path: str = None):
         self.enabled = True
-        self.sent_emails = []
+        # Bounded: the newest sends stay in memory, older ones spill or drop
+        self.sent_emails = SentEmailLog(buffer_size, spill_path)
     
     def send_email(self, to_email: str, subject: str, 
                    plain_content: str = None, html_content: str = None,
                    attachments: List[str] = None) -> bool:
         """Mock email sending - stores emails instead of sending"""
+        with span("email.send", recipient_domain=to_email.rpartition("@")[2], transport="mock"):
+            return self._record(to_email, subject, plain_content, html_content, attachments)
+    
+    def _record(self, to_email: str, subject: str, plain_content: str = None,
+                html_content: str = None, attachments: List[str] = None) -> bool:
         email_record = {
             "to": to_email,
             "subject": subject,
@@ -337,13 +566,26 @@ class MockEmailSender(EmailSender):
         logger.info(f"Mock email sent to {to_email}: {subject}")
         return True
     
-    def get_sent_emails(self) -> List[Dict[str, Any]]:
-        """Get list of sent emails for testing"""
-        return self.sent_emails
+    def deliver_message(self, message: Dict[str, Any]):
+        """Mock delivery for the outbox"""
+        self.send_email(**message)
+    
+    def get_sent_emails(self, offset: int = 0, limit: int = None,
+                        newest_first: bool = False) -> List[Dict[str, Any]]:
+        """Get the buffered sent emails (oldest first), optionally one page of them"""
+        if limit is None and offset == 0 and not newest_first:
+            return self.sent_emails.records()
+        return self.sent_emails.page(offset, self.sent_emails.capacity if limit is None else limit,
+                                     newest_first)["items"]
+    
+    @property
+    def sent_count(self) -> int:
+        """Emails sent since creation, including ones no longer buffered"""
+        return self.sent_emails.total
     
     def clear_sent_emails(self):
         """Clear sent emails list"""
-        self.sent_emails = []
+        self.sent_emails.clear()
 
 if __name__ == "__main__":
     # Test email sender
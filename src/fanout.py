@@ -0,0 +1,208 @@
+"""
+EB-1A Fan-out Module
+Runs a batch of items through a pipeline of separately sized worker stages
+connected by bounded queues (used for the daily rank -> render -> deliver run)
+"""
+
+import contextvars
+import queue
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.metrics import QUEUE_DEPTH
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+class FanoutStage:
+    """One pipeline stage: a worker pool reading from a bounded input queue.
+
+    ``func`` takes an item and returns the item for the next stage, or
+    None to drop it (e.g. a user with nothing to send).
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int, queue_size: int,
+                 queue_label: str = None):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.max_depth = 0
+        self._depth_total = 0
+        self._depth_samples = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        self._alive = self.workers
+        self._lock = threading.Lock()
+        self.depth_gauge = QUEUE_DEPTH.labels(queue_label or name)
+
+    def put(self, item: Any):
+        """Enqueue an item, blocking while the queue is full"""
+        self.queue.put(item)
+        depth = self.queue.qsize()
+        self.depth_gauge.set(depth)
+        with self._lock:
+            self.max_depth = max(self.max_depth, depth)
+            self._depth_total += depth
+            self._depth_samples += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            end = self.finished_at or time.perf_counter()
+            elapsed = end - self.started_at if self.started_at else 0.0
+            return {
+                "workers": self.workers,
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "throughput_per_sec": round(self.processed / elapsed, 2) if elapsed else 0.0,
+                "utilization": round(self.busy_seconds / (elapsed * self.workers), 3) if elapsed else 0.0,
+                "queue_depth": self.queue.qsize(),
+                "queue_capacity": self.queue.maxsize,
+                "max_queue_depth": self.max_depth,
+                "avg_queue_depth": round(self._depth_total / self._depth_samples, 2) if self._depth_samples else 0.0
+            }
+
+class FanoutExecutor:
+    """Pipeline of worker stages joined by bounded queues.
+
+    Every stage has its own pool size, so CPU-bound ranking and rendering
+    can stay small while I/O-bound delivery runs wide. Because each queue
+    is bounded, a slow stage applies back-pressure to the ones before it
+    and the number of items in flight (and so memory) never exceeds the
+    sum of queue capacities plus one item per worker.
+    """
+
+    def __init__(self, stages: List[tuple], queue_size: int = 100, name: str = "fanout",
+                 on_error: Callable[[Any, Exception], None] = None):
+        self.name = name
+        self.on_error = on_error
+        self.stages = [FanoutStage(stage_name, func, workers, queue_size, f"{name}.{stage_name}")
+                       for stage_name, func, workers in stages]
+        self.submitted = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def run(self, items: Iterable[Any]) -> Dict[str, Any]:
+        """Push every item through the pipeline and wait; returns the stats"""
+        self.started_at = time.perf_counter()
+        threads = []
+        for index, stage in enumerate(self.stages):
+            for worker in range(stage.workers):
+                # Each worker runs in a copy of the caller's context, so stage
+                # spans nest under the span that started the run
+                thread = threading.Thread(target=contextvars.copy_context().run, args=(self._work, index),
+                                          name=f"{self.name}-{stage.name}-{worker}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        first = self.stages[0]
+        try:
+            for item in items:
+                first.put(item)
+                self.submitted += 1
+        finally:
+            # Even if ``items`` raises, let the stages drain what was submitted
+            # and exit instead of waiting on their queues forever
+            for _ in range(first.workers):
+                first.queue.put(_DONE)
+            for thread in threads:
+                thread.join()
+            self.finished_at = time.perf_counter()
+
+        return self.get_stats()
+
+    def _work(self, index: int):
+        stage = self.stages[index]
+        next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+
+        with stage._lock:
+            if stage.started_at is None:
+                stage.started_at = time.perf_counter()
+
+        while True:
+            item = stage.queue.get()
+            if item is _DONE:
+                break
+            stage.depth_gauge.set(stage.queue.qsize())
+
+            started = time.perf_counter()
+            try:
+                result = stage.func(item)
+            except Exception as e:
+                result = None
+                logger.error(f"Fan-out stage {stage.name} failed: {str(e)}")
+                with stage._lock:
+                    stage.failed += 1
+                if self.on_error:
+                    try:
+                        self.on_error(item, e)
+                    except Exception as hook_error:
+                        logger.error(f"Fan-out error hook failed: {str(hook_error)}")
+            else:
+                with stage._lock:
+                    stage.processed += 1
+                    if result is None:
+                        stage.dropped += 1
+            finally:
+                with stage._lock:
+                    stage.busy_seconds += time.perf_counter() - started
+
+            if result is not None and next_stage is not None:
+                next_stage.put(result)
+
+        # The last worker out tells every worker of the next stage to finish
+        with stage._lock:
+            stage._alive -= 1
+            last = stage._alive == 0
+            if last:
+                stage.finished_at = time.perf_counter()
+        if last and next_stage is not None:
+            for _ in range(next_stage.workers):
+                next_stage.queue.put(_DONE)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-stage throughput and queue depths; safe to call mid-run"""
+        end = self.finished_at or time.perf_counter()
+        return {
+            "submitted": self.submitted,
+            "completed": self.stages[-1].processed - self.stages[-1].dropped,
+            "elapsed_seconds": round(end - self.started_at, 3) if self.started_at else 0.0,
+            "running": self.started_at is not None and self.finished_at is None,
+            "stages": {stage.name: stage.get_stats() for stage in self.stages}
+        }
+
+if __name__ == "__main__":
+    # Fan out a synthetic 10k-user batch with simulated SMTP latency
+    import json
+    import random
+
+    print("=== Testing Fan-out Executor ===")
+
+    def rank(user):
+        scores = sorted((random.random() for _ in range(200)), reverse=True)
+        return (user, scores[:10])
+
+    def render(ranked):
+        user, scores = ranked
+        return (user, "".join(f"<li>{score:.3f}</li>" for score in scores))
+
+    def deliver(rendered):
+        time.sleep(0.005)  # SMTP round trip
+        return rendered[0]
+
+    executor = FanoutExecutor([("rank", rank, 2), ("render", render, 2), ("deliver", deliver, 32)],
+                              queue_size=200)
+    stats = executor.run(f"user{i}" for i in range(10000))
+    print(json.dumps(stats, indent=2))
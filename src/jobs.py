@@ -0,0 +1,332 @@
+"""
+EB-1A Background Jobs Module
+Runs long operations (opportunity refreshes) off the request thread and
+publishes their progress so any worker can report it
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from src.config import SystemConfig
+from src.state_store import StateStore, get_state_store
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+ACTIVE_STATUSES = (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+
+JOBS_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        dedup_key TEXT,
+        status TEXT NOT NULL,
+        stage TEXT,
+        progress TEXT NOT NULL DEFAULT '{}',
+        result TEXT,
+        error TEXT,
+        version INTEGER NOT NULL DEFAULT 0,
+        owner_pid INTEGER,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_jobs_dedup ON jobs (dedup_key, status)",
+]
+
+@dataclass
+class Job:
+    """Snapshot of a background job"""
+    id: str
+    kind: str
+    status: JobStatus
+    dedup_key: Optional[str] = None
+    stage: Optional[str] = None
+    progress: Dict[str, Any] = field(default_factory=dict)
+    result: Any = None
+    error: Optional[str] = None
+    version: int = 0
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status.value,
+            "stage": self.stage,
+            "progress": self.progress,
+            "error": self.error,
+            "created_at": datetime.fromtimestamp(self.created_at).isoformat(),
+            "updated_at": datetime.fromtimestamp(self.updated_at).isoformat()
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+class JobProgress:
+    """Handed to a running job so it can report which stage it reached"""
+
+    def __init__(self, manager: "JobManager", job_id: str):
+        self.manager = manager
+        self.job_id = job_id
+
+    def __call__(self, stage: str, **details):
+        self.manager.update_progress(self.job_id, stage, details)
+
+class JobManager:
+    """Runs jobs in a bounded worker pool and keeps their state in the shared store.
+
+    Job rows live in SQLite rather than in memory so that the gunicorn
+    worker answering ``/api/jobs/<id>/events`` does not have to be the one
+    running the job, and so that duplicate submissions arriving at other
+    workers attach to the running job instead of starting a second one.
+    """
+
+    def __init__(self, store: StateStore = None, max_workers: int = None):
+        self.store = store or get_state_store()
+        self.max_workers = max_workers or SystemConfig.JOB_WORKERS
+        self.stale_after = SystemConfig.JOB_STALE_SECONDS
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._active = set()
+        self._heartbeat_thread = None
+
+    def _ensure_workers(self):
+        """Create the pool lazily so nothing is started before a fork"""
+        if self._executor is not None and self._executor_pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="eb1a-job")
+            self._executor_pid = os.getpid()
+            self._active = set()
+            self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+            self._heartbeat_thread.start()
+
+    def _schema(self):
+        self.store.ensure_schema("jobs", JOBS_SCHEMA)
+
+    def submit(self, kind: str, func: Callable[[JobProgress], Any],
+               dedup_key: str = None) -> Tuple[Job, bool]:
+        """Queue a job, or attach to the active job with the same dedup key.
+
+        Returns the job and whether it was newly created.
+        """
+        self._schema()
+        self._ensure_workers()
+        now = time.time()
+
+        with self.store.transaction(immediate=True) as conn:
+            if dedup_key:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE dedup_key = ? AND status IN (?, ?) "
+                    "AND updated_at >= ? ORDER BY created_at DESC LIMIT 1",
+                    (dedup_key, *ACTIVE_STATUSES, now - self.stale_after)
+                ).fetchone()
+                if row:
+                    logger.info(f"Attaching to running job {row['id']} for {dedup_key}")
+                    return self._row_to_job(row), False
+
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, kind, dedup_key, status, owner_pid, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, dedup_key, JobStatus.QUEUED.value, os.getpid(), now, now)
+            )
+
+        self._active.add(job_id)
+        self._executor.submit(self._run, job_id, func)
+        self._prune()
+
+        logger.info(f"Queued {kind} job {job_id}")
+        return self.get(job_id), True
+
+    def _run(self, job_id: str, func: Callable[[JobProgress], Any]):
+        """Execute a job inside the worker pool"""
+        self._set_status(job_id, JobStatus.RUNNING)
+        try:
+            result = func(JobProgress(self, job_id))
+            self._finish(job_id, JobStatus.SUCCEEDED, result=result)
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            self._finish(job_id, JobStatus.FAILED, error=str(e))
+        finally:
+            self._active.discard(job_id)
+
+    def update_progress(self, job_id: str, stage: str, details: Dict[str, Any] = None):
+        """Record that a job reached a stage"""
+        with self.store.transaction(immediate=True) as conn:
+            row = conn.execute("SELECT progress FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if not row:
+                return
+            progress = json.loads(row["progress"])
+            progress[stage] = details or {}
+            conn.execute(
+                "UPDATE jobs SET stage = ?, progress = ?, version = version + 1, updated_at = ? "
+                "WHERE id = ?",
+                (stage, json.dumps(progress), time.time(), job_id)
+            )
+
+    def _set_status(self, job_id: str, status: JobStatus):
+        self.store.execute(
+            "UPDATE jobs SET status = ?, version = version + 1, updated_at = ? WHERE id = ?",
+            (status.value, time.time(), job_id)
+        )
+
+    def _finish(self, job_id: str, status: JobStatus, result: Any = None, error: str = None):
+        self.store.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, version = version + 1, "
+            "updated_at = ? WHERE id = ?",
+            (status.value, json.dumps(result) if result is not None else None,
+             error, time.time(), job_id)
+        )
+
+    def _heartbeat_loop(self):
+        """Keep queued and running jobs from looking stale while they wait or work"""
+        interval = max(1, self.stale_after // 3)
+        while True:
+            time.sleep(interval)
+            active = list(self._active)
+            if not active:
+                continue
+            try:
+                now = time.time()
+                for job_id in active:
+                    self.store.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (now, job_id))
+            except Exception as e:
+                logger.error(f"Job heartbeat failed: {str(e)}")
+
+    def _prune(self):
+        """Drop finished jobs past the retention window"""
+        cutoff = time.time() - timedelta(hours=SystemConfig.JOB_RETENTION_HOURS).total_seconds()
+        try:
+            self.store.execute(
+                "DELETE FROM jobs WHERE status NOT IN (?, ?) AND updated_at < ?",
+                (*ACTIVE_STATUSES, cutoff)
+            )
+        except Exception as e:
+            logger.error(f"Failed to prune jobs: {str(e)}")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job snapshot"""
+        self._schema()
+        row = self.store.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if not row:
+            return None
+
+        job = self._row_to_job(row)
+        if not job.finished and time.time() - job.updated_at > self.stale_after:
+            # The worker running it died; report it instead of waiting forever
+            job.status = JobStatus.FAILED
+            job.error = "Job worker stopped responding"
+        return job
+
+    def iter_events(self, job_id: str, poll_interval: float = 0.5, keepalive: float = 15.0,
+                    max_duration: float = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (event, payload) pairs until the job finishes.
+
+        ``progress`` is emitted whenever the job row changes, ``keepalive``
+        when nothing happened for a while, and ``complete`` or ``failed``
+        exactly once at the end. After ``max_duration`` seconds (default
+        JOB_STREAM_MAX_SECONDS) the stream ends with ``retry`` instead, so
+        a long job never holds a server worker past its request timeout;
+        the client reconnects or polls the job.
+        """
+        max_duration = SystemConfig.JOB_STREAM_MAX_SECONDS if max_duration is None else max_duration
+        last_version = -1
+        started = last_sent = time.time()
+
+        while True:
+            job = self.get(job_id)
+            if job is None:
+                yield "failed", {"job_id": job_id, "error": "Unknown job"}
+                return
+
+            if job.finished:
+                yield ("complete" if job.status == JobStatus.SUCCEEDED else "failed"), job.to_dict()
+                return
+
+            if job.version != last_version:
+                last_version = job.version
+                last_sent = time.time()
+                yield "progress", job.to_dict(include_result=False)
+            elif time.time() - last_sent >= keepalive:
+                last_sent = time.time()
+                yield "keepalive", {}
+
+            if max_duration and time.time() - started >= max_duration:
+                yield "retry", {"job_id": job_id, "status": job.status.value,
+                                "status_url": f"/api/jobs/{job_id}"}
+                return
+
+            time.sleep(poll_interval)
+
+    @staticmethod
+    def _row_to_job(row) -> Job:
+        return Job(
+            id=row["id"],
+            kind=row["kind"],
+            status=JobStatus(row["status"]),
+            dedup_key=row["dedup_key"],
+            stage=row["stage"],
+            progress=json.loads(row["progress"] or "{}"),
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            version=row["version"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"]
+        )
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode one Server-Sent Events message"""
+    if event == "keepalive":
+        return ": keepalive\n\n"
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+if __name__ == "__main__":
+    # Test the job manager
+    import tempfile
+
+    print("=== Testing Job Manager ===")
+
+    store = StateStore(os.path.join(tempfile.mkdtemp(), "jobs.db"))
+    manager = JobManager(store, max_workers=2)
+
+    def slow_job(progress):
+        for stage in ("fetched", "parsed", "deduped", "ranked"):
+            time.sleep(0.2)
+            progress(stage, ok=True)
+        return {"count": 3}
+
+    job, created = manager.submit("refresh", slow_job, dedup_key="refresh:test")
+    duplicate, duplicate_created = manager.submit("refresh", slow_job, dedup_key="refresh:test")
+    print(f"Created: {created}, duplicate attached: {duplicate.id == job.id and not duplicate_created}")
+
+    for event, payload in manager.iter_events(job.id, poll_interval=0.05):
+        print(f"{event}: stage={payload.get('stage')} status={payload.get('status')}")
@@ -0,0 +1,175 @@
+"""
+EB-1A Leader Election Module
+Elects a single process among the gunicorn workers to run singleton tasks
+such as the opportunity scheduler
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows has no flock; every process acts as leader there
+    fcntl = None
+
+from src.config import SystemConfig
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class LeaderLease:
+    """Leader lease backed by an exclusive ``flock`` on a shared lock file.
+
+    Whichever process holds the lock is the leader. The kernel drops the
+    lock when the holder exits or crashes, so a follower polling every
+    ``retry_interval`` seconds takes over within one interval. While it
+    leads, the holder rewrites the file with its pid and a heartbeat
+    timestamp so the other workers can report who is in charge.
+    """
+
+    def __init__(self, name: str = "scheduler", lock_path: str = None,
+                 retry_interval: float = None):
+        self.name = name
+        self.lock_path = lock_path or os.path.join(
+            os.path.dirname(os.path.abspath(SystemConfig.STATE_DB_PATH)), f"{name}.lock"
+        )
+        self.retry_interval = retry_interval or SystemConfig.LEADER_RETRY_SECONDS
+        self.is_leader = False
+
+        self._fd: Optional[int] = None
+        self._on_elected: Optional[Callable[[], None]] = None
+        self._on_demoted: Optional[Callable[[], None]] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, on_elected: Callable[[], None] = None,
+              on_demoted: Callable[[], None] = None):
+        """Start campaigning for leadership in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._campaign, name=f"{self.name}-lease", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop campaigning and give up leadership if held"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._release()
+
+    def _campaign(self):
+        """Try to acquire the lease, then keep heartbeating while it is held"""
+        while not self._stop_event.is_set():
+            try:
+                if self.is_leader:
+                    self._heartbeat()
+                elif self._try_acquire():
+                    logger.info(f"Process {os.getpid()} elected {self.name} leader")
+                    if self._on_elected:
+                        self._on_elected()
+            except Exception as e:
+                logger.error(f"Leader lease error: {str(e)}")
+
+            self._stop_event.wait(self.retry_interval)
+
+    def _try_acquire(self) -> bool:
+        if fcntl is None:
+            self.is_leader = True
+            return True
+
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        self._fd = fd
+        self.is_leader = True
+        self._heartbeat()
+        return True
+
+    def _heartbeat(self):
+        if self._fd is None:
+            return
+
+        record = json.dumps({
+            "pid": os.getpid(),
+            "hostname": socket.gethostname(),
+            "heartbeat": time.time()
+        }).encode()
+        os.ftruncate(self._fd, 0)
+        os.pwrite(self._fd, record, 0)
+
+    def _release(self):
+        if not self.is_leader:
+            return
+
+        self.is_leader = False
+        if self._fd is not None:
+            try:
+                os.ftruncate(self._fd, 0)
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+
+        logger.info(f"Process {os.getpid()} released {self.name} leadership")
+        if self._on_demoted:
+            self._on_demoted()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Describe the current leader as seen from this process"""
+        status = {
+            "is_leader": self.is_leader,
+            "pid": os.getpid(),
+            "leader_pid": None,
+            "leader_heartbeat": None,
+            "leader_alive": False
+        }
+
+        try:
+            with open(self.lock_path, "r") as f:
+                record = json.loads(f.read() or "{}")
+        except (OSError, ValueError):
+            record = {}
+
+        if record:
+            heartbeat = record.get("heartbeat", 0)
+            status["leader_pid"] = record.get("pid")
+            status["leader_heartbeat"] = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(heartbeat))
+            status["leader_alive"] = time.time() - heartbeat < self.retry_interval * 3
+
+        return status
+
+if __name__ == "__main__":
+    # Test leader election between two leases on the same lock file
+    import tempfile
+
+    print("=== Testing Leader Lease ===")
+
+    lock_path = os.path.join(tempfile.mkdtemp(), "test.lock")
+    first = LeaderLease("test", lock_path=lock_path, retry_interval=0.2)
+    second = LeaderLease("test", lock_path=lock_path, retry_interval=0.2)
+
+    first.start(on_elected=lambda: print("first elected"), on_demoted=lambda: print("first demoted"))
+    time.sleep(0.3)
+    second.start(on_elected=lambda: print("second elected"))
+    time.sleep(0.5)
+    print(f"Leaders: first={first.is_leader}, second={second.is_leader}")
+
+    first.stop()
+    time.sleep(0.5)
+    print(f"After failover: first={first.is_leader}, second={second.is_leader}")
+    print(f"Status: {second.get_status()}")
+    second.stop()
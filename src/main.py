@@ -1,6 +1,9 @@
 import os
 import sys
+import threading
+import time
 from datetime import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -9,62 +12,126 @@ load_dotenv()
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory, request, jsonify
+from flask import Blueprint, Flask, Response, current_app, send_from_directory, request, jsonify, stream_with_context
 from flask_cors import CORS
 from src.models.user import db
 from src.routes.user import user_bp
+from src.routes.debug import debug_bp
 
 # Import our EB-1A system components
-from src.config import SystemConfig, create_default_user_profile, validate_config
+from src.config import create_default_user_profile, validate_config
 from src.opportunity_search import OpportunitySearcher
-from src.email_sender import EmailSender, MockEmailSender
-from src.scheduler import OpportunityScheduler, SchedulerManager
+from src.email_sender import MockEmailSender, create_email_sender
+from src.scheduler import SchedulerManager
 from src.email_templates import EmailPersonalizer, HTMLEmailGenerator
+from src.jobs import JobManager, format_sse
+from src.leader import LeaderLease
+from src.send_quota import get_send_quota
+from src.stats_series import GLOBAL_SERIES, get_stats_series
+from src.source_fetcher import get_source_fetcher
+from src.crawl_frontier import get_crawl_frontier
+from src import metrics
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT')
+# Lightweight per-process state; everything that touches the database,
+# starts threads or takes locks is deferred to bootstrap()
+eb1a_bp = Blueprint('eb1a', __name__)
+# Opens the state store (run state, outbox, send quota), so bootstrap() builds it
+scheduler_manager: SchedulerManager = None
+user_profile = create_default_user_profile()
+job_manager = JobManager()
+scheduler_lease = LeaderLease("scheduler")
 
-# Enable CORS for all routes
-CORS(app)
+_bootstrap_lock = threading.Lock()
+_bootstrapped_pid = None
 
-app.register_blueprint(user_bp, url_prefix='/api')
+def bootstrap(app: Flask):
+    """Run heavy startup work once per worker process.
 
-# Database configuration - support both local and production
-database_url = os.getenv('DATABASE_URL', f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}")
-if database_url.startswith('postgres://'):
-    database_url = database_url.replace('postgres://', 'postgresql://', 1)
+    Called from gunicorn's post_worker_init hook and, as a fallback, before
+    the first request. Keeping it out of import time means a preloading
+    master (``--preload``) never forks with live threads, open database
+    connections or a held scheduler lease.
+    """
+    global _bootstrapped_pid, scheduler_manager
+    if _bootstrapped_pid == os.getpid():
+        return
 
-app.config['SQLALCHEMY_DATABASE_URI'] = database_url
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-with app.app_context():
-    db.create_all()
+    with _bootstrap_lock:
+        if _bootstrapped_pid == os.getpid():
+            return
 
-# Initialize EB-1A system components
-scheduler_manager = SchedulerManager()
-user_profile = create_default_user_profile()
+        # Force reload environment variables to ensure they're available
+        load_dotenv(override=True)
+
+        with app.app_context():
+            db.create_all()
+
+        scheduler_manager = SchedulerManager()
+
+        # Add default user scheduler (using real email if configured)
+        email_username = os.getenv('EMAIL_USERNAME')
+        email_password = os.getenv('EMAIL_PASSWORD')
+        smtp_server = os.getenv('SMTP_SERVER')
+
+        print(f"DEBUG: EMAIL_USERNAME={email_username}")
+        print(f"DEBUG: EMAIL_PASSWORD={'***' if email_password else 'None'}")
+        print(f"DEBUG: SMTP_SERVER={smtp_server}")
+
+        use_mock_email = not all([email_username, email_password, smtp_server])
+        print(f"DEBUG: use_mock_email={use_mock_email}")
+
+        default_scheduler = scheduler_manager.add_user_scheduler("default", user_profile, use_mock_email=use_mock_email)
+        # Start from the profile as last edited through any worker
+        scheduler_manager.sync_profiles()
+
+        # Only the worker holding the scheduler lease runs the default scheduler,
+        # so daily, urgent and maintenance tasks fire once however many workers run
+        def on_elected():
+            scheduler_manager.sync_profiles()
+            default_scheduler.start()
+            scheduler_manager.outbox_worker.start()
+            # The new leader sends whatever was missed while no leader was up
+            scheduler_manager.catch_up_missed_runs()
+
+        def on_demoted():
+            default_scheduler.stop()
+            scheduler_manager.outbox_worker.stop()
+
+        scheduler_lease.start(on_elected=on_elected, on_demoted=on_demoted)
+
+        _bootstrapped_pid = os.getpid()
+
+def create_app() -> Flask:
+    """Application factory: build and configure the Flask app without side effects"""
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT')
 
-# Force reload environment variables to ensure they're available
-load_dotenv(override=True)
+    # Enable CORS for all routes
+    CORS(app)
 
-# Add default user scheduler (using real email if configured)
-email_username = os.getenv('EMAIL_USERNAME')
-email_password = os.getenv('EMAIL_PASSWORD')
-smtp_server = os.getenv('SMTP_SERVER')
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(debug_bp, url_prefix='/api')
+    app.register_blueprint(eb1a_bp)
 
-print(f"DEBUG: EMAIL_USERNAME={email_username}")
-print(f"DEBUG: EMAIL_PASSWORD={'***' if email_password else 'None'}")
-print(f"DEBUG: SMTP_SERVER={smtp_server}")
+    # Database configuration - support both local and production
+    database_url = os.getenv('DATABASE_URL', f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}")
+    if database_url.startswith('postgres://'):
+        database_url = database_url.replace('postgres://', 'postgresql://', 1)
 
-use_mock_email = not all([email_username, email_password, smtp_server])
-print(f"DEBUG: use_mock_email={use_mock_email}")
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
 
-default_scheduler = scheduler_manager.add_user_scheduler("default", user_profile, use_mock_email=use_mock_email)
+    @app.before_request
+    def ensure_bootstrapped():
+        bootstrap(app)
 
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
+    return app
+
+@eb1a_bp.route('/', defaults={'path': ''})
+@eb1a_bp.route('/<path:path>')
 def serve(path):
-    static_folder_path = app.static_folder
+    static_folder_path = current_app.static_folder
     if static_folder_path is None:
             return "Static folder not configured", 404
 
@@ -79,7 +146,23 @@ def serve(path):
 
 # EB-1A API Routes
 
-@app.route('/api/opportunities', methods=['GET'])
+def serialize_opportunity(opp) -> dict:
+    """Convert an opportunity to its API representation"""
+    return {
+        "title": opp.title,
+        "type": opp.type.value,
+        "description": opp.description,
+        "deadline": opp.deadline,
+        "link": opp.link,
+        "prestige_rating": opp.prestige_rating,
+        "evidence_value": opp.evidence_value,
+        "time_investment": opp.time_investment,
+        "why_fits": opp.why_fits,
+        "keywords": opp.keywords,
+        "date_found": opp.date_found
+    }
+
+@eb1a_bp.route('/api/opportunities', methods=['GET'])
 def get_opportunities():
     """Get current opportunities for the user"""
     try:
@@ -88,21 +171,7 @@ def get_opportunities():
         filtered_opportunities = searcher.filter_opportunities(opportunities)
         
         # Convert opportunities to dict format
-        opportunities_data = []
-        for opp in filtered_opportunities:
-            opportunities_data.append({
-                "title": opp.title,
-                "type": opp.type.value,
-                "description": opp.description,
-                "deadline": opp.deadline,
-                "link": opp.link,
-                "prestige_rating": opp.prestige_rating,
-                "evidence_value": opp.evidence_value,
-                "time_investment": opp.time_investment,
-                "why_fits": opp.why_fits,
-                "keywords": opp.keywords,
-                "date_found": opp.date_found
-            })
+        opportunities_data = [serialize_opportunity(opp) for opp in filtered_opportunities]
         
         return jsonify({
             "opportunities": opportunities_data,
@@ -113,43 +182,63 @@ def get_opportunities():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/opportunities/refresh', methods=['POST'])
+def _run_refresh_job(progress):
+    """Background refresh: search, dedup and rank for the current profile"""
+    searcher = OpportunitySearcher(user_profile.__dict__)
+    filtered_opportunities = searcher.refresh_opportunities(progress=progress)
+    opportunities_data = [serialize_opportunity(opp) for opp in filtered_opportunities]
+
+    return {
+        "opportunities": opportunities_data,
+        "count": len(opportunities_data),
+        "last_updated": datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "message": "Opportunities refreshed successfully"
+    }
+
+@eb1a_bp.route('/api/opportunities/refresh', methods=['POST'])
 def refresh_opportunities():
-    """Force refresh of opportunities"""
+    """Start a background refresh of opportunities, or attach to the running one"""
     try:
-        # Force new search by creating fresh searcher
-        searcher = OpportunitySearcher(user_profile.__dict__)
-        opportunities = searcher.search_all_opportunities()
-        filtered_opportunities = searcher.filter_opportunities(opportunities)
-        
-        # Convert opportunities to dict format
-        opportunities_data = []
-        for opp in filtered_opportunities:
-            opportunities_data.append({
-                "title": opp.title,
-                "type": opp.type.value,
-                "description": opp.description,
-                "deadline": opp.deadline,
-                "link": opp.link,
-                "prestige_rating": opp.prestige_rating,
-                "evidence_value": opp.evidence_value,
-                "time_investment": opp.time_investment,
-                "why_fits": opp.why_fits,
-                "keywords": opp.keywords,
-                "date_found": opp.date_found
-            })
+        job, created = job_manager.submit("refresh", _run_refresh_job, dedup_key="refresh:default")
         
         return jsonify({
-            "opportunities": opportunities_data,
-            "count": len(opportunities_data),
-            "last_updated": datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "message": "Opportunities refreshed successfully"
-        })
+            "job_id": job.id,
+            "status": job.status.value,
+            "attached": not created,
+            "status_url": f"/api/jobs/{job.id}",
+            "events_url": f"/api/jobs/{job.id}/events"
+        }), 202, {'Location': f"/api/jobs/{job.id}"}
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/send-email', methods=['POST'])
+@eb1a_bp.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get the status and, once finished, the result of a background job"""
+    try:
+        job = job_manager.get(job_id)
+        if not job:
+            return jsonify({"error": "Job not found"}), 404
+        
+        return jsonify(job.to_dict())
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@eb1a_bp.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """Stream job progress as Server-Sent Events"""
+    if not job_manager.get(job_id):
+        return jsonify({"error": "Job not found"}), 404
+    
+    def generate():
+        for event, data in job_manager.iter_events(job_id):
+            yield format_sse(event, data)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@eb1a_bp.route('/api/send-email', methods=['POST'])
 def send_email():
     """Manually trigger email sending"""
     try:
@@ -157,13 +246,9 @@ def send_email():
         email_type = data.get('email_type', 'daily')
         user_email = data.get('user_email', user_profile.email)
         
-        # Update user profile email if provided
+        # Update user profile email if provided (stored so the leader picks it up too)
         if user_email and user_email != user_profile.email:
-            user_profile.email = user_email
-            # Update scheduler with new profile
-            scheduler = scheduler_manager.get_scheduler("default")
-            if scheduler:
-                scheduler.update_user_profile(user_profile)
+            scheduler_manager.save_user_profile("default", {"email": user_email})
         
         scheduler = scheduler_manager.get_scheduler("default")
         if not scheduler:
@@ -183,10 +268,12 @@ def send_email():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/user/profile', methods=['GET'])
+@eb1a_bp.route('/api/user/profile', methods=['GET'])
 def get_user_profile():
     """Get current user profile"""
     try:
+        # Edits may have been made through another worker
+        scheduler_manager.sync_profiles()
         return jsonify({
             "name": user_profile.name,
             "email": user_profile.email,
@@ -199,40 +286,49 @@ def get_user_profile():
             "notification_frequency": user_profile.notification_frequency.value,
             "email_format": user_profile.email_format.value,
             "max_opportunities_per_email": user_profile.max_opportunities_per_email,
-            "timezone": user_profile.timezone
+            "timezone": user_profile.timezone,
+            "send_time": user_profile.send_time
         })
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/user/profile', methods=['PUT'])
+@eb1a_bp.route('/api/user/profile', methods=['PUT'])
 def update_user_profile():
     """Update user profile"""
     try:
         data = request.get_json()
         
-        # Update profile fields
-        if 'name' in data:
-            user_profile.name = data['name']
-        if 'email' in data:
-            user_profile.email = data['email']
-        if 'notification_frequency' in data:
-            from src.config import NotificationFrequency
-            user_profile.notification_frequency = NotificationFrequency(data['notification_frequency'])
-        if 'max_opportunities_per_email' in data:
-            user_profile.max_opportunities_per_email = int(data['max_opportunities_per_email'])
-        
-        # Update scheduler with new profile
-        scheduler = scheduler_manager.get_scheduler("default")
-        if scheduler:
-            scheduler.update_user_profile(user_profile)
+        # Validate everything before touching the shared profile, so a bad
+        # value can't be saved and then break every later reschedule
+        updates = {}
+        try:
+            if 'name' in data:
+                updates['name'] = data['name']
+            if 'email' in data:
+                updates['email'] = data['email']
+            if 'notification_frequency' in data:
+                from src.config import NotificationFrequency
+                updates['notification_frequency'] = NotificationFrequency(data['notification_frequency'])
+            if 'max_opportunities_per_email' in data:
+                updates['max_opportunities_per_email'] = int(data['max_opportunities_per_email'])
+            if 'timezone' in data:
+                ZoneInfo(data['timezone'])
+                updates['timezone'] = data['timezone']
+            if 'send_time' in data:
+                updates['send_time'] = datetime.strptime(data['send_time'], "%H:%M").strftime("%H:%M")
+        except (ValueError, TypeError, ZoneInfoNotFoundError) as e:
+            return jsonify({"error": f"Invalid profile update: {str(e)}"}), 400
+        
+        # Store the edit for every worker; whichever one leads reschedules from it
+        scheduler_manager.save_user_profile("default", updates)
         
         return jsonify({"message": "Profile updated successfully"})
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/health', methods=['GET'])
+@eb1a_bp.route('/health', methods=['GET'])
 def health_check():
     """Simple health check for Railway and other platforms"""
     return jsonify({
@@ -241,7 +337,22 @@ def health_check():
         "version": "1.0.0"
     }), 200
 
-@app.route('/api/system/status', methods=['GET'])
+@eb1a_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus scrape endpoint, aggregated over every gunicorn worker"""
+    try:
+        # Outbox depth lives in the shared database, so read it at scrape time
+        outbox_stats = scheduler_manager.outbox.get_stats()
+        for status, count in outbox_stats.items():
+            if status != "oldest_pending_seconds":
+                metrics.OUTBOX_MESSAGES.labels(status).set(count)
+        
+        return Response(metrics.generate_latest(), content_type=metrics.CONTENT_TYPE)
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@eb1a_bp.route('/api/system/status', methods=['GET'])
 def get_system_status():
     """Get system status and statistics"""
     try:
@@ -252,6 +363,13 @@ def get_system_status():
         scheduler = scheduler_manager.get_scheduler("default")
         scheduler_stats = scheduler.get_stats() if scheduler else {}
         next_runs = scheduler.get_next_run_times() if scheduler else {}
+        lease_status = scheduler_lease.get_status()
+        
+        # Followers never run the scheduler themselves; report the leader's state
+        if scheduler_lease.is_leader:
+            scheduler_running = scheduler.is_running if scheduler else False
+        else:
+            scheduler_running = lease_status["leader_alive"]
         
         return jsonify({
             "system_status": "running",
@@ -262,10 +380,17 @@ def get_system_status():
                 "errors": config_validation.get("errors", [])
             },
             "scheduler": {
-                "running": scheduler.is_running if scheduler else False,
+                "running": scheduler_running,
                 "stats": scheduler_stats,
-                "next_runs": next_runs
+                "next_runs": next_runs,
+                "send_windows": scheduler_manager.get_send_window_stats(),
+                "daily_batch": scheduler_manager.get_batch_stats(),
+                "outbox": scheduler_manager.outbox.get_stats(),
+                "leader": lease_status
             },
+            "send_quota": get_send_quota().get_stats(),
+            "sources": get_source_fetcher().get_stats(),
+            "crawl_frontier": get_crawl_frontier().get_stats(),
             "version": "1.0.0",
             "last_updated": "2025-07-19"
         })
@@ -273,7 +398,32 @@ def get_system_status():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/test-email', methods=['POST'])
+@eb1a_bp.route('/api/stats/timeseries', methods=['GET'])
+def get_stats_timeseries():
+    """Counter history for a dashboard: ?series=<user id> (default: all users),
+    ?metrics=emails_sent,errors, and ?start/?end epoch seconds or ?hours=24,
+    bucketed per ?step seconds (chosen from the range when omitted)"""
+    try:
+        end = request.args.get('end', type=float) or time.time()
+        start = request.args.get('start', type=float)
+        if start is None:
+            start = end - 3600 * request.args.get('hours', 24, type=float)
+        if start >= end:
+            return jsonify({"error": "start must be before end"}), 400
+        
+        metric_names = [name for name in request.args.get('metrics', '').split(',') if name]
+        return jsonify(get_stats_series().query(
+            series=request.args.get('series', GLOBAL_SERIES),
+            metrics=metric_names or ["emails_sent", "errors", "opportunities_found"],
+            start=start,
+            end=end,
+            step=request.args.get('step', type=int)
+        ))
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@eb1a_bp.route('/api/test-email', methods=['POST'])
 def test_email():
     """Send a test email to verify configuration"""
     try:
@@ -292,7 +442,7 @@ def test_email():
         # Use real email sender if configured, otherwise mock
         if all([email_username, email_password, smtp_server]):
             print("DEBUG: Using real email sender")
-            sender = EmailSender()
+            sender = create_email_sender()
             success = sender.send_test_email(test_email)
             if success:
                 return jsonify({
@@ -320,7 +470,28 @@ def test_email():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/preview-email', methods=['GET'])
+@eb1a_bp.route('/api/mock-emails', methods=['GET'])
+def get_mock_emails():
+    """Page through the emails the default user's MockEmailSender recorded"""
+    try:
+        scheduler = scheduler_manager.get_scheduler("default")
+        if not scheduler:
+            return jsonify({"error": "Scheduler not found"}), 404
+        if not isinstance(scheduler.email_sender, MockEmailSender):
+            return jsonify({"error": "Mock email mode is not active"}), 404
+        
+        offset = max(0, request.args.get('offset', 0, type=int))
+        limit = min(max(1, request.args.get('limit', 20, type=int)), 200)
+        newest_first = request.args.get('order', 'newest') != 'oldest'
+        
+        page = scheduler.email_sender.sent_emails.page(offset, limit, newest_first)
+        page["order"] = "newest" if newest_first else "oldest"
+        return jsonify(page)
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@eb1a_bp.route('/api/preview-email', methods=['GET'])
 def preview_email():
     """Preview email content without sending"""
     try:
@@ -348,10 +519,21 @@ def preview_email():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/scheduler/start', methods=['POST'])
+def _scheduler_follower_response():
+    """Explain that the scheduler is owned by another worker process"""
+    lease = scheduler_lease.get_status()
+    return jsonify({
+        "error": "Scheduler runs in the leader worker",
+        "leader_pid": lease["leader_pid"]
+    }), 409
+
+@eb1a_bp.route('/api/scheduler/start', methods=['POST'])
 def start_scheduler():
     """Start the scheduler"""
     try:
+        if not scheduler_lease.is_leader:
+            return _scheduler_follower_response()
+        
         scheduler = scheduler_manager.get_scheduler("default")
         if scheduler:
             scheduler.start()
@@ -362,10 +544,13 @@ def start_scheduler():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/scheduler/stop', methods=['POST'])
+@eb1a_bp.route('/api/scheduler/stop', methods=['POST'])
 def stop_scheduler():
     """Stop the scheduler"""
     try:
+        if not scheduler_lease.is_leader:
+            return _scheduler_follower_response()
+        
         scheduler = scheduler_manager.get_scheduler("default")
         if scheduler:
             scheduler.stop()
@@ -376,8 +561,7 @@ def stop_scheduler():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-# Start the default scheduler when app starts
-default_scheduler.start()
+app = create_app()
 
 if __name__ == '__main__':
     print("=== EB-1A Opportunity System ===")
@@ -392,4 +576,5 @@ if __name__ == '__main__':
     print(f"Web interface available at: http://localhost:{port}")
     print(f"API documentation: http://localhost:{port}/api/system/status")
     
+    bootstrap(app)
     app.run(host='0.0.0.0', port=port, debug=debug)
@@ -0,0 +1,453 @@
+"""
+EB-1A Metrics Module
+Counters, gauges and fixed-bucket histograms exported in the Prometheus
+text format. Under gunicorn every worker writes its values to its own
+mmap'd file in METRICS_MULTIPROC_DIR and /metrics sums them, so any
+worker can answer a scrape for the whole app.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import logging
+from bisect import bisect_left
+from contextlib import contextmanager
+from glob import glob
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.config import SystemConfig
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+_HEADER = struct.Struct("<I4x")      # bytes used
+_KEY_LEN = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+_INITIAL_SIZE = 1 << 16
+
+class MmapedValues:
+    """Append-only key -> float64 table in a memory-mapped file.
+
+    Only the owning process writes to its file, so writes need no
+    cross-process locking; readers in other processes may see a value
+    mid-update at worst one scrape stale.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, "a+b")
+        if not exists:
+            self._file.truncate(_INITIAL_SIZE)
+        self._capacity = os.path.getsize(path)
+        self._map = mmap.mmap(self._file.fileno(), self._capacity)
+        self._used = _HEADER.unpack_from(self._map, 0)[0] if exists else _HEADER.size
+        if not exists:
+            _HEADER.pack_into(self._map, 0, self._used)
+        self._offsets: Dict[str, int] = {key: offset for key, _, offset in _read_entries(self._map, self._used)}
+
+    def _offset(self, key: str) -> int:
+        offset = self._offsets.get(key)
+        if offset is not None:
+            return offset
+
+        encoded = key.encode("utf-8")
+        padded = len(encoded) + (-(_KEY_LEN.size + len(encoded)) % 8)
+        entry_size = _KEY_LEN.size + padded + _VALUE.size
+        while self._used + entry_size > self._capacity:
+            self._grow()
+
+        start = self._used
+        _KEY_LEN.pack_into(self._map, start, len(encoded))
+        self._map[start + _KEY_LEN.size:start + _KEY_LEN.size + len(encoded)] = encoded
+        offset = start + _KEY_LEN.size + padded
+        _VALUE.pack_into(self._map, offset, 0.0)
+        self._used += entry_size
+        _HEADER.pack_into(self._map, 0, self._used)
+        self._offsets[key] = offset
+        return offset
+
+    def _grow(self):
+        self._map.close()
+        self._capacity *= 2
+        self._file.truncate(self._capacity)
+        self._map = mmap.mmap(self._file.fileno(), self._capacity)
+
+    def inc(self, key: str, amount: float):
+        offset = self._offset(key)
+        _VALUE.pack_into(self._map, offset, _VALUE.unpack_from(self._map, offset)[0] + amount)
+
+    def set(self, key: str, value: float):
+        _VALUE.pack_into(self._map, self._offset(key), value)
+
+    def items(self) -> Iterable[Tuple[str, float]]:
+        for key, value, _ in _read_entries(self._map, self._used):
+            yield key, value
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+def _read_entries(buffer, used: int):
+    position = _HEADER.size
+    while position < used:
+        length = _KEY_LEN.unpack_from(buffer, position)[0]
+        key = bytes(buffer[position + _KEY_LEN.size:position + _KEY_LEN.size + length]).decode("utf-8")
+        offset = position + _KEY_LEN.size + length + (-(_KEY_LEN.size + length) % 8)
+        yield key, _VALUE.unpack_from(buffer, offset)[0], offset
+        position = offset + _VALUE.size
+
+def read_values_file(path: str) -> List[Tuple[str, float]]:
+    """Every (key, value) in another process's file"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        return []
+    return [(key, value) for key, value, _ in _read_entries(data, _HEADER.unpack_from(data, 0)[0])]
+
+class _LocalValues:
+    """In-memory table with the MmapedValues interface (single-process mode)"""
+
+    def __init__(self):
+        self._values: Dict[str, float] = {}
+
+    def inc(self, key: str, amount: float):
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, key: str, value: float):
+        self._values[key] = value
+
+    def items(self):
+        return list(self._values.items())
+
+class _ValueStores:
+    """This process's value tables, one per file kind (counter, histogram, gauge_<mode>).
+
+    Values go to mmap'd files when METRICS_MULTIPROC_DIR is set, else to
+    memory. Tables are reopened after fork so workers never share a file.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._stores: Dict[str, object] = {}
+
+    def get(self, kind: str):
+        store = self._stores.get(kind)
+        if store is None:
+            with self.lock:
+                store = self._stores.get(kind)
+                if store is None:
+                    directory = multiprocess_dir()
+                    if directory and kind != "gauge_local":
+                        store = MmapedValues(os.path.join(directory, f"{kind}_{os.getpid()}.db"))
+                    else:
+                        store = _LocalValues()
+                    self._stores[kind] = store
+        return store
+
+    def reset_after_fork(self):
+        self.lock = threading.Lock()
+        self._stores = {}
+
+_stores = _ValueStores()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_stores.reset_after_fork)
+
+def multiprocess_dir() -> Optional[str]:
+    return SystemConfig.METRICS_MULTIPROC_DIR or None
+
+def _key(sample: str, labelnames: Sequence[str], labelvalues: Sequence[str]) -> str:
+    return json.dumps([sample, list(labelnames), list(labelvalues)])
+
+class _Metric:
+    kind = "untyped"
+    file_kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: "Registry" = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        (registry or REGISTRY).register(self)
+
+    def labels(self, *values, **kwvalues):
+        """The child for one label combination (created once, then cached)"""
+        if kwvalues:
+            values = tuple(kwvalues[name] for name in self.labelnames)
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children.setdefault(values, self._make_child(values))
+        return child
+
+    def _default(self):
+        return self.labels() if not self.labelnames else None
+
+    def _make_child(self, values):
+        raise NotImplementedError
+
+class _CounterChild:
+    def __init__(self, metric: "Counter", values):
+        self._key = _key(metric.name + "_total", metric.labelnames, values)
+
+    def inc(self, amount: float = 1.0):
+        store = _stores.get("counter")
+        with _stores.lock:
+            store.inc(self._key, amount)
+
+class Counter(_Metric):
+    """Monotonic count; exported as <name>_total"""
+    kind = "counter"
+    file_kind = "counter"
+
+    def _make_child(self, values):
+        return _CounterChild(self, values)
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+class _GaugeChild:
+    def __init__(self, metric: "Gauge", values):
+        self._key = _key(metric.name, metric.labelnames, values)
+        self._file_kind = metric.file_kind
+
+    def inc(self, amount: float = 1.0):
+        store = _stores.get(self._file_kind)
+        with _stores.lock:
+            store.inc(self._key, amount)
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def set(self, value: float):
+        store = _stores.get(self._file_kind)
+        with _stores.lock:
+            store.set(self._key, value)
+
+class Gauge(_Metric):
+    """Value that goes up and down.
+
+    ``multiprocess_mode`` says how workers' values combine: ``livesum``
+    (sum over live workers), ``max``, or ``local`` (kept in memory and
+    reported by whichever worker serves the scrape, for values read
+    from shared state at scrape time).
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 multiprocess_mode: str = "livesum", registry: "Registry" = None):
+        if multiprocess_mode not in ("livesum", "max", "local"):
+            raise ValueError(f"Unknown multiprocess_mode {multiprocess_mode}")
+        self.multiprocess_mode = multiprocess_mode
+        self.file_kind = f"gauge_{multiprocess_mode}"
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _make_child(self, values):
+        return _GaugeChild(self, values)
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default().dec(amount)
+
+class _HistogramChild:
+    def __init__(self, metric: "Histogram", values):
+        self._upper_bounds = metric.buckets
+        names = metric.labelnames + ("le",)
+        self._bucket_keys = [_key(metric.name + "_bucket", names, tuple(values) + (_format_bound(bound),))
+                             for bound in metric.buckets]
+        self._sum_key = _key(metric.name + "_sum", metric.labelnames, values)
+        self._count_key = _key(metric.name + "_count", metric.labelnames, values)
+
+    def observe(self, value: float):
+        # Buckets are stored non-cumulative; exposition accumulates them
+        bucket = self._bucket_keys[bisect_left(self._upper_bounds, value)]
+        store = _stores.get("histogram")
+        with _stores.lock:
+            store.inc(bucket, 1.0)
+            store.inc(self._sum_key, value)
+            store.inc(self._count_key, 1.0)
+
+    @contextmanager
+    def time(self):
+        """Observe the duration of the block in seconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+class Histogram(_Metric):
+    """Fixed-bucket distribution with _bucket, _sum and _count series"""
+    kind = "histogram"
+    file_kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: "Registry" = None):
+        buckets = tuple(sorted(float(bound) for bound in buckets))
+        if buckets[-1] != float("inf"):
+            buckets += (float("inf"),)
+        self.buckets = buckets
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _make_child(self, values):
+        return _HistogramChild(self, values)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(int(value)) if value == int(value) and abs(value) < 1e15 else repr(value)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+class Registry:
+    """The set of metrics exported at /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+
+    def _collect_values(self) -> Dict[str, Dict[str, float]]:
+        """{file_kind: {key: value}} for this process, or merged across all
+        workers' files in multiprocess mode"""
+        merged: Dict[str, Dict[str, float]] = {}
+        directory = multiprocess_dir()
+
+        if directory:
+            for path in glob(os.path.join(directory, "*.db")):
+                kind = os.path.basename(path).rsplit("_", 1)[0]
+                values = merged.setdefault(kind, {})
+                try:
+                    entries = read_values_file(path)
+                except OSError:
+                    continue  # the worker's file was removed while we read
+                for key, value in entries:
+                    if kind == "gauge_max":
+                        values[key] = max(values.get(key, value), value)
+                    else:
+                        values[key] = values.get(key, 0.0) + value
+            local_kinds = ("gauge_local",)
+        else:
+            local_kinds = ("counter", "histogram", "gauge_livesum", "gauge_max", "gauge_local")
+
+        stores = [(kind, _stores.get(kind)) for kind in local_kinds]
+        with _stores.lock:
+            for kind, store in stores:
+                merged.setdefault(kind, {}).update(store.items())
+        return merged
+
+    def generate_latest(self) -> str:
+        """The Prometheus text exposition (format 0.0.4)"""
+        values = self._collect_values()
+        lines = []
+
+        for metric in self._metrics.values():
+            samples = self._samples(metric, values.get(metric.file_kind, {}))
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample, labels, value in samples:
+                label_text = ",".join(f'{name}="{_escape(str(label))}"' for name, label in labels)
+                lines.append(f"{sample}{{{label_text}}} {_format_value(value)}" if label_text
+                             else f"{sample} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _samples(metric: _Metric, values: Dict[str, float]):
+        series: Dict[Tuple, List] = {}
+        for key, value in values.items():
+            sample, labelnames, labelvalues = json.loads(key)
+            if not sample.startswith(metric.name):
+                continue
+            if sample not in (metric.name, metric.name + "_total", metric.name + "_bucket",
+                              metric.name + "_sum", metric.name + "_count"):
+                continue
+            series.setdefault(sample, []).append((tuple(zip(labelnames, labelvalues)), value))
+
+        if not isinstance(metric, Histogram):
+            return [(sample, labels, value)
+                    for sample, entries in sorted(series.items())
+                    for labels, value in sorted(entries)]
+
+        # Accumulate the stored per-bucket counts into cumulative `le` buckets
+        samples = []
+        buckets: Dict[Tuple, Dict[str, float]] = {}
+        for labels, value in series.get(metric.name + "_bucket", []):
+            *base, (_, bound) = labels
+            buckets.setdefault(tuple(base), {})[bound] = value
+        for base, counts in sorted(buckets.items()):
+            cumulative = 0.0
+            for bound in metric.buckets:
+                cumulative += counts.get(_format_bound(bound), 0.0)
+                samples.append((metric.name + "_bucket", base + (("le", _format_bound(bound)),), cumulative))
+        for suffix in ("_sum", "_count"):
+            samples.extend((metric.name + suffix, labels, value)
+                           for labels, value in sorted(series.get(metric.name + suffix, [])))
+        return samples
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def generate_latest(registry: Registry = None) -> str:
+    return (registry or REGISTRY).generate_latest()
+
+def reset_multiprocess_dir(directory: str):
+    """Create the multiprocess directory and drop files from a previous run"""
+    os.makedirs(directory, exist_ok=True)
+    for path in glob(os.path.join(directory, "*.db")):
+        os.remove(path)
+
+def mark_process_dead(pid: int, directory: str = None):
+    """Drop a dead worker's live gauges; its counters and histograms stay in the totals"""
+    directory = directory or multiprocess_dir()
+    if not directory:
+        return
+    for kind in ("gauge_livesum",):
+        path = os.path.join(directory, f"{kind}_{pid}.db")
+        if os.path.exists(path):
+            os.remove(path)
+
+# Application metrics
+FETCH_SECONDS = Histogram("eb1a_fetch_seconds", "Time to fetch and parse one opportunity source",
+                          ["source"])
+DEDUP_TOTAL = Counter("eb1a_dedup_opportunities", "Opportunities seen by deduplication",
+                      ["result"])
+SOURCE_FETCH_TOTAL = Counter("eb1a_source_fetches", "Live source page fetches by outcome",
+                             ["result"])
+SCORING_SECONDS = Histogram("eb1a_scoring_seconds", "Time to score and rank opportunities for a user",
+                            buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5))
+RENDER_SECONDS = Histogram("eb1a_render_seconds", "Time to render one email part", ["part"],
+                           buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1))
+SMTP_SEND_SECONDS = Histogram("eb1a_smtp_send_seconds", "Time to hand one message to the SMTP server",
+                              ["transport", "result"])
+QUEUE_DEPTH = Gauge("eb1a_queue_depth", "Items waiting in a fan-out stage queue", ["queue"])
+OUTBOX_MESSAGES = Gauge("eb1a_outbox_messages", "Outbox messages by status", ["status"],
+                        multiprocess_mode="local")
@@ -0,0 +1,130 @@
+"""
+EB-1A MIME Builder Module
+Builds outgoing messages from pre-encoded MIME skeletons: the multipart
+body for a given content is encoded once and shared by every recipient
+who gets that content, and only the address headers are added per message
+"""
+
+import hashlib
+import re
+from functools import lru_cache
+from email.generator import BytesGenerator
+from email.message import Message
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.policy import compat32
+from email.utils import parseaddr
+from io import BytesIO
+from typing import List, Optional
+
+from src.config import SystemConfig
+from src.template_engine import FragmentCache
+
+_LEADING_DOT = re.compile(rb"(?m)^\.")
+
+# What smtplib's send_message flattens with, so the bytes on the wire are unchanged
+_POLICY = compat32.clone(linesep="\r\n")
+
+def content_hash(plain_content: Optional[str], html_content: Optional[str]) -> bytes:
+    """Digest identifying a message body"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (plain_content, html_content):
+        digest.update(b"\x01" if part is None else b"\x00" + part.encode("utf-8", "surrogatepass"))
+        digest.update(b"\xff")
+    return digest.digest()
+
+@lru_cache(maxsize=1024)
+def _encoded_header(name: str, value: str) -> bytes:
+    headers = Message()
+    headers[name] = value
+    with BytesIO() as buffer:
+        BytesGenerator(buffer, policy=_POLICY).flatten(headers)
+        # Drop the blank line that ends a header-only message
+        return buffer.getvalue()[:-2]
+
+def header_line(name: str, value: str) -> bytes:
+    """One encoded header line. Short ASCII values are written as is; anything
+    else goes through the email package (RFC 2047) and is cached, since the
+    subject is the same for a whole batch."""
+    if "\r" in value or "\n" in value:
+        raise ValueError(f"Line break in {name} header")
+    if value.isascii() and len(name) + len(value) < 76:
+        return f"{name}: {value}\r\n".encode("ascii")
+    return _encoded_header(name, value)
+
+class MIMESkeleton:
+    """The encoded MIME-Version/Content-Type headers and multipart body
+    for one content, in both SMTP forms (plain and dot-stuffed for DATA)"""
+
+    def __init__(self, plain_content: Optional[str], html_content: Optional[str]):
+        msg = MIMEMultipart('alternative')
+        if plain_content:
+            msg.attach(MIMEText(plain_content, 'plain'))
+        if html_content:
+            msg.attach(MIMEText(html_content, 'html'))
+
+        with BytesIO() as buffer:
+            BytesGenerator(buffer, policy=_POLICY).flatten(msg)
+            self.data = buffer.getvalue()
+        if not self.data.endswith(b"\r\n"):
+            self.data += b"\r\n"
+        self.stuffed = _LEADING_DOT.sub(b"..", self.data)
+
+class PreparedMessage:
+    """A message ready for SMTP: per-recipient headers plus a shared skeleton"""
+
+    def __init__(self, from_addr: str, to_email: str, subject: str, skeleton: MIMESkeleton):
+        self.from_addr = from_addr
+        self.to_email = to_email
+        self.envelope_from = parseaddr(from_addr)[1]
+        self.recipients = [parseaddr(to_email)[1]]
+        self.skeleton = skeleton
+
+        self.headers = (header_line('From', from_addr) + header_line('To', to_email)
+                        + header_line('Subject', subject))
+
+    def as_bytes(self) -> bytes:
+        return self.headers + self.skeleton.data
+
+    def as_data(self) -> bytes:
+        """The dot-stuffed DATA payload including the terminating dot"""
+        return self.headers + self.skeleton.stuffed + b".\r\n"
+
+class MessageBuilder:
+    """Turns (recipient, subject, plain, html) into PreparedMessages, encoding
+    each distinct body once.
+
+    Skeletons are cached by content hash, so recipients with identical
+    digests (same ranked list and profile fields) share one encoded body.
+    """
+
+    def __init__(self, cache_size: int = None):
+        self.skeletons = FragmentCache(SystemConfig.MIME_SKELETON_CACHE_SIZE
+                                       if cache_size is None else cache_size)
+
+    def build(self, from_addr: str, to_email: str, subject: str, plain_content: str = None,
+              html_content: str = None) -> PreparedMessage:
+        skeleton = self.skeletons.get_or_render(
+            content_hash(plain_content, html_content),
+            lambda: MIMESkeleton(plain_content, html_content)
+        )
+        return PreparedMessage(from_addr, to_email, subject, skeleton)
+
+    def build_many(self, from_addr: str, messages: List[dict]) -> List[PreparedMessage]:
+        """Prepare a batch of send_email keyword dicts"""
+        return [self.build(from_addr, message['to_email'], message['subject'],
+                           message.get('plain_content'), message.get('html_content'))
+                for message in messages]
+
+def smtp_send(smtp, msg):
+    """Send a PreparedMessage or an email.message.Message on an smtplib session"""
+    if isinstance(msg, PreparedMessage):
+        smtp.sendmail(msg.envelope_from, msg.recipients, msg.as_bytes())
+    else:
+        smtp.send_message(msg)
+
+_default_builder = MessageBuilder()
+
+def get_message_builder() -> MessageBuilder:
+    """The process-wide builder, so skeletons are shared by every sender"""
+    return _default_builder
@@ -3,14 +3,20 @@ EB-1A Opportunity Search Module
 Searches for opportunities across various sources and filters them based on user profile
 """
 
-import requests
 import re
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterable
 import json
 from dataclasses import dataclass
 from enum import Enum
 
+from src.config import SystemConfig
+from src.metrics import DEDUP_TOTAL, FETCH_SECONDS, SCORING_SECONDS
+from src.source_fetcher import FetchResult, SourceFetcher, get_source_fetcher
+from src.crawl_frontier import CrawlFrontier, get_crawl_frontier
+from src.tracing import current_span, traced
+
 class OpportunityType(Enum):
     SPEAKING = "speaking"
     JUDGING = "judging"
@@ -56,6 +62,7 @@ class OpportunitySearcher:
             
         return base_keywords
     
+    @traced("opportunities.search.call_for_papers")
     def search_call_for_papers(self) -> List[Opportunity]:
         """Search for call for papers opportunities"""
         opportunities = []
@@ -110,6 +117,7 @@ class OpportunitySearcher:
             
         return opportunities
     
+    @traced("opportunities.search.judging")
     def search_judging_opportunities(self) -> List[Opportunity]:
         """Search for judging opportunities"""
         opportunities = []
@@ -163,6 +171,7 @@ class OpportunitySearcher:
             
         return opportunities
     
+    @traced("opportunities.search.media")
     def search_media_opportunities(self) -> List[Opportunity]:
         """Search for media opportunities"""
         opportunities = []
@@ -216,6 +225,7 @@ class OpportunitySearcher:
             
         return opportunities
     
+    @traced("opportunities.search.awards")
     def search_award_opportunities(self) -> List[Opportunity]:
         """Search for award opportunities"""
         opportunities = []
@@ -262,6 +272,7 @@ class OpportunitySearcher:
             
         return opportunities
     
+    @traced("opportunities.search.networking")
     def search_networking_opportunities(self) -> List[Opportunity]:
         """Search for networking opportunities"""
         opportunities = []
@@ -308,20 +319,106 @@ class OpportunitySearcher:
             
         return opportunities
     
-    def search_all_opportunities(self) -> List[Opportunity]:
+    @traced("opportunities.search")
+    def search_all_opportunities(self, progress: Callable[..., None] = None) -> List[Opportunity]:
         """Search all types of opportunities"""
         all_opportunities = []
-        
-        all_opportunities.extend(self.search_call_for_papers())
-        all_opportunities.extend(self.search_judging_opportunities())
-        all_opportunities.extend(self.search_media_opportunities())
-        all_opportunities.extend(self.search_award_opportunities())
-        all_opportunities.extend(self.search_networking_opportunities())
-        
+        sources = [
+            ("call_for_papers", self.search_call_for_papers),
+            ("judging", self.search_judging_opportunities),
+            ("media", self.search_media_opportunities),
+            ("awards", self.search_award_opportunities),
+            ("networking", self.search_networking_opportunities)
+        ]
+
+        for done, (source_name, search) in enumerate(sources, 1):
+            with FETCH_SECONDS.labels(source_name).time():
+                found = search()
+            all_opportunities.extend(found)
+            if progress:
+                progress("fetched", source=source_name, found=len(found),
+                         sources_done=done, sources_total=len(sources))
+
+        if progress:
+            progress("parsed", opportunities=len(all_opportunities))
+
+        current_span().set_attribute("opportunities", len(all_opportunities))
         return all_opportunities
-    
+
+    @traced("opportunities.fetch_sources")
+    def fetch_source_pages(self, categories: Iterable[str] = None, budget: int = None,
+                           fetcher: SourceFetcher = None,
+                           frontier: CrawlFrontier = None) -> List[FetchResult]:
+        """Fetch the OPPORTUNITY_SOURCES pages (optionally only some categories).
+
+        With a ``budget`` (default SOURCE_FETCH_BUDGET; 0 fetches every
+        page) the crawl frontier picks the pages most worth re-fetching,
+        leaving out hosts whose circuit breaker is open. Hosts that are
+        open anyway come back as "skipped" without a request, so one sweep
+        costs at most SOURCE_SWEEP_DEADLINE_SECONDS. Every page fetched
+        updates its change history.
+        """
+        fetcher = fetcher or get_source_fetcher()
+        frontier = frontier or get_crawl_frontier()
+        budget = SystemConfig.SOURCE_FETCH_BUDGET if budget is None else budget
+
+        categories = set(categories) if categories else None
+        urls = [url for category, category_urls in SystemConfig.OPPORTUNITY_SOURCES.items()
+                if categories is None or category in categories
+                for url in category_urls]
+        frontier.add(urls)
+        candidates = len(urls)
+        if budget:
+            urls = frontier.select(budget, candidates=urls, available=fetcher.is_available)
+
+        results = fetcher.sweep(urls)
+        changed = 0
+        for result in results:
+            if result.status == "ok":
+                changed += bool(frontier.record(result.url, result.body or ""))
+
+        span = current_span()
+        span.set_attribute("sources", candidates)
+        span.set_attribute("sources.fetched", len(urls))
+        span.set_attribute("sources.changed", changed)
+        for status in ("ok", "http_error", "error", "skipped"):
+            span.set_attribute(f"sources.{status}", sum(1 for result in results if result.status == status))
+        return results
+
+    def deduplicate_opportunities(self, opportunities: List[Opportunity]) -> List[Opportunity]:
+        """Drop repeated listings of the same opportunity, keeping the first seen"""
+        seen = set()
+        unique = []
+
+        for opp in opportunities:
+            key = (opp.link.rstrip("/").lower(), opp.title.strip().lower())
+            if key not in seen:
+                seen.add(key)
+                unique.append(opp)
+
+        DEDUP_TOTAL.labels("unique").inc(len(unique))
+        DEDUP_TOTAL.labels("duplicate").inc(len(opportunities) - len(unique))
+        return unique
+
+    def refresh_opportunities(self, progress: Callable[..., None] = None,
+                              max_count: int = 10) -> List[Opportunity]:
+        """Run the full search → dedup → rank pipeline, reporting each stage"""
+        opportunities = self.search_all_opportunities(progress=progress)
+
+        unique = self.deduplicate_opportunities(opportunities)
+        if progress:
+            progress("deduped", unique=len(unique), duplicates=len(opportunities) - len(unique))
+
+        ranked = self.filter_opportunities(unique, max_count=max_count)
+        if progress:
+            progress("ranked", count=len(ranked))
+
+        return ranked
+
+    @traced("opportunities.rank")
     def filter_opportunities(self, opportunities: List[Opportunity], max_count: int = 10) -> List[Opportunity]:
         """Filter and rank opportunities based on user profile and criteria"""
+        started = time.perf_counter()
         
         # Score opportunities based on multiple factors
         scored_opportunities = []
@@ -351,7 +448,10 @@ class OpportunitySearcher:
         # Sort by score (descending) and return top opportunities
         scored_opportunities.sort(key=lambda x: x[0], reverse=True)
         
-        return [opp for score, opp in scored_opportunities[:max_count]]
+        ranked = [opp for score, opp in scored_opportunities[:max_count]]
+        SCORING_SECONDS.observe(time.perf_counter() - started)
+        current_span().set_attribute("candidates", len(opportunities))
+        return ranked
 
 def create_user_profile() -> Dict[str, Any]:
     """Create user profile based on the provided information"""
@@ -0,0 +1,418 @@
+"""
+EB-1A Outbox Module
+Durable queue of rendered emails between rendering and SMTP delivery:
+messages are written to SQLite first, then delivery workers claim, send
+and acknowledge them, retrying with backoff
+"""
+
+import json
+import os
+import random
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Tuple
+
+from src.config import SystemConfig
+from src.state_store import StateStore, get_state_store
+from src.async_smtp import is_transient
+from src.send_quota import QuotaExceeded
+from src.tracing import attach
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class OutboxStatus(Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    DEAD = "dead"
+
+OUTBOX_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        idempotency_key TEXT NOT NULL UNIQUE,
+        user_id TEXT NOT NULL,
+        email_type TEXT NOT NULL,
+        message TEXT NOT NULL,
+        meta TEXT NOT NULL DEFAULT '{}',
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL,
+        last_error TEXT,
+        claimed_by TEXT,
+        claimed_at REAL,
+        created_at REAL NOT NULL,
+        sent_at REAL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at)",
+]
+
+@dataclass
+class OutboxMessage:
+    """A claimed outbox row"""
+    id: int
+    idempotency_key: str
+    user_id: str
+    email_type: str
+    message: Dict[str, Any]
+    meta: Dict[str, Any]
+    attempts: int
+    claimed_by: str
+
+class Outbox:
+    """SQLite outbox shared by every worker process.
+
+    ``idempotency_key`` is unique, so enqueueing the same (user, day,
+    email type) twice (a catch-up racing a send window, a retried batch,
+    two leaders during a failover) keeps the first row only. Claiming
+    runs in a write transaction, so each row goes to exactly one
+    delivery worker. Rows stuck in ``sending`` by a worker that died are
+    reclaimed after OUTBOX_CLAIM_TIMEOUT_SECONDS; a live worker renews its
+    claim before each send, and every later state change only applies
+    while the row is still claimed by the same worker, so a reclaimed row
+    is never sent or updated by both.
+    """
+
+    def __init__(self, store: StateStore = None):
+        self.store = store or get_state_store()
+        self.store.ensure_schema("outbox", OUTBOX_SCHEMA)
+        self._wakeup = threading.Event()
+
+    @staticmethod
+    def make_key(user_id: str, email_type: str, day: str) -> str:
+        return f"{user_id}:{day}:{email_type}"
+
+    def enqueue(self, user_id: str, email_type: str, message: Dict[str, Any], day: str = None,
+                meta: Dict[str, Any] = None, key: str = None, now: float = None) -> Tuple[int, bool]:
+        """Add a rendered message (send_email keyword dict); returns (id, created)"""
+        now = time.time() if now is None else now
+        key = key or self.make_key(user_id, email_type, day or datetime.fromtimestamp(now).date().isoformat())
+
+        cursor = self.store.execute(
+            """
+            INSERT OR IGNORE INTO outbox
+                (idempotency_key, user_id, email_type, message, meta, status, next_attempt_at, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (key, user_id, email_type, json.dumps(message), json.dumps(meta or {}),
+             OutboxStatus.PENDING.value, now, now)
+        )
+        if cursor.rowcount:
+            self._wakeup.set()
+            return cursor.lastrowid, True
+
+        row = self.store.execute("SELECT id FROM outbox WHERE idempotency_key = ?", (key,)).fetchone()
+        return row["id"], False
+
+    def claim(self, worker_id: str, limit: int = 10, now: float = None) -> List[OutboxMessage]:
+        """Take up to ``limit`` due messages for this worker"""
+        now = time.time() if now is None else now
+        stale = now - SystemConfig.OUTBOX_CLAIM_TIMEOUT_SECONDS
+
+        with self.store.transaction(immediate=True) as conn:
+            rows = conn.execute(
+                """
+                SELECT * FROM outbox
+                WHERE (status = ? AND next_attempt_at <= ?) OR (status = ? AND claimed_at < ?)
+                ORDER BY next_attempt_at LIMIT ?
+                """,
+                (OutboxStatus.PENDING.value, now, OutboxStatus.SENDING.value, stale, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE outbox SET status = ?, claimed_by = ?, claimed_at = ? WHERE id = ?",
+                [(OutboxStatus.SENDING.value, worker_id, now, row["id"]) for row in rows]
+            )
+
+        return [OutboxMessage(id=row["id"], idempotency_key=row["idempotency_key"],
+                              user_id=row["user_id"], email_type=row["email_type"],
+                              message=json.loads(row["message"]), meta=json.loads(row["meta"]),
+                              attempts=row["attempts"], claimed_by=worker_id)
+                for row in rows]
+
+    def _update_claimed(self, message: OutboxMessage, assignments: str, params: Tuple) -> bool:
+        """Apply an UPDATE only while ``message`` is still claimed by its worker"""
+        cursor = self.store.execute(
+            f"UPDATE outbox SET {assignments} WHERE id = ? AND status = ? AND claimed_by = ?",
+            params + (message.id, OutboxStatus.SENDING.value, message.claimed_by)
+        )
+        if not cursor.rowcount:
+            logger.warning(f"Outbox message {message.idempotency_key} is no longer claimed by "
+                           f"{message.claimed_by}; leaving it to its new owner")
+            return False
+        return True
+
+    def renew(self, message: OutboxMessage, now: float = None) -> bool:
+        """Extend a claim right before sending; False if the claim was lost"""
+        return self._update_claimed(message, "claimed_at = ?", (time.time() if now is None else now,))
+
+    def ack(self, message: OutboxMessage, now: float = None) -> bool:
+        """Mark a message delivered"""
+        return self._update_claimed(
+            message, "status = ?, sent_at = ?, last_error = NULL",
+            (OutboxStatus.SENT.value, time.time() if now is None else now)
+        )
+
+    def fail(self, message: OutboxMessage, error: str, permanent: bool = False,
+             now: float = None) -> OutboxStatus:
+        """Record a failed attempt: back off and retry, or dead-letter it.
+
+        Returns SENDING if another worker has claimed the message since.
+        """
+        now = time.time() if now is None else now
+        attempts = message.attempts + 1
+
+        if permanent or attempts >= SystemConfig.OUTBOX_MAX_ATTEMPTS:
+            status, next_attempt_at = OutboxStatus.DEAD, now
+        else:
+            # Exponential backoff with jitter so a relay outage doesn't retry in lockstep
+            delay = min(SystemConfig.OUTBOX_BACKOFF_SECONDS * (2 ** (attempts - 1)),
+                        SystemConfig.OUTBOX_MAX_BACKOFF_SECONDS)
+            status, next_attempt_at = OutboxStatus.PENDING, now + delay * random.uniform(0.5, 1.5)
+
+        updated = self._update_claimed(
+            message,
+            "status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, claimed_by = NULL, claimed_at = NULL",
+            (status.value, attempts, next_attempt_at, error[:500])
+        )
+        return status if updated else OutboxStatus.SENDING
+
+    def defer(self, message: OutboxMessage, until: float) -> bool:
+        """Put a claimed message back untouched until ``until`` (no attempt is counted)"""
+        return self._update_claimed(
+            message, "status = ?, next_attempt_at = ?, claimed_by = NULL, claimed_at = NULL",
+            (OutboxStatus.PENDING.value, until)
+        )
+
+    def prune(self, now: float = None) -> int:
+        """Delete delivered messages past the retention period"""
+        now = time.time() if now is None else now
+        cursor = self.store.execute(
+            "DELETE FROM outbox WHERE status = ? AND sent_at < ?",
+            (OutboxStatus.SENT.value, now - SystemConfig.OUTBOX_RETENTION_DAYS * 86400)
+        )
+        return cursor.rowcount
+
+    def get_dead_letters(self, limit: int = 50) -> List[Dict[str, Any]]:
+        rows = self.store.execute(
+            """
+            SELECT id, idempotency_key, user_id, email_type, attempts, last_error, created_at
+            FROM outbox WHERE status = ? ORDER BY id DESC LIMIT ?
+            """,
+            (OutboxStatus.DEAD.value, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_stats(self, now: float = None) -> Dict[str, Any]:
+        now = time.time() if now is None else now
+        counts = {status.value: 0 for status in OutboxStatus}
+        for row in self.store.execute("SELECT status, COUNT(*) AS n FROM outbox GROUP BY status"):
+            counts[row["status"]] = row["n"]
+
+        oldest = self.store.execute(
+            "SELECT MIN(created_at) AS oldest FROM outbox WHERE status IN (?, ?)",
+            (OutboxStatus.PENDING.value, OutboxStatus.SENDING.value)
+        ).fetchone()["oldest"]
+        counts["oldest_pending_seconds"] = round(now - oldest, 1) if oldest else 0
+        return counts
+
+class OutboxWorker:
+    """Delivery threads that drain the outbox.
+
+    ``sender_for(user_id)`` returns the EmailSender to use for a message.
+    ``on_result(message, status)`` runs after each message is sent or
+    dead-lettered, which is where per-user stats are updated.
+    """
+
+    # Attempts at acknowledging a sent message, with exponential backoff
+    ACK_ATTEMPTS = 5
+    ACK_RETRY_SECONDS = 0.2
+
+    def __init__(self, outbox: Outbox, sender_for: Callable[[str], Any],
+                 on_result: Callable[[OutboxMessage, OutboxStatus], None] = None,
+                 workers: int = None, batch_size: int = None, poll_interval: float = 5.0):
+        self.outbox = outbox
+        self.sender_for = sender_for
+        self.on_result = on_result
+        self.workers = workers or SystemConfig.OUTBOX_WORKERS
+        self.batch_size = batch_size or SystemConfig.OUTBOX_BATCH_SIZE
+        self.poll_interval = poll_interval
+
+        self.is_running = False
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        if self.is_running:
+            return
+        self.is_running = True
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(target=self._run, args=(f"{os.getpid()}-{index}",),
+                             name=f"eb1a-outbox-{index}", daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Outbox worker started with {self.workers} threads")
+
+    def stop(self):
+        if not self.is_running:
+            return
+        self.is_running = False
+        self._stop_event.set()
+        self.outbox._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout=10)
+        self._threads = []
+        logger.info("Outbox worker stopped")
+
+    def _run(self, worker_id: str):
+        while not self._stop_event.is_set():
+            try:
+                batch = self.outbox.claim(worker_id, self.batch_size)
+            except Exception as e:
+                logger.error(f"Outbox claim failed: {str(e)}")
+                batch = []
+
+            if not batch:
+                self.outbox._wakeup.wait(self.poll_interval)
+                self.outbox._wakeup.clear()
+                continue
+
+            self.deliver_batch(batch)
+
+    def deliver(self, message: OutboxMessage) -> OutboxStatus:
+        """Send one claimed message and record the outcome.
+
+        Returns SENDING without sending if the claim expired while earlier
+        messages of the batch were being delivered and another worker took
+        the message over.
+        """
+        try:
+            if not self.outbox.renew(message):
+                return OutboxStatus.SENDING
+        except Exception as e:
+            logger.error(f"Outbox claim renewal failed: {str(e)}")
+            return OutboxStatus.SENDING
+
+        try:
+            # Continue the trace of the batch that queued the message, if any
+            with attach(message.meta.get("trace")):
+                self.sender_for(message.user_id).deliver_message(message.message)
+        except Exception as e:
+            return self._record(message, e)
+        return self._record(message, None)
+
+    def deliver_batch(self, batch: List[OutboxMessage]):
+        """Deliver a claimed batch.
+
+        Messages whose sender can pipeline (``deliver_messages``, the async
+        SMTP engine) go out together, one send_many per sending account, so
+        the engine keeps its connections busy with the whole batch rather
+        than one message per worker thread. Other senders get one message
+        at a time through deliver().
+        """
+        pipelined: Dict[str, Tuple[Any, List[OutboxMessage]]] = {}
+        for message in batch:
+            sender = None
+            try:
+                sender = self.sender_for(message.user_id)
+            except Exception as e:
+                logger.error(f"No sender for outbox message {message.idempotency_key}: {str(e)}")
+            if sender is not None and hasattr(sender, "deliver_messages"):
+                pipelined.setdefault(sender.account, (sender, []))[1].append(message)
+            else:
+                self._deliver_logged(message)
+
+        for sender, messages in pipelined.values():
+            try:
+                self._deliver_pipelined(sender, messages)
+            except Exception as e:
+                logger.error(f"Outbox batch delivery failed: {str(e)}")
+
+    def _deliver_pipelined(self, sender, messages: List[OutboxMessage]):
+        renewed = []
+        for message in messages:
+            try:
+                if self.outbox.renew(message):
+                    renewed.append(message)
+            except Exception as e:
+                logger.error(f"Outbox claim renewal failed: {str(e)}")
+        if not renewed:
+            return
+
+        errors = sender.deliver_messages([message.message for message in renewed])
+        for message, error in zip(renewed, errors):
+            try:
+                self._record(message, error)
+            except Exception as e:
+                logger.error(f"Outbox delivery of {message.idempotency_key} failed: {str(e)}")
+
+    def _record(self, message: OutboxMessage, error: Exception = None) -> OutboxStatus:
+        """Record the outcome of one send attempt (``error`` None when it went out)"""
+        if isinstance(error, QuotaExceeded):
+            if error.retry_at is None:
+                status = self.outbox.fail(message, str(error), permanent=True)
+                logger.error(f"Outbox message {message.idempotency_key} dropped: {str(error)}")
+            else:
+                # Paced by the account quota: wait for capacity without using up an attempt
+                self.outbox.defer(message, error.retry_at)
+                status = OutboxStatus.PENDING
+        elif error is not None:
+            status = self.outbox.fail(message, str(error), permanent=not is_transient(error))
+            level = logging.ERROR if status == OutboxStatus.DEAD else logging.WARNING
+            logger.log(level, f"Outbox message {message.idempotency_key} failed "
+                              f"(attempt {message.attempts + 1}, {status.value}): {str(error)}")
+        else:
+            # Sent either way; a lost claim here only means the row's state is the new owner's
+            self._ack_sent(message)
+            status = OutboxStatus.SENT
+
+        if self.on_result and status in (OutboxStatus.SENT, OutboxStatus.DEAD):
+            try:
+                self.on_result(message, status)
+            except Exception as e:
+                logger.error(f"Outbox result hook failed: {str(e)}")
+        return status
+
+    def _ack_sent(self, message: OutboxMessage):
+        """Acknowledge a message that has gone out, retrying transient database
+        errors: a sent message left claimed would be re-sent once the claim
+        expires"""
+        for attempt in range(self.ACK_ATTEMPTS):
+            try:
+                self.outbox.ack(message)
+                return
+            except Exception as e:
+                if attempt + 1 == self.ACK_ATTEMPTS:
+                    logger.error(f"Outbox message {message.idempotency_key} was sent but could not be "
+                                 f"acknowledged; it may be re-sent after the claim expires: {str(e)}")
+                    return
+                logger.warning(f"Outbox ack of {message.idempotency_key} failed, retrying: {str(e)}")
+                time.sleep(self.ACK_RETRY_SECONDS * (2 ** attempt))
+
+    def _deliver_logged(self, message: OutboxMessage):
+        """deliver() for the worker loops: a database error recording the
+        outcome is logged instead of ending the thread (the row stays
+        claimed and is retried after OUTBOX_CLAIM_TIMEOUT_SECONDS)"""
+        try:
+            self.deliver(message)
+        except Exception as e:
+            logger.error(f"Outbox delivery of {message.idempotency_key} failed: {str(e)}")
+
+    def drain(self, worker_id: str = "drain") -> int:
+        """Deliver everything currently due on the calling thread; returns messages handled"""
+        handled = 0
+        while True:
+            batch = self.outbox.claim(worker_id, self.batch_size)
+            if not batch:
+                return handled
+            self.deliver_batch(batch)
+            handled += len(batch)
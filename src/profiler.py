@@ -0,0 +1,192 @@
+"""
+EB-1A Profiler Module
+On-demand diagnostics for a live worker: a statistical stack sampler that
+returns collapsed stacks (flamegraph.pl / speedscope input) and a
+tracemalloc snapshot diff over a time window. Only one session may run at
+a time across all gunicorn workers.
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+try:
+    import fcntl
+except ImportError:  # Windows has no flock; sessions are then only exclusive per worker
+    fcntl = None
+
+from src.config import SystemConfig
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ProfilerBusy(Exception):
+    """Another profiling session is running in this or another worker"""
+
+_session_lock = threading.Lock()
+
+@contextmanager
+def profiling_session(lock_path: str = None):
+    """Hold the single profiling slot: a thread lock for this worker plus an
+    flock on a shared file for the other workers (the thread lock alone
+    where there is no fcntl). Raises ProfilerBusy instead of waiting."""
+    if not _session_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profiling session is already running in this worker")
+    try:
+        if fcntl is None:
+            yield
+            return
+        lock_path = lock_path or SystemConfig.PROFILER_LOCK_FILE
+        with open(lock_path, "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise ProfilerBusy("A profiling session is already running in another worker")
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    finally:
+        _session_lock.release()
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    # Shorten paths under the project and site-packages for readable flame graphs
+    for marker in (os.sep + "site-packages" + os.sep, os.sep + "src" + os.sep):
+        index = filename.rfind(marker)
+        if index >= 0:
+            filename = filename[index + 1:]
+            break
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+class StackSampler:
+    """Samples every thread's Python stack at a fixed interval.
+
+    A sampler thread reads sys._current_frames() rather than using a
+    SIGPROF timer: signal handlers only run on the main thread, while
+    requests and scheduled jobs run on worker threads. Overhead is one
+    stack walk per thread per interval and nothing between samples.
+    """
+
+    def __init__(self, interval: float = None):
+        self.interval = SystemConfig.PROFILER_INTERVAL_SECONDS if interval is None else interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[Any, str] = {}
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = _frame_label(code)
+        return label
+
+    def sample(self, ignore_thread: int = None):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == ignore_thread:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f"thread-{thread_id}"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def run(self, seconds: float):
+        """Sample on the calling thread for ``seconds``"""
+        me = threading.get_ident()
+        deadline = time.perf_counter() + seconds
+        next_sample = time.perf_counter()
+        while next_sample < deadline:
+            self.sample(ignore_thread=me)
+            next_sample += self.interval
+            delay = next_sample - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def collapsed(self) -> str:
+        """One ``frame;frame;frame count`` line per distinct stack, root first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+def profile_cpu(seconds: float, interval: float = None) -> StackSampler:
+    """Sample this worker for ``seconds`` (holding the profiling slot)"""
+    with profiling_session():
+        sampler = StackSampler(interval)
+        logger.info(f"Profiling worker {os.getpid()} for {seconds}s")
+        sampler.run(seconds)
+        return sampler
+
+def memory_diff(seconds: float, top: int = 25, frames: int = 1) -> Dict[str, Any]:
+    """Allocation growth by source line between two tracemalloc snapshots
+    taken ``seconds`` apart (holding the profiling slot).
+
+    tracing is switched on for the window only, unless it was already on.
+    """
+    with profiling_session():
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start(frames)
+        try:
+            ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+            before = tracemalloc.take_snapshot().filter_traces(ignore)
+            time.sleep(seconds)
+            after = tracemalloc.take_snapshot().filter_traces(ignore)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if started_here:
+                tracemalloc.stop()
+
+    stats = after.compare_to(before, "traceback" if frames > 1 else "lineno")
+    growth: List[Dict[str, Any]] = [{
+        "location": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+        "size_diff_bytes": stat.size_diff,
+        "size_bytes": stat.size,
+        "count_diff": stat.count_diff,
+        "count": stat.count
+    } for stat in stats[:top]]
+
+    return {
+        "pid": os.getpid(),
+        "seconds": seconds,
+        "total_diff_bytes": sum(stat.size_diff for stat in stats),
+        "traced_current_bytes": current,
+        "traced_peak_bytes": peak,
+        "tracing_started_for_window": started_here,
+        "top": growth
+    }
+
+if __name__ == "__main__":
+    # Profile a busy thread and print the hottest stacks
+    print("=== Testing Profiler ===")
+
+    def busy():
+        deadline = time.time() + 1.5
+        while time.time() < deadline:
+            sum(i * i for i in range(1000))
+
+    threading.Thread(target=busy, name="busy", daemon=True).start()
+    sampler = profile_cpu(1.0)
+    print(f"{sampler.samples} samples, {len(sampler.stacks)} distinct stacks")
+    for line in sampler.collapsed().splitlines()[:5]:
+        print(line)
+
+    try:
+        with profiling_session():
+            profile_cpu(0.1)
+    except ProfilerBusy as e:
+        print(f"\nConcurrent session rejected: {str(e)}")
+
+    leak = []
+    threading.Thread(target=lambda: [leak.append("x" * 1000) or time.sleep(0.001) for _ in range(500)],
+                     daemon=True).start()
+    print(memory_diff(1.0, top=3))
@@ -0,0 +1,86 @@
+import hmac
+from functools import wraps
+
+from flask import Blueprint, Response, jsonify, request
+
+from src.config import SystemConfig
+from src.profiler import ProfilerBusy, memory_diff, profile_cpu
+
+debug_bp = Blueprint('debug', __name__)
+
+def admin_required(view):
+    """Require the ADMIN_TOKEN as a Bearer token or X-Admin-Token header;
+    the endpoints do not exist at all when no token is configured"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not SystemConfig.ADMIN_TOKEN:
+            return jsonify({"error": "Not found"}), 404
+
+        supplied = request.headers.get('X-Admin-Token', '')
+        authorization = request.headers.get('Authorization', '')
+        if authorization.startswith('Bearer '):
+            supplied = authorization[len('Bearer '):]
+
+        if not hmac.compare_digest(supplied.encode(), SystemConfig.ADMIN_TOKEN.encode()):
+            return jsonify({"error": "Forbidden"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+def _seconds_arg(default: float):
+    """The ?seconds= value, or an error response if it is out of range"""
+    try:
+        seconds = float(request.args.get('seconds', default))
+    except ValueError:
+        return None, (jsonify({"error": "seconds must be a number"}), 400)
+    if not 0 < seconds <= SystemConfig.PROFILER_MAX_SECONDS:
+        return None, (jsonify({"error": f"seconds must be in (0, {SystemConfig.PROFILER_MAX_SECONDS}]"}), 400)
+    return seconds, None
+
+@debug_bp.route('/debug/profile', methods=['GET'])
+@admin_required
+def profile():
+    """Sample this worker's stacks for ?seconds=N and return collapsed stacks
+    (pipe into flamegraph.pl or load in speedscope); ?format=json for counts"""
+    seconds, error = _seconds_arg(10)
+    if error:
+        return error
+
+    try:
+        sampler = profile_cpu(seconds)
+    except ProfilerBusy as e:
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    if request.args.get('format') == 'json':
+        return jsonify({
+            "seconds": seconds,
+            "interval": sampler.interval,
+            "samples": sampler.samples,
+            "stacks": dict(sampler.stacks.most_common())
+        })
+
+    response = Response(sampler.collapsed(), mimetype='text/plain')
+    response.headers['X-Profile-Samples'] = str(sampler.samples)
+    return response
+
+@debug_bp.route('/debug/memory', methods=['GET'])
+@admin_required
+def memory():
+    """tracemalloc growth over ?seconds=N, largest first (?top=25, ?frames=1)"""
+    seconds, error = _seconds_arg(10)
+    if error:
+        return error
+
+    try:
+        top = min(max(int(request.args.get('top', 25)), 1), 500)
+        frames = min(max(int(request.args.get('frames', 1)), 1), 50)
+    except ValueError:
+        return jsonify({"error": "top and frames must be integers"}), 400
+
+    try:
+        return jsonify(memory_diff(seconds, top=top, frames=frames))
+    except ProfilerBusy as e:
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
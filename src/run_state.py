@@ -0,0 +1,128 @@
+"""
+EB-1A Run State Module
+Durable record of scheduled job runs and scheduler statistics, so a
+restarted process knows what it already sent and what it missed
+"""
+
+import json
+import time
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from src.state_store import StateStore, get_state_store
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RUN_STATE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS scheduled_runs (
+        owner TEXT NOT NULL,
+        job TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_success REAL,
+        last_attempt REAL,
+        last_error TEXT,
+        PRIMARY KEY (owner, job)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scheduler_user_stats (
+        user_id TEXT PRIMARY KEY,
+        stats TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_profiles (
+        user_id TEXT PRIMARY KEY,
+        profile TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+]
+
+class RunStateStore:
+    """Last successful run per (owner, job) and per-user stats in the state store.
+
+    ``created_at`` is set when a job is first registered, so a brand new
+    user is never "caught up" for fire times from before they existed.
+    """
+
+    def __init__(self, store: StateStore = None):
+        self.store = store or get_state_store()
+        self.store.ensure_schema("run_state", RUN_STATE_SCHEMA)
+
+    def register(self, owner: str, job: str, now: float = None):
+        """Start tracking a job; keeps the existing record if there is one"""
+        self.store.execute(
+            "INSERT OR IGNORE INTO scheduled_runs (owner, job, created_at) VALUES (?, ?, ?)",
+            (owner, job, time.time() if now is None else now)
+        )
+
+    def record_run(self, owner: str, job: str, success: bool, error: str = None,
+                   now: float = None):
+        """Record an attempt; only successful attempts move last_success"""
+        now = time.time() if now is None else now
+        self.store.execute(
+            """
+            INSERT INTO scheduled_runs (owner, job, created_at, last_success, last_attempt, last_error)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (owner, job) DO UPDATE SET
+                last_success = COALESCE(excluded.last_success, last_success),
+                last_attempt = excluded.last_attempt,
+                last_error = excluded.last_error
+            """,
+            (owner, job, now, now if success else None, now, error)
+        )
+
+    def get_run(self, owner: str, job: str) -> Optional[Dict[str, Any]]:
+        row = self.store.execute(
+            "SELECT * FROM scheduled_runs WHERE owner = ? AND job = ?", (owner, job)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def get_runs(self, job: str) -> Dict[str, Dict[str, Any]]:
+        """Every owner's record for a job, in one query"""
+        rows = self.store.execute("SELECT * FROM scheduled_runs WHERE job = ?", (job,)).fetchall()
+        return {row["owner"]: dict(row) for row in rows}
+
+    def save_stats(self, user_id: str, stats: Dict[str, Any]):
+        self.store.execute(
+            """
+            INSERT INTO scheduler_user_stats (user_id, stats, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT (user_id) DO UPDATE SET stats = excluded.stats, updated_at = excluded.updated_at
+            """,
+            (user_id, json.dumps(stats), time.time())
+        )
+
+    def save_profile(self, user_id: str, fields: Dict[str, Any]) -> float:
+        """Merge edited profile fields (JSON values) into the stored ones;
+        returns the new version (its update time)"""
+        with self.store.transaction(immediate=True) as conn:
+            row = conn.execute("SELECT profile, updated_at FROM user_profiles WHERE user_id = ?",
+                               (user_id,)).fetchone()
+            profile = json.loads(row["profile"]) if row else {}
+            profile.update(fields)
+            # Strictly increasing, so a quick second edit is never mistaken for the first
+            updated_at = max(time.time(), row["updated_at"] + 1e-6 if row else 0)
+            conn.execute(
+                """
+                INSERT INTO user_profiles (user_id, profile, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT (user_id) DO UPDATE SET profile = excluded.profile, updated_at = excluded.updated_at
+                """,
+                (user_id, json.dumps(profile), updated_at)
+            )
+        return updated_at
+
+    def load_profiles(self) -> Dict[str, Tuple[Dict[str, Any], float]]:
+        """Every stored profile edit as user_id -> (fields, version)"""
+        rows = self.store.execute("SELECT user_id, profile, updated_at FROM user_profiles").fetchall()
+        return {row["user_id"]: (json.loads(row["profile"]), row["updated_at"]) for row in rows}
+
+    def load_stats(self, user_id: str) -> Optional[Dict[str, Any]]:
+        row = self.store.execute(
+            "SELECT stats FROM scheduler_user_stats WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return json.loads(row["stats"]) if row else None
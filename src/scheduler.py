@@ -3,19 +3,25 @@ EB-1A Opportunity Scheduler Module
 Handles automated scheduling of daily emails and system tasks
 """
 
-import schedule
-import time
-import threading
 from datetime import datetime, timedelta
-from typing import Dict, Any, Callable, Optional
+from enum import Enum
+from functools import partial
+from typing import Dict, Any, Callable, List, Optional, Tuple
 import logging
-import json
 import os
 
-from src.config import SystemConfig, UserProfile, NotificationFrequency, create_default_user_profile
-from src.opportunity_search import OpportunitySearcher
-from src.email_sender import EmailSender, MockEmailSender
-from src.email_templates import EmailPersonalizer
+from src.config import SystemConfig, UserProfile, NotificationFrequency, EmailFormat, create_default_user_profile
+from src.opportunity_search import Opportunity, OpportunitySearcher
+from src.email_sender import MockEmailSender, create_email_sender
+from src.job_scheduler import (JobScheduler, Trigger, DailyTrigger, WeeklyTrigger, IntervalTrigger,
+                               OnceTrigger, resolve_timezone)
+from src.send_windows import SendWindowPlanner
+from src.fanout import FanoutExecutor
+from src.run_state import RunStateStore
+from src.outbox import Outbox, OutboxMessage, OutboxStatus, OutboxWorker
+from src.send_quota import get_send_quota
+from src.stats_series import StatsSeries, get_stats_series
+from src.tracing import span, span_context
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,8 +30,23 @@ logger = logging.getLogger(__name__)
 class OpportunityScheduler:
     """Handles scheduling of opportunity emails and system tasks"""
     
-    def __init__(self, user_profile: UserProfile = None, use_mock_email: bool = False):
+    def __init__(self, user_profile: UserProfile = None, use_mock_email: bool = False,
+                 user_id: str = "default", job_scheduler: JobScheduler = None,
+                 send_windows: SendWindowPlanner = None, run_state: RunStateStore = None,
+                 stats_series: StatsSeries = None):
         self.user_profile = user_profile or create_default_user_profile()
+        self.user_id = user_id
+        
+        # Jobs live in a scheduler shared by all users (see SchedulerManager);
+        # a standalone scheduler gets a private one
+        self._owns_job_scheduler = job_scheduler is None
+        self.job_scheduler = job_scheduler or JobScheduler()
+        # Daily sends are batched per send window when a manager provides one
+        self.send_windows = send_windows
+        # Last successful runs and stats survive restarts in the shared state store
+        self.run_state = run_state or RunStateStore()
+        # Minute-level history of the counters below, for trend queries
+        self.stats_series = stats_series or get_stats_series()
         
         print(f"DEBUG: use_mock_email={use_mock_email}")
         if use_mock_email:
@@ -33,11 +54,10 @@ class OpportunityScheduler:
             self.email_sender = MockEmailSender()
         else:
             print("DEBUG: Using EmailSender")
-            self.email_sender = EmailSender()
+            self.email_sender = create_email_sender()
         
         self.opportunity_searcher = OpportunitySearcher(self.user_profile.__dict__)
         self.is_running = False
-        self.scheduler_thread = None
         
         # Statistics tracking
         self.stats = {
@@ -47,29 +67,60 @@ class OpportunityScheduler:
             "errors": 0,
             "start_time": datetime.now().isoformat()
         }
+        saved_stats = self.run_state.load_stats(self.user_id)
+        if saved_stats:
+            saved_stats.pop("start_time", None)
+            self.stats.update(saved_stats)
         
         self._setup_schedule()
     
     def _setup_schedule(self):
         """Setup the scheduling based on user preferences"""
-        schedule.clear()  # Clear any existing schedules
+        # Replace only this user's jobs; other users' jobs are untouched
+        self.job_scheduler.remove_owner(self.user_id)
+        if self.send_windows:
+            self.send_windows.remove_user(self.user_id)
+        paused = not self.is_running
+        timezone = self.user_profile.timezone
+        send_time = self.user_profile.send_time
         
         if self.user_profile.notification_frequency == NotificationFrequency.DAILY:
-            # Schedule daily email at 8:00 AM user's timezone
-            schedule.every().day.at("08:00").do(self._send_daily_opportunities)
-            logger.info("Scheduled daily opportunities email at 8:00 AM")
+            # Schedule daily email at the send time in the user's timezone
+            if self.send_windows:
+                self.send_windows.add_user(self.user_id, timezone, send_time)
+            else:
+                self.job_scheduler.add_job(self.user_id, self._send_daily_opportunities,
+                                           DailyTrigger(send_time, tz=timezone), paused=paused)
+            logger.info(f"Scheduled daily opportunities email at {send_time} {timezone}")
             
         elif self.user_profile.notification_frequency == NotificationFrequency.WEEKLY:
-            # Schedule weekly email on Monday at 8:00 AM
-            schedule.every().monday.at("08:00").do(self._send_weekly_summary)
-            logger.info("Scheduled weekly summary email on Mondays at 8:00 AM")
+            # Schedule weekly email on Monday at the send time
+            self.job_scheduler.add_job(self.user_id, self._send_weekly_summary,
+                                       WeeklyTrigger(0, send_time, tz=timezone), paused=paused)
+            logger.info(f"Scheduled weekly summary email on Mondays at {send_time} {timezone}")
         
         # Schedule system maintenance tasks
-        schedule.every().day.at("02:00").do(self._daily_maintenance)
-        schedule.every().hour.do(self._check_urgent_opportunities)
+        self.job_scheduler.add_job(self.user_id, self._daily_maintenance,
+                                   DailyTrigger("02:00"), paused=paused)
+        self.job_scheduler.add_job(self.user_id, self._check_urgent_opportunities,
+                                   IntervalTrigger(3600), paused=paused)
+        
+        catch_up = self.get_catch_up_job()
+        if catch_up:
+            self.run_state.register(self.user_id, catch_up[0], now=self.job_scheduler.clock.now())
         
         logger.info(f"Scheduler configured for {self.user_profile.notification_frequency.value} notifications")
     
+    def get_catch_up_job(self) -> Optional[Tuple[str, Trigger]]:
+        """The (job name, trigger) whose missed runs are caught up after a restart"""
+        timezone = self.user_profile.timezone
+        send_time = self.user_profile.send_time
+        if self.user_profile.notification_frequency == NotificationFrequency.DAILY:
+            return "daily", DailyTrigger(send_time, tz=timezone)
+        if self.user_profile.notification_frequency == NotificationFrequency.WEEKLY:
+            return "weekly", WeeklyTrigger(0, send_time, tz=timezone)
+        return None
+    
     def _send_daily_opportunities(self):
         """Send daily opportunities email"""
         try:
@@ -78,10 +129,7 @@ class OpportunityScheduler:
             
             # Search for opportunities
             opportunities = self.opportunity_searcher.search_all_opportunities()
-            filtered_opportunities = self.opportunity_searcher.filter_opportunities(
-                opportunities, 
-                max_count=self.user_profile.max_opportunities_per_email
-            )
+            filtered_opportunities = self._rank_daily_opportunities(opportunities)
             
             if not filtered_opportunities:
                 logger.warning("No opportunities found for daily email")
@@ -92,20 +140,53 @@ class OpportunityScheduler:
                 self.user_profile, 
                 filtered_opportunities
             )
-            
-            if success:
-                self.stats["emails_sent"] += 1
-                self.stats["opportunities_found"] += len(filtered_opportunities)
-                self.stats["last_run"] = datetime.now().isoformat()
-                logger.info(f"Daily opportunities email sent successfully with {len(filtered_opportunities)} opportunities")
-            else:
-                self.stats["errors"] += 1
-                logger.error("Failed to send daily opportunities email")
+            self._record_daily_send(success, len(filtered_opportunities))
                 
         except Exception as e:
-            self.stats["errors"] += 1
+            self.increment_stat("errors")
             logger.error(f"Error in daily opportunities task: {str(e)}")
     
+    def local_day(self, timestamp: float) -> str:
+        """The user's local calendar date at a timestamp (ISO format)"""
+        return datetime.fromtimestamp(timestamp, resolve_timezone(self.user_profile.timezone)).date().isoformat()
+    
+    def _rank_daily_opportunities(self, opportunities: List[Opportunity]) -> List[Opportunity]:
+        """Pick this user's best opportunities for the daily email"""
+        return self.opportunity_searcher.filter_opportunities(
+            opportunities, 
+            max_count=self.user_profile.max_opportunities_per_email
+        )
+    
+    def increment_stat(self, name: str, value: int = 1):
+        """Bump a counter in ``stats`` and record it in the stats series"""
+        self.stats[name] += value
+        try:
+            self.stats_series.record(self.user_id, name, value, now=self.job_scheduler.clock.now())
+        except Exception as e:
+            logger.error(f"Failed to record {name} for {self.user_id}: {str(e)}")
+    
+    def _record_daily_send(self, success: bool, opportunity_count: int):
+        """Update statistics after a daily email attempt"""
+        if success:
+            self.increment_stat("emails_sent")
+            self.increment_stat("opportunities_found", opportunity_count)
+            self.stats["last_run"] = datetime.now().isoformat()
+            logger.info(f"Daily opportunities email sent successfully with {opportunity_count} opportunities")
+        else:
+            self.increment_stat("errors")
+            logger.error("Failed to send daily opportunities email")
+        self._record_run("daily", success)
+    
+    def _record_run(self, job: str, success: bool):
+        """Persist the run and the current stats so a restart picks them up"""
+        try:
+            self.run_state.record_run(self.user_id, job, success,
+                                      error=None if success else "send failed",
+                                      now=self.job_scheduler.clock.now())
+            self.run_state.save_stats(self.user_id, self.stats)
+        except Exception as e:
+            logger.error(f"Failed to record {job} run for {self.user_id}: {str(e)}")
+    
     def _send_weekly_summary(self):
         """Send weekly summary email"""
         try:
@@ -145,15 +226,16 @@ Your EB-1A Opportunity System
             )
             
             if success:
-                self.stats["emails_sent"] += 1
+                self.increment_stat("emails_sent")
                 self.stats["last_run"] = datetime.now().isoformat()
                 logger.info("Weekly summary email sent successfully")
             else:
-                self.stats["errors"] += 1
+                self.increment_stat("errors")
                 logger.error("Failed to send weekly summary email")
+            self._record_run("weekly", success)
                 
         except Exception as e:
-            self.stats["errors"] += 1
+            self.increment_stat("errors")
             logger.error(f"Error in weekly summary task: {str(e)}")
     
     def _check_urgent_opportunities(self):
@@ -184,10 +266,10 @@ Your EB-1A Opportunity System
                     )
                     
                     if success:
-                        self.stats["emails_sent"] += 1
+                        self.increment_stat("emails_sent")
                         logger.info("Urgent opportunity email sent")
                     else:
-                        self.stats["errors"] += 1
+                        self.increment_stat("errors")
                         logger.error("Failed to send urgent opportunity email")
             
         except Exception as e:
@@ -247,49 +329,34 @@ Your EB-1A Opportunity System
             return "Unknown"
     
     def _save_stats(self):
-        """Save statistics to file"""
+        """Save statistics to the state store and flush the stats series"""
         try:
-            stats_file = "scheduler_stats.json"
-            with open(stats_file, 'w') as f:
-                json.dump(self.stats, f, indent=2)
+            self.run_state.save_stats(self.user_id, self.stats)
+            self.stats_series.flush()
             logger.debug("Statistics saved")
             
         except Exception as e:
             logger.error(f"Failed to save statistics: {str(e)}")
     
     def start(self):
-        """Start the scheduler in a separate thread"""
+        """Start firing this user's scheduled jobs"""
         if self.is_running:
             logger.warning("Scheduler is already running")
             return
         
         self.is_running = True
-        self.scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
-        self.scheduler_thread.start()
+        self.job_scheduler.set_owner_paused(self.user_id, False)
+        self.job_scheduler.start()
         logger.info("Scheduler started")
     
     def stop(self):
-        """Stop the scheduler"""
+        """Stop firing this user's scheduled jobs"""
         self.is_running = False
-        if self.scheduler_thread:
-            self.scheduler_thread.join(timeout=5)
+        self.job_scheduler.set_owner_paused(self.user_id, True)
+        if self._owns_job_scheduler:
+            self.job_scheduler.stop()
         logger.info("Scheduler stopped")
     
-    def _run_scheduler(self):
-        """Main scheduler loop"""
-        logger.info("Scheduler loop started")
-        
-        while self.is_running:
-            try:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
-                
-            except Exception as e:
-                logger.error(f"Error in scheduler loop: {str(e)}")
-                time.sleep(60)  # Continue after error
-        
-        logger.info("Scheduler loop ended")
-    
     def run_now(self, task_name: str = "daily") -> bool:
         """Manually trigger a scheduled task"""
         try:
@@ -319,14 +386,11 @@ Your EB-1A Opportunity System
     
     def get_next_run_times(self) -> Dict[str, str]:
         """Get next scheduled run times"""
-        next_runs = {}
-        
-        for job in schedule.jobs:
-            job_name = job.job_func.__name__
-            next_run = job.next_run
-            if next_run:
-                next_runs[job_name] = next_run.strftime("%Y-%m-%d %H:%M:%S")
-        
+        next_runs = self.job_scheduler.get_next_run_times(self.user_id)
+        daily_fire = self.send_windows.next_fire(self.user_id) if self.send_windows else None
+        if daily_fire is not None:
+            next_runs["_send_daily_opportunities"] = datetime.fromtimestamp(daily_fire).strftime("%Y-%m-%d %H:%M:%S")
+            next_runs = dict(sorted(next_runs.items(), key=lambda item: item[1]))
         return next_runs
     
     def update_user_profile(self, new_profile: UserProfile):
@@ -339,22 +403,237 @@ Your EB-1A Opportunity System
 class SchedulerManager:
     """Manages multiple schedulers and provides a unified interface"""
     
-    def __init__(self):
+    CATCH_UP_OWNER = "catch-up"
+    OUTBOX_OWNER = "outbox"
+    PROFILES_OWNER = "profiles"
+    
+    def __init__(self, job_scheduler: JobScheduler = None, run_state: RunStateStore = None):
         self.schedulers: Dict[str, OpportunityScheduler] = {}
+        self.run_state = run_state or RunStateStore()
+        # One priority queue and timer thread for every user's jobs
+        self.job_scheduler = job_scheduler or JobScheduler()
+        # Daily emails fire as one batch per send window, not one job per user
+        self.send_windows = SendWindowPlanner(self.job_scheduler, self._run_daily_batch)
+        self.current_batch: Optional[FanoutExecutor] = None
+        self.last_batch_stats: Optional[Dict[str, Any]] = None
+        # Rendered daily emails go through the durable outbox; delivery workers
+        # run on the leader (see main.bootstrap)
+        self.outbox = Outbox(self.run_state.store)
+        self.outbox_worker = OutboxWorker(self.outbox, self._sender_for, on_result=self._on_outbox_result)
+        self._fallback_sender = None
+        self.job_scheduler.add_job(self.OUTBOX_OWNER, self.outbox.prune, DailyTrigger("03:00"),
+                                   name="prune")
+        self.job_scheduler.add_job(self.OUTBOX_OWNER, get_send_quota().prune, DailyTrigger("03:05"),
+                                   name="prune-quota")
+        # Profile edits can land on any worker; the leader applies them from the store
+        self._profile_versions: Dict[str, float] = {}
+        self.job_scheduler.add_job(self.PROFILES_OWNER, self.sync_profiles,
+                                   IntervalTrigger(SystemConfig.PROFILE_SYNC_SECONDS), name="sync")
     
     def add_user_scheduler(self, user_id: str, user_profile: UserProfile, 
                           use_mock_email: bool = False) -> OpportunityScheduler:
         """Add a scheduler for a specific user"""
-        scheduler = OpportunityScheduler(user_profile, use_mock_email)
+        if user_id in self.schedulers:
+            self.remove_user_scheduler(user_id)
+        
+        scheduler = OpportunityScheduler(user_profile, use_mock_email,
+                                         user_id=user_id, job_scheduler=self.job_scheduler,
+                                         send_windows=self.send_windows, run_state=self.run_state)
         self.schedulers[user_id] = scheduler
+        self._profile_versions.pop(user_id, None)
         return scheduler
     
+    def save_user_profile(self, user_id: str, fields: Dict[str, Any]):
+        """Store validated profile edits for every worker and apply them here"""
+        self.run_state.save_profile(user_id, {
+            field: value.value if isinstance(value, Enum) else value for field, value in fields.items()
+        })
+        self.sync_profiles()
+    
+    def sync_profiles(self) -> int:
+        """Apply stored profile edits newer than this process has seen,
+        rescheduling the affected users; returns how many were updated"""
+        updated = 0
+        for user_id, (fields, version) in self.run_state.load_profiles().items():
+            scheduler = self.schedulers.get(user_id)
+            if not scheduler or self._profile_versions.get(user_id, 0) >= version:
+                continue
+            profile = scheduler.user_profile
+            for field, value in fields.items():
+                if field == "notification_frequency":
+                    value = NotificationFrequency(value)
+                elif field == "email_format":
+                    value = EmailFormat(value)
+                setattr(profile, field, value)
+            scheduler.update_user_profile(profile)
+            self._profile_versions[user_id] = version
+            updated += 1
+        return updated
+    
     def remove_user_scheduler(self, user_id: str):
         """Remove a user's scheduler"""
         if user_id in self.schedulers:
             self.schedulers[user_id].stop()
+            self.job_scheduler.remove_owner(user_id)
+            self.send_windows.remove_user(user_id)
             del self.schedulers[user_id]
     
+    def _run_daily_batch(self, user_ids: List[str], fire_time: float):
+        """Send one send window's daily emails.
+
+        Opportunities are searched once for the window, then each user goes
+        through the rank -> render -> enqueue fan-out. Enqueueing writes the
+        rendered email to the outbox, so SMTP latency never holds up the
+        batch and a send that fails is retried instead of lost.
+        
+        The whole window is one trace: search, every user's rank and
+        render, and (through the outbox message) the eventual email.send.
+        """
+        schedulers = [self.schedulers[user_id] for user_id in user_ids
+                      if user_id in self.schedulers and self.schedulers[user_id].is_running]
+        if not schedulers:
+            return
+        
+        with span("daily.batch", users=len(schedulers)) as batch_span:
+            try:
+                opportunities = schedulers[0].opportunity_searcher.search_all_opportunities()
+            except Exception as e:
+                logger.error(f"Error searching opportunities for send window: {str(e)}")
+                batch_span.set_attribute("outcome", "search_failed")
+                return
+            
+            executor = FanoutExecutor([
+                ("rank", self._rank_stage, SystemConfig.FANOUT_RANK_WORKERS),
+                ("render", self._render_stage, SystemConfig.FANOUT_RENDER_WORKERS),
+                ("enqueue", partial(self._enqueue_stage, fire_time), SystemConfig.FANOUT_ENQUEUE_WORKERS)
+            ], queue_size=SystemConfig.FANOUT_QUEUE_SIZE, name="daily", on_error=self._fanout_error)
+            self.current_batch = executor
+            stats = executor.run((scheduler, opportunities) for scheduler in schedulers)
+            batch_span.set_attribute("queued", stats["completed"])
+        
+        stats["fire_time"] = datetime.fromtimestamp(fire_time).isoformat()
+        self.last_batch_stats = stats
+        logger.info(f"Daily batch queued {stats['completed']}/{stats['submitted']} emails "
+                    f"in {stats['elapsed_seconds']}s")
+    
+    @staticmethod
+    def _rank_stage(item):
+        scheduler, opportunities = item
+        ranked = scheduler._rank_daily_opportunities(opportunities)
+        if not ranked:
+            logger.warning(f"No opportunities found for {scheduler.user_id}'s daily email")
+            return None
+        return scheduler, ranked
+    
+    @staticmethod
+    def _render_stage(item):
+        scheduler, ranked = item
+        if not scheduler.email_sender.enabled:
+            scheduler._record_daily_send(False, 0)
+            return None
+        message = scheduler.email_sender.render_daily_opportunities_email(scheduler.user_profile, ranked)
+        return scheduler, len(ranked), message
+    
+    def _enqueue_stage(self, fire_time: float, item):
+        scheduler, opportunity_count, message = item
+        # One daily email per user per local day, however often the batch runs
+        _, created = self.outbox.enqueue(scheduler.user_id, "daily", message,
+                                         day=scheduler.local_day(fire_time),
+                                         meta={"opportunity_count": opportunity_count,
+                                               "trace": span_context()})
+        if not created:
+            logger.info(f"Daily email for {scheduler.user_id} already queued today")
+            return None
+        return scheduler.user_id
+    
+    def _sender_for(self, user_id: str):
+        """The sender used to deliver a user's outbox messages"""
+        scheduler = self.schedulers.get(user_id)
+        if scheduler:
+            return scheduler.email_sender
+        if self._fallback_sender is None:
+            self._fallback_sender = create_email_sender()
+        return self._fallback_sender
+    
+    def _on_outbox_result(self, message: OutboxMessage, status: OutboxStatus):
+        scheduler = self.schedulers.get(message.user_id)
+        if scheduler and message.email_type == "daily":
+            scheduler._record_daily_send(status == OutboxStatus.SENT,
+                                         message.meta.get("opportunity_count", 0))
+    
+    @staticmethod
+    def _fanout_error(item, error: Exception):
+        # Every stage's item starts with the user's scheduler
+        item[0].increment_stat("errors")
+    
+    def get_batch_stats(self) -> Optional[Dict[str, Any]]:
+        """Per-stage stats of the running daily batch, or of the last one"""
+        if self.current_batch and self.current_batch.finished_at is None:
+            return self.current_batch.get_stats()
+        return self.last_batch_stats
+    
+    def catch_up_missed_runs(self, now: float = None) -> Dict[str, int]:
+        """Queue sends for daily/weekly runs missed while no scheduler was up.
+
+        A user is behind when their latest fire time (within
+        CATCHUP_MAX_AGE_HOURS) is newer than both their last successful run
+        and their registration. Missed users are split into one-minute
+        slots of CATCHUP_RATE_PER_MINUTE and each slot is a one-shot job,
+        so even a restart after an outage that hit every user ramps up
+        gently instead of bursting.
+        """
+        now = self.job_scheduler.clock.now() if now is None else now
+        max_age = SystemConfig.CATCHUP_MAX_AGE_HOURS * 3600
+        runs = {job: self.run_state.get_runs(job) for job in ("daily", "weekly")}
+        
+        missed: List[Tuple[str, str, float]] = []
+        for user_id, scheduler in self.schedulers.items():
+            catch_up = scheduler.get_catch_up_job() if scheduler.is_running else None
+            if not catch_up:
+                continue
+            
+            job, trigger = catch_up
+            missed_fire = trigger.previous_fire(now)
+            if missed_fire is None or now - missed_fire > max_age:
+                continue
+            
+            record = runs[job].get(user_id) or {}
+            covered = max(record.get("last_success") or 0, record.get("created_at") or now)
+            if missed_fire > covered:
+                missed.append((user_id, job, missed_fire))
+        
+        self.job_scheduler.remove_owner(self.CATCH_UP_OWNER)
+        rate = max(1, SystemConfig.CATCHUP_RATE_PER_MINUTE)
+        for slot, start in enumerate(range(0, len(missed), rate)):
+            chunk = missed[start:start + rate]
+            self.job_scheduler.add_job(self.CATCH_UP_OWNER, partial(self._run_catch_up, chunk),
+                                       OnceTrigger(now + slot * 60), name=f"slot-{slot}", now=now - 1)
+        
+        counts = {"daily": 0, "weekly": 0}
+        for _, job, _ in missed:
+            counts[job] += 1
+        if missed:
+            logger.info(f"Catching up {len(missed)} missed runs at {rate}/min: {counts}")
+        return counts
+    
+    def _run_catch_up(self, chunk: List[Tuple[str, str, float]]):
+        """Send one slot of missed runs, skipping any that were sent meanwhile"""
+        daily_users: Dict[float, List[str]] = {}
+        for user_id, job, missed_fire in chunk:
+            scheduler = self.schedulers.get(user_id)
+            record = self.run_state.get_run(user_id, job) or {}
+            if not scheduler or (record.get("last_success") or 0) >= missed_fire:
+                continue
+            
+            if job == "daily":
+                daily_users.setdefault(missed_fire, []).append(user_id)
+            else:
+                scheduler._send_weekly_summary()
+        
+        # Batch per missed fire time so each user's outbox key is their own local day
+        for missed_fire, user_ids in daily_users.items():
+            self._run_daily_batch(user_ids, missed_fire)
+    
     def start_all(self):
         """Start all schedulers"""
         for scheduler in self.schedulers.values():
@@ -364,6 +643,8 @@ class SchedulerManager:
         """Stop all schedulers"""
         for scheduler in self.schedulers.values():
             scheduler.stop()
+        self.outbox_worker.stop()
+        self.job_scheduler.stop()
     
     def get_scheduler(self, user_id: str) -> Optional[OpportunityScheduler]:
         """Get a specific user's scheduler"""
@@ -373,6 +654,10 @@ class SchedulerManager:
         """Get statistics for all schedulers"""
         return {user_id: scheduler.get_stats() 
                 for user_id, scheduler in self.schedulers.items()}
+    
+    def get_send_window_stats(self) -> Dict[str, Any]:
+        """Get the planned send windows and upcoming batches"""
+        return self.send_windows.get_stats()
 
 if __name__ == "__main__":
     # Test the scheduler
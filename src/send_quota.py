@@ -0,0 +1,206 @@
+"""
+EB-1A Send Quota Module
+Daily send limits per recipient and per sending account, plus per-minute
+pacing, counted in the shared state store so every worker process sees
+the same totals
+"""
+
+import random
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from src.config import SystemConfig
+from src.state_store import StateStore, get_state_store
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SEND_QUOTA_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS send_counters (
+        scope TEXT NOT NULL,
+        key TEXT NOT NULL,
+        period TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        expires_at REAL NOT NULL,
+        PRIMARY KEY (scope, key, period)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_send_counters_expiry ON send_counters (expires_at)",
+]
+
+class QuotaExceeded(Exception):
+    """A send would go over a limit.
+
+    ``retry_at`` is when the limit frees up again; it is None for the
+    per-recipient cap, where waiting would only deliver a stale email.
+    """
+
+    def __init__(self, scope: str, key: str, limit: int, retry_at: Optional[float] = None):
+        super().__init__(f"{scope} quota of {limit} reached for {key}")
+        self.scope = scope
+        self.key = key
+        self.limit = limit
+        self.retry_at = retry_at
+
+class SendQuota:
+    """Counts sends per recipient and per account.
+
+    Three limits are checked together when a send is acquired:
+
+    * ``recipient``: MAX_EMAILS_PER_DAY emails to one address per UTC day
+    * ``account``: SMTP_ACCOUNT_DAILY_LIMIT emails from one SMTP account per
+      UTC day, the cap Gmail-style providers enforce
+    * ``account_minute``: SMTP_ACCOUNT_MAX_PER_MINUTE from one account per
+      minute, which spreads a send window's burst over the following minutes
+      instead of tripping the provider's rate limit
+
+    A send that fails after acquiring is released again, so only accepted
+    messages count.
+    """
+
+    def __init__(self, store: StateStore = None, recipient_limit: int = None,
+                 account_daily_limit: int = None, account_per_minute: int = None):
+        self.store = store or get_state_store()
+        self.store.ensure_schema("send_quota", SEND_QUOTA_SCHEMA)
+        self.recipient_limit = SystemConfig.MAX_EMAILS_PER_DAY if recipient_limit is None else recipient_limit
+        self.account_daily_limit = (SystemConfig.SMTP_ACCOUNT_DAILY_LIMIT
+                                    if account_daily_limit is None else account_daily_limit)
+        self.account_per_minute = (SystemConfig.SMTP_ACCOUNT_MAX_PER_MINUTE
+                                   if account_per_minute is None else account_per_minute)
+
+    @staticmethod
+    def _periods(now: float) -> Dict[str, Any]:
+        day = datetime.fromtimestamp(now, timezone.utc).date()
+        day_end = datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp() + 86400
+        minute = int(now // 60)
+        return {
+            "day": day.isoformat(),
+            "day_end": day_end,
+            "minute": str(minute),
+            "minute_end": (minute + 1) * 60.0
+        }
+
+    def _counters(self, recipient: str, account: str, now: float):
+        """(scope, key, period, limit, period_end) for every limit a send counts against"""
+        periods = self._periods(now)
+        return [
+            ("recipient", recipient.lower(), periods["day"], self.recipient_limit, periods["day_end"]),
+            ("account", account, periods["day"], self.account_daily_limit, periods["day_end"]),
+            ("account_minute", account, periods["minute"], self.account_per_minute, periods["minute_end"]),
+        ]
+
+    def acquire(self, recipient: str, account: str, now: float = None):
+        """Count one send, or raise QuotaExceeded without counting anything"""
+        now = time.time() if now is None else now
+        counters = self._counters(recipient, account, now)
+
+        with self.store.transaction(immediate=True) as conn:
+            for scope, key, period, limit, period_end in counters:
+                row = conn.execute(
+                    "SELECT count FROM send_counters WHERE scope = ? AND key = ? AND period = ?",
+                    (scope, key, period)
+                ).fetchone()
+                if row and row["count"] >= limit:
+                    if scope == "recipient":
+                        retry_at = None
+                    else:
+                        # Spread the deferred sends over the next period rather than
+                        # letting them all retry on the boundary
+                        spread = 60.0 if scope == "account_minute" else 3600.0
+                        retry_at = period_end + random.uniform(0, spread)
+                    raise QuotaExceeded(scope, key, limit, retry_at)
+
+            conn.executemany(
+                """
+                INSERT INTO send_counters (scope, key, period, count, expires_at) VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT (scope, key, period) DO UPDATE SET count = count + 1
+                """,
+                [(scope, key, period, period_end) for scope, key, period, _, period_end in counters]
+            )
+
+    def release(self, recipient: str, account: str, now: float = None):
+        """Give back a send acquired at ``now`` that was not delivered"""
+        now = time.time() if now is None else now
+        with self.store.transaction(immediate=True) as conn:
+            conn.executemany(
+                """
+                UPDATE send_counters SET count = MAX(count - 1, 0)
+                WHERE scope = ? AND key = ? AND period = ?
+                """,
+                [(scope, key, period) for scope, key, period, _, _ in self._counters(recipient, account, now)]
+            )
+
+    def remaining(self, account: str, now: float = None) -> Dict[str, int]:
+        """Sends left for an account today and this minute"""
+        now = time.time() if now is None else now
+        periods = self._periods(now)
+        counts = {
+            scope: row["count"] if row else 0
+            for scope, period in (("account", periods["day"]), ("account_minute", periods["minute"]))
+            for row in [self.store.execute(
+                "SELECT count FROM send_counters WHERE scope = ? AND key = ? AND period = ?",
+                (scope, account, period)
+            ).fetchone()]
+        }
+        return {
+            "today": max(self.account_daily_limit - counts["account"], 0),
+            "this_minute": max(self.account_per_minute - counts["account_minute"], 0)
+        }
+
+    def prune(self, now: float = None) -> int:
+        """Delete counters for periods that have ended"""
+        now = time.time() if now is None else now
+        cursor = self.store.execute("DELETE FROM send_counters WHERE expires_at <= ?", (now,))
+        return cursor.rowcount
+
+    def get_stats(self, now: float = None) -> Dict[str, Any]:
+        now = time.time() if now is None else now
+        day = self._periods(now)["day"]
+
+        accounts = {}
+        for row in self.store.execute(
+            "SELECT key, count FROM send_counters WHERE scope = 'account' AND period = ?", (day,)
+        ):
+            remaining = self.remaining(row["key"], now)
+            accounts[row["key"]] = {
+                "sent_today": row["count"],
+                "remaining_today": remaining["today"],
+                "remaining_this_minute": remaining["this_minute"]
+            }
+
+        recipients = self.store.execute(
+            """
+            SELECT COUNT(*) AS total, SUM(count >= ?) AS at_limit
+            FROM send_counters WHERE scope = 'recipient' AND period = ?
+            """,
+            (self.recipient_limit, day)
+        ).fetchone()
+
+        return {
+            "day": day,
+            "limits": {
+                "per_recipient_per_day": self.recipient_limit,
+                "per_account_per_day": self.account_daily_limit,
+                "per_account_per_minute": self.account_per_minute
+            },
+            "accounts": accounts,
+            "recipients_today": recipients["total"],
+            "recipients_at_limit": recipients["at_limit"] or 0
+        }
+
+_default_quota: Optional[SendQuota] = None
+_default_quota_lock = threading.Lock()
+
+def get_send_quota() -> SendQuota:
+    """Get the process-wide send quota"""
+    global _default_quota
+    if _default_quota is None:
+        with _default_quota_lock:
+            if _default_quota is None:
+                _default_quota = SendQuota()
+    return _default_quota
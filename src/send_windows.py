@@ -0,0 +1,198 @@
+"""
+EB-1A Send Window Module
+Groups users' daily emails into send windows so everyone whose local send
+time falls on the same instant is handled by a single batch job
+"""
+
+import threading
+import logging
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from src.job_scheduler import JobScheduler, DailyTrigger, OnceTrigger, resolve_timezone
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (IANA timezone name or "" for server local time, "HH:MM" local send time)
+Window = Tuple[str, str]
+
+class SendWindowPlanner:
+    """Plans daily sends as one scheduled batch per UTC instant.
+
+    Users are grouped into windows by (timezone, local send time). Each
+    window knows its next fire instant, and windows landing on the same
+    instant share a bucket that is a single one-shot job on the
+    JobScheduler. So 8:00 AM for every user becomes one batch per distinct
+    UTC offset instead of one job per user.
+
+    Buckets are keyed by the instant rather than by UTC offset because
+    zones that share an offset today can diverge after a DST change. When
+    a bucket fires each of its windows is re-planned from its own zone
+    rules, so users follow their local clock across DST transitions.
+    """
+
+    OWNER = "send-windows"
+
+    def __init__(self, job_scheduler: JobScheduler,
+                 batch_handler: Callable[[List[str], float], Any]):
+        self.job_scheduler = job_scheduler
+        self.batch_handler = batch_handler
+
+        self._windows: Dict[Window, Set[str]] = {}
+        self._user_window: Dict[str, Window] = {}
+        self._triggers: Dict[Window, DailyTrigger] = {}
+        self._window_fire: Dict[Window, float] = {}
+        self._buckets: Dict[float, Set[Window]] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def make_window(timezone: Optional[str], send_time: str) -> Window:
+        """Normalise a user's settings; unknown zones fall back to server time"""
+        tz_name = timezone if resolve_timezone(timezone) is not None else ""
+        return (tz_name, send_time)
+
+    def add_user(self, user_id: str, timezone: Optional[str], send_time: str = "08:00",
+                 now: float = None):
+        """Add (or move) a user to the window for their zone and send time"""
+        window = self.make_window(timezone, send_time)
+
+        with self._lock:
+            if self._user_window.get(user_id) == window:
+                return
+            self.remove_user(user_id)
+
+            self._user_window[user_id] = window
+            members = self._windows.setdefault(window, set())
+            members.add(user_id)
+            if len(members) == 1:
+                self._triggers[window] = DailyTrigger(send_time, tz=window[0] or None)
+                self._plan_window(window, self._now(now))
+
+    def remove_user(self, user_id: str):
+        """Drop a user; empty windows and buckets are unscheduled"""
+        with self._lock:
+            window = self._user_window.pop(user_id, None)
+            if window is None:
+                return
+
+            members = self._windows[window]
+            members.discard(user_id)
+            if members:
+                return
+
+            del self._windows[window]
+            del self._triggers[window]
+            fire = self._window_fire.pop(window, None)
+            bucket = self._buckets.get(fire)
+            if bucket is not None:
+                bucket.discard(window)
+                if not bucket:
+                    del self._buckets[fire]
+                    self.job_scheduler.remove_job(self._bucket_job_id(fire))
+
+    def next_fire(self, user_id: str) -> Optional[float]:
+        """Epoch time of a user's next daily send"""
+        with self._lock:
+            window = self._user_window.get(user_id)
+            return self._window_fire.get(window) if window else None
+
+    def _now(self, now: float = None) -> float:
+        return self.job_scheduler.clock.now() if now is None else now
+
+    def _bucket_name(self, fire: float) -> str:
+        return f"bucket-{fire:.0f}"
+
+    def _bucket_job_id(self, fire: float) -> str:
+        return self.job_scheduler.make_job_id(self.OWNER, self._bucket_name(fire))
+
+    def _plan_window(self, window: Window, after: float):
+        """Put a window in the bucket for its next fire instant"""
+        fire = self._triggers[window].next_fire(after)
+        self._window_fire[window] = fire
+
+        bucket = self._buckets.get(fire)
+        if bucket is None:
+            bucket = self._buckets[fire] = set()
+            self.job_scheduler.add_job(self.OWNER, partial(self._run_bucket, fire),
+                                       OnceTrigger(fire), name=self._bucket_name(fire),
+                                       now=after)
+        bucket.add(window)
+
+    def _run_bucket(self, fire: float):
+        """Re-plan the bucket's windows, then hand all their users to the batch handler"""
+        with self._lock:
+            windows = self._buckets.pop(fire, set())
+            user_ids = []
+            for window in windows:
+                user_ids.extend(self._windows.get(window, ()))
+                self._plan_window(window, fire)
+
+        if not user_ids:
+            return
+
+        logger.info(f"Send window {datetime.fromtimestamp(fire).isoformat()}: "
+                    f"{len(user_ids)} users in {len(windows)} windows")
+        self.batch_handler(sorted(user_ids), fire)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Describe the planned windows and the next few buckets"""
+        with self._lock:
+            upcoming = sorted(self._buckets.items())[:5]
+            return {
+                "users": len(self._user_window),
+                "windows": len(self._windows),
+                "buckets": len(self._buckets),
+                "upcoming": [
+                    {
+                        "fire_time": datetime.fromtimestamp(fire).strftime("%Y-%m-%d %H:%M:%S"),
+                        "windows": len(windows),
+                        "users": sum(len(self._windows[window]) for window in windows)
+                    }
+                    for fire, windows in upcoming
+                ]
+            }
+
+if __name__ == "__main__":
+    # Plan a spread of users across zones on a virtual clock and fire a day of buckets
+    import random
+    from zoneinfo import ZoneInfo
+    from src.job_scheduler import VirtualClock
+
+    print("=== Testing Send Window Planner ===")
+
+    zones = ["America/Chicago", "America/New_York", "America/Los_Angeles", "America/Mexico_City",
+             "Europe/London", "Europe/Berlin", "Asia/Kolkata", "Asia/Tokyo", "Australia/Sydney", "UTC"]
+    start = datetime(2026, 3, 7, 0, 0, tzinfo=ZoneInfo("UTC")).timestamp()
+    clock = VirtualClock(start)
+    job_scheduler = JobScheduler(max_workers=0, clock=clock)
+
+    sent = []
+    planner = SendWindowPlanner(job_scheduler, lambda users, fire: sent.append((fire, users)))
+
+    rng = random.Random(7)
+    users = {f"user{i}": rng.choice(zones) for i in range(10000)}
+    for user_id, zone in users.items():
+        planner.add_user(user_id, zone, "08:00")
+
+    stats = planner.get_stats()
+    print(f"{stats['users']} users -> {stats['windows']} windows, {stats['buckets']} buckets "
+          f"({job_scheduler.job_count()} scheduler jobs)")
+
+    # Run three days across the US spring-forward change (2026-03-08)
+    for _ in range(3 * 24):
+        job_scheduler.run_pending(clock.now())
+        clock.advance(3600)
+    job_scheduler.run_pending(clock.now())
+
+    wrong_local_time = 0
+    for fire, batch in sent:
+        for user_id in batch:
+            local = datetime.fromtimestamp(fire, ZoneInfo(users[user_id]))
+            wrong_local_time += local.strftime("%H:%M") != "08:00"
+
+    print(f"Batches fired: {len(sent)}, sends: {sum(len(batch) for _, batch in sent)} "
+          f"(expected {len(users) * 3})")
+    print(f"Sends not at 08:00 local time: {wrong_local_time}")
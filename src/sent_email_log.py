@@ -0,0 +1,217 @@
+"""
+EB-1A Sent Email Log Module
+Bounded record of the emails MockEmailSender "sent": the newest records
+stay in a fixed-size ring buffer and older ones are optionally spilled to
+a (gzip) JSONL file per process, so a long-running mock deployment keeps
+flat memory
+"""
+
+import atexit
+import glob
+import gzip
+import json
+import os
+import threading
+import logging
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.config import SystemConfig
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def spill_path_for(path: str, pid: int = None) -> str:
+    """The file one process spills to: ``sent.jsonl.gz`` becomes
+    ``sent.<pid>.jsonl.gz``, because gzip data buffered and flushed by
+    several gunicorn workers into one file would not be readable"""
+    directory, name = os.path.split(path)
+    stem, dot, suffix = name.partition(".")
+    return os.path.join(directory, f"{stem}.{os.getpid() if pid is None else pid}{dot}{suffix}")
+
+def spill_paths(path: str) -> List[str]:
+    """Every process's spill file for a configured MOCK_EMAIL_SPILL_FILE"""
+    directory, name = os.path.split(path)
+    stem, dot, suffix = name.partition(".")
+    return sorted(glob.glob(os.path.join(glob.escape(directory), f"{glob.escape(stem)}.[0-9]*{dot}{glob.escape(suffix)}")))
+
+class _SpillWriter:
+    """Appends JSON lines to one file; shared by every log in the process
+    spilling there so threads never interleave inside a gzip member"""
+
+    FLUSH_EVERY = 100
+
+    def __init__(self, path: str):
+        self.path = path
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._file = None
+        self._pending = 0
+        self.written = 0
+
+    def write(self, record: Dict[str, Any]):
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                opener = gzip.open if self.path.endswith(".gz") else open
+                self._file = opener(self.path, "at", encoding="utf-8")
+            self._file.write(line)
+            self.written += 1
+            self._pending += 1
+            if self._pending >= self.FLUSH_EVERY:
+                self._file.flush()
+                self._pending = 0
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                self._pending = 0
+
+_writers: Dict[str, _SpillWriter] = {}
+_writers_lock = threading.Lock()
+
+def _get_writer(path: str) -> _SpillWriter:
+    """This process's writer for a configured spill path (a forked child
+    gets a new file rather than its parent's)"""
+    path = spill_path_for(path)
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            writer = _writers[path] = _SpillWriter(path)
+        return writer
+
+@atexit.register
+def close_spill_files():
+    """Finish this process's spill files (writes the gzip trailer); a forked
+    child leaves the files it inherited to its parent"""
+    with _writers_lock:
+        writers = [writer for writer in _writers.values() if writer.pid == os.getpid()]
+    for writer in writers:
+        writer.close()
+
+def read_spill(path: str) -> Iterator[Dict[str, Any]]:
+    """Records from a spill file, tolerating a gzip stream that is still
+    being written (no trailer yet)"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                if line.endswith("\n"):
+                    yield json.loads(line)
+        except EOFError:
+            return
+
+class SentEmailLog:
+    """Ring buffer of sent-email records with O(1) append.
+
+    Every record gets a sequence number, so pages stay stable while new
+    mail arrives and a reader can tell how many records were evicted.
+    Evicted records go to this process's spill_path_for(``spill_path``)
+    when one is set (``.gz`` paths are gzip-compressed), otherwise they
+    are dropped.
+    """
+
+    def __init__(self, capacity: int = None, spill_path: str = None):
+        capacity = SystemConfig.MOCK_EMAIL_BUFFER_SIZE if capacity is None else capacity
+        self.capacity = max(1, capacity)
+        spill_path = SystemConfig.MOCK_EMAIL_SPILL_FILE if spill_path is None else spill_path
+        self._spill_path = spill_path or None
+        self._records: deque = deque()
+        self._lock = threading.Lock()
+        self.total = 0
+        self.evicted = 0
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Add a record; returns its sequence number"""
+        with self._lock:
+            self.total += 1
+            record["seq"] = self.total
+            evicted = None
+            if len(self._records) >= self.capacity:
+                evicted = self._records.popleft()
+                self.evicted += 1
+            self._records.append(record)
+
+        if evicted is not None and self._spill_path is not None:
+            try:
+                _get_writer(self._spill_path).write(evicted)
+            except Exception as e:
+                logger.error(f"Failed to spill sent email record: {str(e)}")
+        return record["seq"]
+
+    def page(self, offset: int = 0, limit: int = 50, newest_first: bool = False) -> Dict[str, Any]:
+        """One page of the buffered records plus where the buffer starts"""
+        with self._lock:
+            records = reversed(self._records) if newest_first else iter(self._records)
+            items = list(islice(records, max(0, offset), max(0, offset) + max(0, limit)))
+            buffered = len(self._records)
+        next_offset = offset + len(items)
+        return {
+            "items": items,
+            "offset": offset,
+            "limit": limit,
+            "buffered": buffered,
+            "total": self.total,
+            "evicted": self.evicted,
+            "next_offset": next_offset if next_offset < buffered else None
+        }
+
+    def records(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._records)
+
+    def last(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._records[-1] if self._records else None
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "buffered": len(self._records),
+            "total": self.total,
+            "evicted": self.evicted,
+            "spill_file": spill_path_for(self._spill_path) if self._spill_path else None
+        }
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self.records())
+
+if __name__ == "__main__":
+    # Append far more records than fit and check memory stays bounded
+    import os
+    import tempfile
+    import tracemalloc
+
+    print("=== Testing Sent Email Log ===")
+    path = os.path.join(tempfile.mkdtemp(), "sent.jsonl.gz")
+    log = SentEmailLog(capacity=100, spill_path=path)
+    body = "<html>" + "x" * 20000 + "</html>"
+
+    tracemalloc.start()
+    for i in range(5000):
+        log.append({"to": f"user{i}@example.com", "subject": "Daily", "html_content": body + str(i)})
+        if i == 999:
+            at_1k = tracemalloc.get_traced_memory()[0]
+    at_5k = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    close_spill_files()
+
+    print(f"memory after 1k: {at_1k / 1e6:.2f} MB, after 5k: {at_5k / 1e6:.2f} MB")
+    print(f"stats: {log.get_stats()}")
+    page = log.page(offset=0, limit=3, newest_first=True)
+    print(f"newest page seqs: {[r['seq'] for r in page['items']]}, next_offset={page['next_offset']}")
+    files = spill_paths(path)
+    spilled = sum(1 for spill_file in files for _ in read_spill(spill_file))
+    print(f"spilled {spilled} records to {files}, "
+          f"{sum(os.path.getsize(spill_file) for spill_file in files) / 1e3:.1f} KB on disk")
@@ -0,0 +1,234 @@
+"""
+EB-1A SMTP Pool Module
+Keeps a small set of authenticated SMTP sessions open so batch sends skip
+the TCP + STARTTLS + AUTH handshake for every message
+"""
+
+import smtplib
+import socket
+import ssl
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from email.message import Message
+from typing import Any, Dict, List, Optional
+
+from src.config import SystemConfig
+from src.mime_builder import smtp_send
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Errors after which a session is thrown away and the send retried on a fresh one
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, socket.timeout, ConnectionError, ssl.SSLError)
+
+class PooledConnection:
+    """An authenticated SMTP session plus its usage counters"""
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.messages_sent = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    def close(self):
+        try:
+            self.smtp.quit()
+        except Exception:
+            self.smtp.close()
+
+class SMTPConnectionPool:
+    """Bounded pool of persistent, authenticated SMTP sessions.
+
+    At most ``size`` sessions exist; callers block while all are in use.
+    A session idle for longer than ``health_check_seconds`` is probed with
+    NOOP before reuse. A session is retired after
+    ``max_messages_per_connection`` messages, and dropped and replaced if
+    the server answers 421 or the connection times out or resets. The
+    message is then retried once on a fresh session.
+    """
+
+    def __init__(self, host: str, port: int, username: str = None, password: str = None,
+                 size: int = None, max_messages_per_connection: int = None,
+                 health_check_seconds: float = None, timeout: float = None,
+                 use_tls: bool = True):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = max(1, size or SystemConfig.SMTP_POOL_SIZE)
+        self.max_messages_per_connection = (max_messages_per_connection
+                                            or SystemConfig.SMTP_MAX_MESSAGES_PER_CONNECTION)
+        self.health_check_seconds = (SystemConfig.SMTP_HEALTH_CHECK_SECONDS
+                                     if health_check_seconds is None else health_check_seconds)
+        self.timeout = timeout or SystemConfig.SMTP_TIMEOUT
+        self.use_tls = use_tls
+
+        self._idle: List[PooledConnection] = []
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self.stats = {
+            "connects": 0,
+            "reuses": 0,
+            "reconnects": 0,
+            "health_checks": 0,
+            "retired": 0,
+            "messages_sent": 0
+        }
+
+    def _connect(self) -> PooledConnection:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if self.use_tls:
+                smtp.starttls(context=ssl.create_default_context())
+                smtp.ehlo()
+            if self.username:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+
+        with self._cond:
+            self.stats["connects"] += 1
+        return PooledConnection(smtp)
+
+    def _is_healthy(self, conn: PooledConnection) -> bool:
+        if time.monotonic() - conn.last_used < self.health_check_seconds:
+            return True
+
+        with self._cond:
+            self.stats["health_checks"] += 1
+        try:
+            code, _ = conn.smtp.noop()
+            return code == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _checkout(self) -> PooledConnection:
+        """Take an idle session or open a new one, waiting while the pool is full"""
+        while True:
+            with self._cond:
+                while not self._idle and self._open >= self.size and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    raise RuntimeError("SMTP pool is closed")
+
+                if self._idle:
+                    conn = self._idle.pop()  # most recently used first keeps the rest idle
+                else:
+                    conn = None
+                    self._open += 1
+
+            if conn is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    self._discard(None)
+                    raise
+
+            if self._is_healthy(conn):
+                with self._cond:
+                    self.stats["reuses"] += 1
+                return conn
+
+            self._discard(conn)
+
+    def _checkin(self, conn: PooledConnection):
+        conn.last_used = time.monotonic()
+        if conn.messages_sent >= self.max_messages_per_connection:
+            with self._cond:
+                self.stats["retired"] += 1
+            self._discard(conn)
+            return
+
+        with self._cond:
+            if self._closed:
+                self._open -= 1
+                self._cond.notify()
+                conn.close()
+                return
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def _discard(self, conn: Optional[PooledConnection]):
+        """Close a session and free its slot"""
+        if conn is not None:
+            conn.close()
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a session; it is dropped instead of returned if the block fails"""
+        conn = self._checkout()
+        try:
+            yield conn
+        except BaseException:
+            self._discard(conn)
+            raise
+        else:
+            self._checkin(conn)
+
+    def send_message(self, msg, retries: int = 1):
+        """Send a Message or PreparedMessage on a pooled session, reconnecting on
+        421 or a dead session"""
+        attempt = 0
+        while True:
+            try:
+                with self.connection() as conn:
+                    smtp_send(conn.smtp, msg)
+                    conn.messages_sent += 1
+                with self._cond:
+                    self.stats["messages_sent"] += 1
+                return
+            except (smtplib.SMTPResponseException, *RECONNECT_ERRORS) as e:
+                reconnectable = (not isinstance(e, smtplib.SMTPResponseException)
+                                 or e.smtp_code == 421)
+                if not reconnectable or attempt >= retries:
+                    raise
+                attempt += 1
+                with self._cond:
+                    self.stats["reconnects"] += 1
+                logger.warning(f"SMTP session failed ({str(e)}); retrying on a new connection")
+
+    def close(self):
+        """Close every idle session; busy ones close when returned"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return dict(self.stats, open=self._open, idle=len(self._idle), size=self.size)
+
+_shared_pools: Dict[tuple, SMTPConnectionPool] = {}
+_shared_pools_lock = threading.Lock()
+
+def get_shared_pool(host: str, port: int, username: str = None, password: str = None,
+                    size: int = None, use_tls: bool = True) -> SMTPConnectionPool:
+    """Get the process-wide pool for an SMTP account, so every sender shares its sessions"""
+    key = (host, port, username, password, use_tls)
+    with _shared_pools_lock:
+        pool = _shared_pools.get(key)
+        if pool is None:
+            pool = _shared_pools[key] = SMTPConnectionPool(host, port, username, password,
+                                                          size=size, use_tls=use_tls)
+        return pool
+
+def close_shared_pools():
+    """Close every shared pool (on shutdown)"""
+    with _shared_pools_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,403 @@
+"""
+EB-1A Source Fetcher Module
+Fetches opportunity source pages with a circuit breaker and an adaptive
+timeout per host, so a sweep over hundreds of sources is bounded by the
+healthy hosts instead of waiting out the dead ones
+"""
+
+import json
+import random
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from src.config import SystemConfig
+from src.metrics import SOURCE_FETCH_TOTAL
+from src.state_store import StateStore, get_state_store
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class BreakerState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+SOURCE_HOSTS_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS source_hosts (
+        host TEXT PRIMARY KEY,
+        state TEXT NOT NULL,
+        failures INTEGER NOT NULL,
+        trips INTEGER NOT NULL,
+        open_until REAL NOT NULL,
+        latencies TEXT NOT NULL,
+        last_error TEXT,
+        updated_at REAL NOT NULL
+    )
+    """,
+]
+
+# Successful response times kept per host for the timeout estimate
+LATENCY_WINDOW = 20
+# Below this many samples a host gets the full SOURCE_FETCH_TIMEOUT
+MIN_LATENCY_SAMPLES = 5
+
+USER_AGENT = "EB1A-Opportunity-System/1.0 (+source sweep)"
+
+@dataclass
+class HostHealth:
+    """Breaker state and recent latencies of one host (scheme-less netloc)"""
+    host: str
+    state: BreakerState = BreakerState.CLOSED
+    failures: int = 0
+    trips: int = 0
+    open_until: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    last_error: Optional[str] = None
+    probing: bool = False
+    dirty: bool = False
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+@dataclass
+class FetchResult:
+    """Outcome of fetching one URL.
+
+    ``status`` is "ok", "http_error" (the host answered with a 4xx),
+    "error" (timeouts, connection failures and 5xx after retries) or
+    "skipped" (breaker open, probe already in flight, or sweep deadline).
+    """
+    url: str
+    host: str
+    status: str
+    http_status: Optional[int] = None
+    body: Optional[str] = None
+    elapsed: float = 0.0
+    attempts: int = 0
+    error: Optional[str] = None
+
+class _RetryableStatus(Exception):
+    """A response that says "try again later" (5xx, 429)"""
+
+class SourceFetcher:
+    """HTTP GETs guarded per host by a circuit breaker.
+
+    * closed: requests flow; SOURCE_BREAKER_FAILURES consecutive failed
+      attempts open the breaker
+    * open: requests are skipped without touching the network until the
+      cooldown ends; the cooldown doubles with every consecutive trip, up
+      to SOURCE_BREAKER_MAX_COOLDOWN_SECONDS, with jitter so hosts that
+      failed together are not probed together
+    * half-open: one probe request (no retries) is let through; success
+      closes the breaker, failure opens it again
+
+    The timeout for a host is SOURCE_TIMEOUT_MULTIPLIER times the p95 of
+    its recent successful fetches, clamped to [SOURCE_FETCH_MIN_TIMEOUT,
+    SOURCE_FETCH_TIMEOUT]. Transient failures are retried with full-jitter
+    exponential backoff. Host state is loaded from and saved to the state
+    store around every sweep, so it carries over between sweeps, processes
+    and restarts.
+    """
+
+    def __init__(self, store: StateStore = None, http_get: Callable[..., Any] = None):
+        self.store = store or get_state_store()
+        self.store.ensure_schema("source_hosts", SOURCE_HOSTS_SCHEMA)
+        self.http_get = http_get or requests.get
+        self.failure_threshold = SystemConfig.SOURCE_BREAKER_FAILURES
+        self.cooldown = SystemConfig.SOURCE_BREAKER_COOLDOWN_SECONDS
+        self.max_cooldown = SystemConfig.SOURCE_BREAKER_MAX_COOLDOWN_SECONDS
+        self.min_timeout = SystemConfig.SOURCE_FETCH_MIN_TIMEOUT
+        self.max_timeout = SystemConfig.SOURCE_FETCH_TIMEOUT
+        self.timeout_multiplier = SystemConfig.SOURCE_TIMEOUT_MULTIPLIER
+        self.retries = SystemConfig.SOURCE_FETCH_RETRIES
+        self.retry_backoff = SystemConfig.SOURCE_RETRY_BACKOFF_SECONDS
+
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, HostHealth] = {}
+        self.load()
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlsplit(url).netloc.lower()
+
+    def _health(self, host: str) -> HostHealth:
+        health = self._hosts.get(host)
+        if health is None:
+            health = self._hosts[host] = HostHealth(host)
+        return health
+
+    def timeout_for(self, health: HostHealth) -> float:
+        if len(health.latencies) < MIN_LATENCY_SAMPLES:
+            return self.max_timeout
+        p95 = health.latency_percentile(95)
+        return min(self.max_timeout, max(self.min_timeout, p95 * self.timeout_multiplier))
+
+    def is_available(self, url: str, now: float = None) -> bool:
+        """Whether fetch() would send a request for this URL right now"""
+        now = time.time() if now is None else now
+        with self._lock:
+            health = self._hosts.get(self.host_of(url))
+            if health is None or health.state == BreakerState.CLOSED:
+                return True
+            if health.state == BreakerState.OPEN:
+                return now >= health.open_until
+            return not health.probing
+
+    def _acquire(self, host: str, now: float) -> Optional[str]:
+        """"request" or "probe" if the host may be fetched now, else None"""
+        with self._lock:
+            health = self._health(host)
+            if health.state == BreakerState.CLOSED:
+                return "request"
+            if health.state == BreakerState.OPEN:
+                if now < health.open_until:
+                    return None
+                health.state = BreakerState.HALF_OPEN
+                health.dirty = True
+            if health.probing:
+                return None
+            health.probing = True
+            return "probe"
+
+    def _on_success(self, health: HostHealth, elapsed: float):
+        with self._lock:
+            health.latencies = (health.latencies + [round(elapsed, 4)])[-LATENCY_WINDOW:]
+            health.failures = 0
+            health.probing = False
+            if health.state != BreakerState.CLOSED:
+                logger.info(f"Circuit closed for {health.host}")
+            health.state = BreakerState.CLOSED
+            health.trips = 0
+            health.dirty = True
+
+    def _on_failure(self, health: HostHealth, error: str, now: float) -> bool:
+        """Count a failed attempt; returns True if it opened the breaker"""
+        with self._lock:
+            health.failures += 1
+            health.last_error = error
+            health.probing = False
+            health.dirty = True
+            if health.state == BreakerState.OPEN:
+                # A concurrent request already tripped it
+                return True
+            if health.state != BreakerState.HALF_OPEN and health.failures < self.failure_threshold:
+                return False
+
+            health.trips += 1
+            cooldown = min(self.max_cooldown, self.cooldown * (2 ** (health.trips - 1)))
+            health.state = BreakerState.OPEN
+            health.open_until = now + cooldown * random.uniform(0.8, 1.2)
+            logger.warning(f"Circuit opened for {health.host} for ~{cooldown:.0f}s "
+                           f"after {health.failures} failures: {error}")
+            return True
+
+    def fetch(self, url: str, deadline: float = None) -> FetchResult:
+        """GET one URL; ``deadline`` is a time.monotonic() value no attempt may run past"""
+        host = self.host_of(url)
+        mode = self._acquire(host, time.time())
+        if mode is None:
+            SOURCE_FETCH_TOTAL.labels("skipped").inc()
+            return FetchResult(url, host, "skipped", error="circuit open")
+
+        health = self._hosts[host]
+        attempts = 1 if mode == "probe" else 1 + self.retries
+        result = FetchResult(url, host, "skipped", error="sweep deadline reached")
+        try:
+            for attempt in range(attempts):
+                timeout = self.timeout_for(health)
+                if deadline is not None:
+                    timeout = min(timeout, deadline - time.monotonic())
+                    if timeout <= 0:
+                        break
+
+                started = time.perf_counter()
+                result.attempts = attempt + 1
+                try:
+                    response = self.http_get(url, timeout=timeout, headers={"User-Agent": USER_AGENT})
+                    result.elapsed = time.perf_counter() - started
+                    result.http_status = response.status_code
+                    if response.status_code >= 500 or response.status_code == 429:
+                        raise _RetryableStatus(f"HTTP {response.status_code}")
+                except (requests.RequestException, _RetryableStatus) as e:
+                    result.elapsed = time.perf_counter() - started
+                    result.status, result.error = "error", str(e)
+                    if self._on_failure(health, str(e), time.time()) or attempt == attempts - 1:
+                        break
+                    # Full jitter: sleep anywhere up to the exponential step
+                    delay = random.uniform(0, min(self.max_timeout, self.retry_backoff * (2 ** attempt)))
+                    if deadline is not None and time.monotonic() + delay >= deadline:
+                        break
+                    time.sleep(delay)
+                    continue
+
+                # Any non-5xx answer means the host itself is healthy
+                self._on_success(health, result.elapsed)
+                result.status = "ok" if response.status_code < 400 else "http_error"
+                result.body = response.text
+                result.error = None if result.status == "ok" else f"HTTP {response.status_code}"
+                break
+        finally:
+            if mode == "probe" and health.probing:
+                # Probe never ran (deadline); let a later sweep try again
+                with self._lock:
+                    health.probing = False
+
+        SOURCE_FETCH_TOTAL.labels(result.status).inc()
+        return result
+
+    def sweep(self, urls: Iterable[str], max_workers: int = None,
+              deadline_seconds: float = None) -> List[FetchResult]:
+        """Fetch many URLs concurrently; results are in input order.
+
+        Hosts with an open breaker return at once, and nothing starts or
+        retries past ``deadline_seconds`` (default SOURCE_SWEEP_DEADLINE_SECONDS).
+        """
+        urls = list(urls)
+        deadline_seconds = SystemConfig.SOURCE_SWEEP_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds
+        deadline = time.monotonic() + deadline_seconds
+        self.load()
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers or SystemConfig.SOURCE_FETCH_WORKERS,
+                                    thread_name_prefix="source-fetch") as pool:
+                return list(pool.map(lambda url: self.fetch(url, deadline), urls))
+        finally:
+            self.save()
+
+    def load(self):
+        """Refresh host state from the store (other processes' sweeps included)"""
+        try:
+            rows = self.store.execute("SELECT * FROM source_hosts").fetchall()
+        except Exception as e:
+            logger.error(f"Failed to load source host state: {str(e)}")
+            return
+
+        with self._lock:
+            for row in rows:
+                current = self._hosts.get(row["host"])
+                if current is not None and (current.dirty or current.probing):
+                    continue
+                self._hosts[row["host"]] = HostHealth(
+                    host=row["host"],
+                    state=BreakerState(row["state"]),
+                    failures=row["failures"],
+                    trips=row["trips"],
+                    open_until=row["open_until"],
+                    latencies=json.loads(row["latencies"]),
+                    last_error=row["last_error"]
+                )
+
+    def save(self):
+        """Write hosts whose state changed since the last save"""
+        with self._lock:
+            changed = [health for health in self._hosts.values() if health.dirty]
+            rows = [(h.host, h.state.value, h.failures, h.trips, h.open_until,
+                     json.dumps(h.latencies), h.last_error, time.time()) for h in changed]
+            for health in changed:
+                health.dirty = False
+        if not rows:
+            return
+
+        try:
+            self.store.connection().executemany(
+                """
+                INSERT INTO source_hosts (host, state, failures, trips, open_until, latencies, last_error, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (host) DO UPDATE SET
+                    state = excluded.state, failures = excluded.failures, trips = excluded.trips,
+                    open_until = excluded.open_until, latencies = excluded.latencies,
+                    last_error = excluded.last_error, updated_at = excluded.updated_at
+                """,
+                rows
+            )
+        except Exception as e:
+            with self._lock:
+                for health in changed:
+                    health.dirty = True
+            logger.error(f"Failed to save source host state: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hosts per breaker state, plus details of the ones not closed"""
+        now = time.time()
+        with self._lock:
+            hosts = list(self._hosts.values())
+            by_state = {state.value: 0 for state in BreakerState}
+            unhealthy = []
+            for health in hosts:
+                by_state[health.state.value] += 1
+                if health.state != BreakerState.CLOSED:
+                    unhealthy.append({
+                        "host": health.host,
+                        "state": health.state.value,
+                        "retry_in_seconds": max(0, round(health.open_until - now)),
+                        "trips": health.trips,
+                        "last_error": health.last_error
+                    })
+        return {"hosts": len(hosts), "by_state": by_state, "unhealthy": unhealthy}
+
+_default_fetcher: Optional[SourceFetcher] = None
+_default_fetcher_lock = threading.Lock()
+
+def get_source_fetcher() -> SourceFetcher:
+    """Get the process-wide source fetcher"""
+    global _default_fetcher
+    if _default_fetcher is None:
+        with _default_fetcher_lock:
+            if _default_fetcher is None:
+                _default_fetcher = SourceFetcher()
+    return _default_fetcher
+
+if __name__ == "__main__":
+    # Sweep a local server with fast, slow and failing "hosts" (one port each)
+    import os
+    import tempfile
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    def serve(delay: float, status: int) -> str:
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(delay)
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Length", "2")
+                    self.end_headers()
+                    self.wfile.write(b"ok")
+                except BrokenPipeError:
+                    pass  # the fetcher timed out first
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{server.server_address[1]}/"
+
+    print("=== Testing Source Fetcher ===")
+    urls = [serve(0.01, 200) for _ in range(6)] + [serve(3.0, 200), serve(0.01, 503)]
+    SystemConfig.SOURCE_FETCH_TIMEOUT = 1.0
+    SystemConfig.SOURCE_FETCH_MIN_TIMEOUT = 0.05
+    SystemConfig.SOURCE_RETRY_BACKOFF_SECONDS = 0.05
+    fetcher = SourceFetcher(StateStore(os.path.join(tempfile.mkdtemp(), "state.db")))
+
+    for sweep in range(1, 7):
+        started = time.perf_counter()
+        results = fetcher.sweep(urls)
+        summary = {}
+        for result in results:
+            summary[result.status] = summary.get(result.status, 0) + 1
+        print(f"sweep {sweep}: {time.perf_counter() - started:.2f}s {summary}")
+
+    print(f"fast host timeout: {fetcher.timeout_for(fetcher._hosts[fetcher.host_of(urls[0])]):.3f}s")
+    print(f"stats: {fetcher.get_stats()}")
@@ -0,0 +1,105 @@
+"""
+EB-1A State Store Module
+Shared SQLite store for runtime state that every worker process must see
+"""
+
+import os
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Iterable, Optional
+
+from src.config import SystemConfig
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class StateStore:
+    """Thin wrapper around a SQLite file shared by all gunicorn workers.
+
+    Each thread gets its own connection (sqlite3 connections must not be
+    shared across threads) and connections are reopened after a fork so a
+    preloaded master never hands its handles to the workers.
+    """
+
+    def __init__(self, path: str = None, busy_timeout: float = 30.0):
+        self.path = path or SystemConfig.STATE_DB_PATH
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schemas = set()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+    def connection(self) -> sqlite3.Connection:
+        """Get the connection for the current thread, opening it if needed"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and getattr(self._local, "pid", None) == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                               isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self, immediate: bool = False):
+        """Run a block inside a transaction.
+
+        ``immediate=True`` takes the write lock up front, which is what
+        read-then-write sequences (claim a row, check-then-insert) need to
+        stay race free across processes.
+        """
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def ensure_schema(self, name: str, statements: Iterable[str]):
+        """Create tables for a subsystem once per process"""
+        if name in self._schemas:
+            return
+
+        with self._schema_lock:
+            if name in self._schemas:
+                return
+            conn = self.connection()
+            for statement in statements:
+                conn.execute(statement)
+            self._schemas.add(name)
+            logger.debug(f"State schema ready: {name}")
+
+    def execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        """Execute a single statement outside an explicit transaction"""
+        return self.connection().execute(sql, params)
+
+    def close(self):
+        """Close the current thread's connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+_default_store: Optional[StateStore] = None
+_default_store_lock = threading.Lock()
+
+def get_state_store() -> StateStore:
+    """Get the process-wide state store"""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = StateStore()
+    return _default_store
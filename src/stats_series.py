@@ -0,0 +1,251 @@
+"""
+EB-1A Stats Series Module
+Minute-granularity counters (emails sent, errors, opportunities found) per
+user and for the whole system, kept in the shared state store and rolled up
+to hourly and daily buckets as they age, so throughput and error trends can
+be charted over any range
+"""
+
+import atexit
+import threading
+import time
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.config import SystemConfig
+from src.state_store import StateStore, get_state_store
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Series name under which every user's counters are also summed
+GLOBAL_SERIES = "__all__"
+
+# (table, bucket width in seconds), finest first
+RESOLUTIONS = [("stats_minute", 60), ("stats_hour", 3600), ("stats_day", 86400)]
+
+STATS_SERIES_SCHEMA = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+        series TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        value REAL NOT NULL,
+        PRIMARY KEY (series, metric, bucket)
+    ) WITHOUT ROWID
+    """
+    for table, _ in RESOLUTIONS
+] + [
+    # Rollups select by age across all series
+    f"CREATE INDEX IF NOT EXISTS idx_{table}_bucket ON {table} (bucket)"
+    for table, _ in RESOLUTIONS[:2]
+]
+
+MAX_POINTS = 2000
+
+class StatsSeries:
+    """Counter time series in three resolutions.
+
+    Increments are summed in memory per (series, metric, minute) and written
+    every STATS_FLUSH_SECONDS as additive upserts, so any number of workers
+    can record into the same buckets without coordination. Minute buckets
+    older than STATS_MINUTE_RETENTION_HOURS are folded into hour buckets and
+    hour buckets older than STATS_HOUR_RETENTION_DAYS into day buckets; day
+    buckets are kept. Rollups run once per hour of recorded time.
+    """
+
+    def __init__(self, store: StateStore = None, flush_seconds: float = None,
+                 minute_retention_hours: int = None, hour_retention_days: int = None):
+        self.store = store or get_state_store()
+        self.store.ensure_schema("stats_series", STATS_SERIES_SCHEMA)
+        self.flush_seconds = SystemConfig.STATS_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self.retention = {
+            "stats_minute": 3600 * (SystemConfig.STATS_MINUTE_RETENTION_HOURS
+                                    if minute_retention_hours is None else minute_retention_hours),
+            "stats_hour": 86400 * (SystemConfig.STATS_HOUR_RETENTION_DAYS
+                                   if hour_retention_days is None else hour_retention_days)
+        }
+
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str, int], float] = {}
+        self._last_flush = time.monotonic()
+        self._latest = 0.0
+        self._rolled_up_hour: Optional[int] = None
+
+    def record(self, series: str, metric: str, value: float = 1, now: float = None):
+        """Add ``value`` to a counter for ``series`` and for the global series"""
+        now = time.time() if now is None else now
+        bucket = int(now) // 60 * 60
+        with self._lock:
+            for name in (series, GLOBAL_SERIES) if series != GLOBAL_SERIES else (series,):
+                key = (name, metric, bucket)
+                self._pending[key] = self._pending.get(key, 0) + value
+            self._latest = max(self._latest, now)
+            due = time.monotonic() - self._last_flush >= self.flush_seconds
+
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write buffered increments, then roll up if a new hour has started"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            latest = self._latest
+
+        if pending:
+            try:
+                with self.store.transaction(immediate=True) as conn:
+                    conn.executemany(
+                        """
+                        INSERT INTO stats_minute (series, metric, bucket, value) VALUES (?, ?, ?, ?)
+                        ON CONFLICT (series, metric, bucket) DO UPDATE SET value = value + excluded.value
+                        """,
+                        [(series, metric, bucket, value) for (series, metric, bucket), value in pending.items()]
+                    )
+            except Exception as e:
+                # Keep the increments for the next flush rather than losing them
+                with self._lock:
+                    for key, value in pending.items():
+                        self._pending[key] = self._pending.get(key, 0) + value
+                logger.error(f"Failed to flush stats series: {str(e)}")
+                return
+
+        hour = int(latest) // 3600
+        if latest and hour != self._rolled_up_hour:
+            self._rolled_up_hour = hour
+            self.rollup(latest)
+
+    def rollup(self, now: float = None) -> Dict[str, int]:
+        """Fold aged buckets into the next coarser table; returns rows folded per table"""
+        now = time.time() if now is None else now
+        folded = {}
+        try:
+            with self.store.transaction(immediate=True) as conn:
+                for (table, _), (coarser, width) in zip(RESOLUTIONS, RESOLUTIONS[1:]):
+                    # Only whole coarse buckets, so a partly folded bucket never appears twice
+                    cutoff = int(now - self.retention[table]) // width * width
+                    conn.execute(
+                        f"""
+                        INSERT INTO {coarser} (series, metric, bucket, value)
+                        SELECT series, metric, bucket / {width} * {width}, SUM(value)
+                        FROM {table} WHERE bucket < ? GROUP BY 1, 2, 3
+                        ON CONFLICT (series, metric, bucket) DO UPDATE SET value = value + excluded.value
+                        """,
+                        (cutoff,)
+                    )
+                    folded[table] = conn.execute(f"DELETE FROM {table} WHERE bucket < ?", (cutoff,)).rowcount
+        except Exception as e:
+            logger.error(f"Failed to roll up stats series: {str(e)}")
+            return {}
+
+        if any(folded.values()):
+            logger.debug(f"Rolled up stats series: {folded}")
+        return folded
+
+    def query(self, series: str = GLOBAL_SERIES, metrics: Iterable[str] = None,
+              start: float = None, end: float = None, step: int = None) -> Dict[str, Any]:
+        """Counter sums per ``step`` seconds over [start, end).
+
+        Every resolution is read, so a range reaching back past the minute
+        retention still covers the rolled-up history (at hour or day
+        granularity there). ``step`` defaults to the finest width that keeps
+        the result under MAX_POINTS buckets per metric.
+        """
+        self.flush()
+        end = time.time() if end is None else end
+        start = end - 86400 if start is None else start
+        span = max(60, end - start)
+        minimum_step = -(-span // MAX_POINTS)
+        if step is None:
+            step = next((width for _, width in RESOLUTIONS if width >= minimum_step), 86400)
+            step = max(step, minimum_step)
+        step = -(-int(max(60, minimum_step, step)) // 60) * 60
+
+        first = int(start) // step * step
+        last = int(end)
+        metrics = list(metrics) if metrics else None
+        metric_filter = f"AND metric IN ({', '.join('?' * len(metrics))})" if metrics else ""
+        union = " UNION ALL ".join(
+            f"SELECT metric, bucket, value FROM {table} WHERE series = ? AND bucket >= ? AND bucket < ? {metric_filter}"
+            for table, _ in RESOLUTIONS
+        )
+        params: List[Any] = []
+        for _ in RESOLUTIONS:
+            params.extend([series, first, last] + (metrics or []))
+
+        rows = self.store.execute(
+            f"SELECT metric, (bucket - ?) / ? AS slot, SUM(value) AS value FROM ({union}) GROUP BY metric, slot",
+            tuple([first, step] + params)
+        ).fetchall()
+
+        slots = (last - first + step - 1) // step
+        points = {metric: [0] * slots for metric in (metrics or [])}
+        for row in rows:
+            points.setdefault(row["metric"], [0] * slots)[row["slot"]] = row["value"]
+
+        return {
+            "series": series,
+            "start": first,
+            "end": last,
+            "step": step,
+            "timestamps": [first + index * step for index in range(slots)],
+            "metrics": {metric: {"values": values, "total": sum(values)} for metric, values in points.items()}
+        }
+
+    def list_series(self) -> List[str]:
+        """Series names with any recorded data"""
+        self.flush()
+        union = " UNION ".join(f"SELECT DISTINCT series FROM {table}" for table, _ in RESOLUTIONS)
+        return [row["series"] for row in self.store.execute(f"SELECT series FROM ({union}) ORDER BY series")]
+
+_default_series: Optional[StatsSeries] = None
+_default_series_lock = threading.Lock()
+
+def get_stats_series() -> StatsSeries:
+    """Get the process-wide stats series"""
+    global _default_series
+    if _default_series is None:
+        with _default_series_lock:
+            if _default_series is None:
+                _default_series = StatsSeries()
+                atexit.register(_default_series.flush)
+    return _default_series
+
+if __name__ == "__main__":
+    # Record three days of synthetic traffic and query it back
+    import os
+    import random
+    import tempfile
+
+    print("=== Testing Stats Series ===")
+    store = StateStore(os.path.join(tempfile.mkdtemp(), "state.db"))
+    series = StatsSeries(store, flush_seconds=3600, minute_retention_hours=24, hour_retention_days=1)
+
+    rng = random.Random(1)
+    now = time.time()
+    started = now - 3 * 86400
+    for minute in range(3 * 1440):
+        ts = started + minute * 60
+        for user in ("alice", "bob"):
+            series.record(user, "emails_sent", rng.randint(0, 3), now=ts)
+            if rng.random() < 0.05:
+                series.record(user, "errors", now=ts)
+        if minute % 60 == 59:
+            series.flush()
+    series.flush()
+
+    for table, _ in RESOLUTIONS:
+        count = store.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        print(f"{table}: {count} rows")
+
+    query_started = time.perf_counter()
+    day = series.query("alice", ["emails_sent", "errors"], start=now - 86400, end=now)
+    week = series.query(GLOBAL_SERIES, ["emails_sent"], start=now - 7 * 86400, end=now)
+    print(f"queries took {(time.perf_counter() - query_started) * 1000:.1f} ms")
+    print(f"alice last 24h: step={day['step']}s, sent={day['metrics']['emails_sent']['total']}, "
+          f"errors={day['metrics']['errors']['total']}")
+    print(f"global last 7d: step={week['step']}s, points={len(week['timestamps'])}, "
+          f"sent={week['metrics']['emails_sent']['total']}")
+    print(f"series: {series.list_series()}")
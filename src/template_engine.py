@@ -0,0 +1,115 @@
+"""
+EB-1A Template Engine Module
+Compiles str.format-style email templates once and caches rendered
+per-opportunity fragments, so a batch of per-user emails is assembled
+from pieces that were rendered only once
+"""
+
+import threading
+from string import Formatter
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+_STAR_STRINGS = tuple("★" * n + "☆" * (5 - n) for n in range(6))
+
+def stars(rating: int) -> str:
+    """Five-star rating string, e.g. 3 -> ★★★☆☆"""
+    if 0 <= rating <= 5:
+        return _STAR_STRINGS[rating]
+    return "★" * rating + "☆" * (5 - rating)
+
+def opportunity_key(opp) -> Tuple:
+    """Everything about an opportunity that shows up in an email; equal keys
+    render identically, so this is what fragments are cached under"""
+    return (opp.title, opp.type.value, opp.description, opp.deadline, opp.link,
+            opp.prestige_rating, opp.evidence_value, opp.time_investment, opp.why_fits)
+
+class CompiledTemplate:
+    """A str.format template parsed once into literal text and fields.
+
+    ``render`` produces the same string as ``source.format(**values)``
+    without re-parsing the source (and its long static CSS block) on
+    every call.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self._parts: List[Tuple[str, Optional[str], Optional[str], str]] = []
+        pending = ""
+        for literal, field, spec, conversion in Formatter().parse(source):
+            # Formatter yields a separate chunk at every escaped brace; merge
+            # them so the static CSS is one string
+            pending += literal
+            if field is not None:
+                self._parts.append((pending, field, conversion, spec))
+                pending = ""
+        if pending:
+            self._parts.append((pending, None, None, ""))
+        self.fields = [field for _, field, _, _ in self._parts if field is not None]
+
+    def render(self, **values: Any) -> str:
+        out = []
+        self.render_into(out.append, **values)
+        return "".join(out)
+
+    def render_into(self, write: Callable[[str], Any], **values: Any):
+        """Write the rendered template through ``write`` (e.g. a StringIO's).
+
+        A callable value is a section writer: it is called with ``write``
+        and writes its content in place, so nested sections never become
+        intermediate strings.
+        """
+        for literal, field, conversion, spec in self._parts:
+            if literal:
+                write(literal)
+            if field is None:
+                continue
+            value = values[field]
+            if callable(value):
+                value(write)
+                continue
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "a":
+                value = ascii(value)
+            write(format(value, spec) if spec or not isinstance(value, str) else value)
+
+class FragmentCache:
+    """Bounded cache of rendered fragments, safe to share across threads.
+
+    Hits are a plain dict lookup with no lock, since batch renders are
+    almost all hits. When full, the oldest entry is evicted first.
+    A ``max_size`` of 0 disables caching (every lookup renders).
+    """
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self._entries: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get_or_render(self, key: Hashable, render: Callable[[], Any]) -> Any:
+        fragment = self._entries.get(key)
+        if fragment is not None:
+            self.stats["hits"] += 1  # approximate under concurrent renders
+            return fragment
+        if self.max_size <= 0:
+            return render()
+
+        fragment = render()
+        with self._lock:
+            self.stats["misses"] += 1
+            if key not in self._entries and len(self._entries) >= self.max_size:
+                del self._entries[next(iter(self._entries))]
+                self.stats["evictions"] += 1
+            self._entries[key] = fragment
+        return fragment
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return dict(self.stats, size=len(self._entries), max_size=self.max_size,
+                        hit_rate=round(self.stats["hits"] / lookups, 3) if lookups else 0.0)
@@ -0,0 +1,288 @@
+"""
+EB-1A Tracing Module
+Lightweight spans for the search -> rank -> render -> send path. Spans
+nest through a context variable, carry trace/parent IDs and attributes,
+can be continued in another thread or process from a span_context(), and
+sampled traces are appended to a local file as OTLP/JSON (one
+ExportTraceServiceRequest per line, the OpenTelemetry file exporter format)
+"""
+
+import functools
+import json
+import os
+import random
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from src.config import SystemConfig
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = ("name", "trace", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace: "_Trace", parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+class _NonRecordingSpan:
+    """Stand-in for spans of unsampled traces; attribute writes are dropped"""
+
+    name = trace_id = span_id = parent_id = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+_NOT_SAMPLED = _NonRecordingSpan()
+
+class _Trace:
+    """Finished spans of one sampled trace, exported when its root span ends"""
+
+    __slots__ = ("trace_id", "spans", "lock")
+
+    def __init__(self, trace_id: str = None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self.lock = threading.Lock()
+
+class _RemoteParent:
+    """A span that lives elsewhere (an earlier process or a finished batch);
+    spans under it join its trace and are exported as they end"""
+
+    __slots__ = ("trace", "span_id")
+
+    def __init__(self, trace_id: str, span_id: str):
+        self.trace = _Trace(trace_id)
+        self.span_id = span_id
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+class FileSpanExporter:
+    """Appends each sampled trace to a file as one OTLP/JSON line"""
+
+    def __init__(self, path: str, service_name: str = "eb1a-opportunity-system"):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+        self.exported = 0
+
+    def export(self, spans: List[Span]):
+        # pid is read per export since gunicorn workers inherit the exporter
+        resource = {"attributes": [
+            {"key": "service.name", "value": {"stringValue": self.service_name}},
+            {"key": "process.pid", "value": {"intValue": str(os.getpid())}}
+        ]}
+        line = json.dumps({"resourceSpans": [{
+            "resource": resource,
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": [s.to_otlp() for s in spans]}]
+        }]})
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self.exported += len(spans)
+
+class Tracer:
+    """Creates spans and decides, once per trace, whether to record it.
+
+    The sampling decision is made at the root span and inherited by every
+    child, so a trace is either complete in the sink or absent. Spans of
+    an unsampled trace cost one context-variable lookup each.
+    """
+
+    def __init__(self, exporter: FileSpanExporter = None, sample_rate: float = None):
+        self.exporter = exporter
+        self.sample_rate = SystemConfig.TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.stats = {"traces_sampled": 0, "traces_dropped": 0, "export_errors": 0}
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        parent = _current_span.get()
+        if parent is _NOT_SAMPLED or (isinstance(parent, _RemoteParent) and self.exporter is None):
+            yield _NOT_SAMPLED
+            return
+
+        if parent is None:
+            if self.exporter is None or random.random() >= self.sample_rate:
+                self.stats["traces_dropped"] += 1
+                token = _current_span.set(_NOT_SAMPLED)
+                try:
+                    yield _NOT_SAMPLED
+                finally:
+                    _current_span.reset(token)
+                return
+            self.stats["traces_sampled"] += 1
+            current = Span(name, _Trace(), None, attributes)
+        else:
+            current = Span(name, parent.trace, parent.span_id, attributes)
+
+        token = _current_span.set(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.error = f"{type(e).__name__}: {str(e)}"
+            raise
+        finally:
+            _current_span.reset(token)
+            current.end_ns = time.time_ns()
+            with current.trace.lock:
+                current.trace.spans.append(current)
+            if parent is None or isinstance(parent, _RemoteParent):
+                self._export(current.trace)
+
+    def _export(self, trace: _Trace):
+        # A continued trace exports each top-level span's subtree separately
+        with trace.lock:
+            spans, trace.spans = trace.spans, []
+        try:
+            self.exporter.export(spans)
+        except Exception as e:
+            self.stats["export_errors"] += 1
+            logger.error(f"Error exporting trace {trace.trace_id}: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, sample_rate=self.sample_rate,
+                    file=self.exporter.path if self.exporter else None)
+
+_current_span: ContextVar = ContextVar("eb1a_current_span", default=None)
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer configured from TRACE_FILE and TRACE_SAMPLE_RATE"""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                exporter = FileSpanExporter(SystemConfig.TRACE_FILE) if SystemConfig.TRACE_FILE else None
+                _tracer = Tracer(exporter)
+    return _tracer
+
+def set_tracer(tracer: Tracer):
+    """Replace the process-wide tracer (e.g. to trace every run of a script)"""
+    global _tracer
+    _tracer = tracer
+
+def span(name: str, **attributes):
+    """``with span("email.send", recipients=1) as s:`` on the process-wide tracer"""
+    return get_tracer().span(name, **attributes)
+
+def current_span():
+    """The active span, or None outside any span"""
+    return _current_span.get()
+
+def span_context() -> Optional[Dict[str, Any]]:
+    """The active span as a JSON-safe dict, for continuing its trace where
+    the context variable doesn't reach (e.g. stored with an outbox
+    message); None outside any span"""
+    current = _current_span.get()
+    if current is None:
+        return None
+    if current is _NOT_SAMPLED:
+        return {"sampled": False}
+    return {"sampled": True, "trace_id": current.trace_id, "span_id": current.span_id}
+
+@contextmanager
+def attach(context: Optional[Dict[str, Any]]):
+    """Make spans opened inside this block children of a span_context()
+    (or unsampled, if that trace was); no-op for None"""
+    if not context:
+        yield
+        return
+    parent = _RemoteParent(context["trace_id"], context["span_id"]) if context.get("sampled") else _NOT_SAMPLED
+    token = _current_span.set(parent)
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+
+def traced(name: str = None):
+    """Decorator running the whole function inside a span"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_tracer().span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+if __name__ == "__main__":
+    # Trace one search -> rank -> render pass and print the spans
+    import tempfile
+    # Use the module instance the instrumented code imported, not __main__
+    from src import tracing
+    from src.opportunity_search import OpportunitySearcher, create_user_profile
+    from src.email_renderer import EmailRenderer
+
+    print("=== Testing Tracing ===")
+    path = os.path.join(tempfile.mkdtemp(), "traces.jsonl")
+    tracing.set_tracer(tracing.Tracer(tracing.FileSpanExporter(path), sample_rate=1.0))
+
+    with tracing.span("daily.run", users=1):
+        profile = create_user_profile()
+        searcher = OpportunitySearcher(profile)
+        ranked = searcher.filter_opportunities(searcher.search_all_opportunities())
+        EmailRenderer().render(ranked, profile)
+
+    with open(path) as f:
+        spans = json.loads(f.readline())["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_id = {s["spanId"]: s for s in spans}
+    for s in sorted(spans, key=lambda s: int(s["startTimeUnixNano"])):
+        depth, parent = 0, s.get("parentSpanId")
+        while parent:
+            depth, parent = depth + 1, by_id[parent].get("parentSpanId")
+        elapsed = (int(s["endTimeUnixNano"]) - int(s["startTimeUnixNano"])) / 1e6
+        print(f"{'  ' * depth}{s['name']:40s} {elapsed:8.3f} ms")
+    print(f"\n{len(spans)} spans written to {path}")